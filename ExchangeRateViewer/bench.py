@@ -0,0 +1,280 @@
+# 환율 조회 성능을 측정하는 스크립트임. 실제 API 대신 지연 시간을 흉내 내는 로컬 서버를 씀.
+# 사용법:
+#   python ExchangeRateViewer/bench.py fetch --bases 30 --dates 5 --latency 50 --concurrency 1 8 32
+#   python ExchangeRateViewer/bench.py convert --rows 1000000 --chunk-rows 100000
+#   python ExchangeRateViewer/bench.py daemon --requests 5000
+#   python ExchangeRateViewer/bench.py watch --rules 10 1000 100000
+
+import argparse
+import asyncio
+import csv
+import http.client
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from main import (
+    AsyncRateFetcher,
+    ExchangeRateViewer,
+    RateCache,
+    RateClient,
+    RateDaemon,
+    RateMatrix,
+    RateWatcher,
+)
+
+CURRENCIES = [
+    "AUD", "BGN", "BRL", "CAD", "CHF", "CNY", "CZK", "DKK", "EUR", "GBP",
+    "HKD", "HUF", "IDR", "ILS", "INR", "ISK", "JPY", "KRW", "MXN", "MYR",
+    "NOK", "NZD", "PHP", "PLN", "RON", "SEK", "SGD", "THB", "TRY", "USD",
+]
+
+
+# 로컬 목(mock) 서버를 띄움. 요청마다 latency초를 기다린 뒤 Frankfurter와 같은 모양의 응답을 보냄.
+def start_mock_server(latency):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass  # 요청마다 로그를 찍지 않음.
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            base = parse_qs(url.query).get("from", ["EUR"])[0]
+            day = url.path.strip("/")
+            rates = {code: 1.0 + i / 10 for i, code in enumerate(CURRENCIES) if code != base}
+            body = json.dumps(
+                {"amount": 1.0, "base": base, "date": day, "rates": rates}
+            ).encode()
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 측정할 (기준 통화, 날짜) 목록을 만듦. duplicates배만큼 같은 요청을 섞어 중복 합치기도 확인함.
+def make_pairs(bases, dates, duplicates):
+    days = [(date(2024, 1, 2) + timedelta(days=i)).isoformat() for i in range(dates)]
+    pairs = [(base, day) for base in CURRENCIES[:bases] for day in days]
+    return pairs * duplicates
+
+
+# 기존 방식: 요청을 하나씩 순서대로 보냄.
+# 지연 시간은 두 방식 모두 시작부터 각 결과가 도착할 때까지의 시간임.
+def run_sequential(url, pairs):
+    client = RateClient(url, RateCache())
+    latencies = []
+    start = time.perf_counter()
+    for base, day in pairs:
+        client.get_rates(base, day)
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed, latencies, client.stats["misses"]
+
+
+# AsyncRateFetcher로 동시에 보냄.
+def run_async(url, pairs, concurrency):
+    async def collect():
+        fetcher = AsyncRateFetcher(RateClient(url, RateCache()), concurrency)
+        latencies = []
+        start = time.perf_counter()
+        async for _, result in fetcher.fetch_many(pairs):
+            if isinstance(result, Exception):
+                raise result
+            latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - start
+        fetcher.close()
+        return elapsed, latencies, fetcher.client.stats["misses"]
+
+    return asyncio.run(collect())
+
+
+def bench_fetch(args):
+    server = start_mock_server(args.latency / 1000)
+    url = f"http://127.0.0.1:{server.server_port}"
+    pairs = make_pairs(args.bases, args.dates, args.duplicates)
+    print(f"요청 {len(pairs)}개, 서버 지연 {args.latency}ms")
+    print(f"{'방식':<14}{'시간(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'실제 요청':>10}")
+
+    # requests_sent: 캐시나 중복 합치기로 걸러지지 않고 서버까지 간 요청 수임.
+    def report(name, elapsed, latencies, requests_sent):
+        cuts = statistics.quantiles(latencies, n=20)
+        print(
+            f"{name:<14}{elapsed:>10.2f}{cuts[9] * 1000:>10.1f}{cuts[18] * 1000:>10.1f}"
+            f"{requests_sent:>10}"
+        )
+
+    report("sequential", *run_sequential(url, pairs))
+    for concurrency in args.concurrency:
+        report(f"async x{concurrency}", *run_async(url, pairs, concurrency))
+    server.shutdown()
+
+
+# 기존 방식: 행마다 파이썬 반복문으로 환율을 찾아 곱함.
+def convert_with_loop(matrix, amounts, from_currencies, to_currencies):
+    return [
+        amount * matrix.rate(a, b)
+        for amount, a, b in zip(amounts, from_currencies, to_currencies)
+    ]
+
+
+def bench_convert(args):
+    server = start_mock_server(0)
+    viewer = ExchangeRateViewer(RateClient(f"http://127.0.0.1:{server.server_port}", RateCache()))
+    matrix = viewer.rate_matrix()  # 환율 행렬은 측정 전에 미리 만들어 둠.
+
+    rng = np.random.default_rng(0)
+    codes = np.array(CURRENCIES)
+    amounts = rng.uniform(1, 10_000, args.rows).round(2)
+    from_currencies = codes[rng.integers(len(codes), size=args.rows)]
+    to_currencies = codes[rng.integers(len(codes), size=args.rows)]
+    print(f"{'방식':<14}{'행 수':>12}{'시간(s)':>10}{'행/초':>14}")
+
+    def report(name, rows, elapsed):
+        print(f"{name:<14}{rows:>12,}{elapsed:>10.2f}{rows / elapsed:>14,.0f}")
+
+    # 반복문 방식은 느리므로 앞쪽 일부만 측정함.
+    loop_rows = min(args.rows, args.loop_rows)
+    start = time.perf_counter()
+    convert_with_loop(
+        matrix, amounts[:loop_rows], from_currencies[:loop_rows], to_currencies[:loop_rows]
+    )
+    report("loop", loop_rows, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    viewer.convert_many(amounts, from_currencies, to_currencies)
+    report("vectorised", args.rows, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path = os.path.join(tmp, "in.csv")
+        with open(in_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["amount", "from", "to"])
+            writer.writerows(zip(amounts.tolist(), from_currencies, to_currencies))
+        start = time.perf_counter()
+        viewer.convert_csv(in_path, os.path.join(tmp, "out.csv"), args.chunk_rows)
+        report("csv stream", args.rows, time.perf_counter() - start)
+    server.shutdown()
+
+
+# 로컬 환율 서버의 응답 시간을 측정함. 연결 하나를 재사용(keep-alive)하며 요청을 보냄.
+def bench_daemon(args):
+    upstream = start_mock_server(args.latency / 1000)
+    daemon = RateDaemon(
+        RateClient(f"http://127.0.0.1:{upstream.server_port}", RateCache()), port=0
+    )
+    ready = threading.Event()
+    threading.Thread(target=asyncio.run, args=(daemon.serve(ready),), daemon=True).start()
+    ready.wait()
+
+    # requests 자체의 처리 시간이 섞이지 않도록 표준 라이브러리 http.client로 측정함.
+    conn = http.client.HTTPConnection("127.0.0.1", daemon.port)
+
+    def get(code):
+        conn.request("GET", f"/latest?from={code}")
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"응답 오류: {response.status}")
+
+    # 첫 요청은 응답을 만들어 보관하는 과정이 들어가므로 측정 전에 한 번씩 보냄.
+    for code in CURRENCIES:
+        get(code)
+
+    latencies = []
+    for i in range(args.requests):
+        start = time.perf_counter()
+        get(CURRENCIES[i % len(CURRENCIES)])
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"요청 {args.requests}개 (원본 서버 지연 {args.latency}ms)")
+    print(f"p50 {cuts[49] * 1e6:.0f}us, p99 {cuts[98] * 1e6:.0f}us")
+    print(f"원본 서버 요청 수: {daemon.viewer.client.stats['misses']}")
+    upstream.shutdown()
+
+
+# 규칙 수에 따라 환율 한 번을 확인하는 데 걸리는 시간을 측정함.
+# 환율은 하루 ±0.5% 안에서 움직이고, 규칙 값은 현재 환율 근처로 잡아 일부만 알림이 나게 함.
+def bench_watch(args):
+    rng = np.random.default_rng(0)
+    codes = np.array(CURRENCIES)
+    base_rates = {code: float(rng.uniform(0.5, 1500)) for code in CURRENCIES if code != "EUR"}
+    snapshots = []
+    for day in range(args.snapshots):
+        rates = {code: rate * rng.uniform(0.995, 1.005) for code, rate in base_rates.items()}
+        snapshots.append(RateMatrix({"base": "EUR", "date": f"2024-01-{day + 2:02d}", "rates": rates}))
+
+    print(f"{'규칙 수':>10}{'확인 1회(ms)':>16}{'규칙당(ns)':>14}{'알림 수':>10}")
+    for count in args.rules:
+        watcher = RateWatcher(RateClient("http://127.0.0.1:1"))
+        bases = codes[rng.integers(len(codes), size=count)]
+        targets = codes[rng.integers(len(codes), size=count)]
+        kinds = rng.choice(RateWatcher.KINDS, count)
+        current = snapshots[0].convert(np.ones(count), bases, targets)
+        for base, target, kind, rate in zip(bases, targets, kinds, current):
+            if kind == "change":
+                value = rng.uniform(0.5, 2)
+            else:
+                value = rate * rng.uniform(0.98, 1.02)
+            watcher.add_rule(base, target, kind, value)
+        watcher.evaluate(snapshots[0])  # 규칙 배열을 만드는 첫 확인은 빼고 측정함.
+        fired = 0
+        start = time.perf_counter()
+        for matrix in snapshots[1:]:
+            fired += len(watcher.evaluate(matrix))
+        elapsed = (time.perf_counter() - start) / (len(snapshots) - 1)
+        print(
+            f"{count:>10,}{elapsed * 1000:>16.3f}{elapsed / count * 1e9:>14.1f}"
+            f"{fired // (len(snapshots) - 1):>10,}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 조회 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", help="순차 조회와 동시 조회의 시간/지연 비교")
+    p.add_argument("--bases", type=int, default=30, help="기준 통화 수 (최대 30)")
+    p.add_argument("--dates", type=int, default=5, help="날짜 수")
+    p.add_argument("--duplicates", type=int, default=2, help="같은 요청을 몇 번씩 넣을지")
+    p.add_argument("--latency", type=float, default=50, help="목 서버 응답 지연(ms)")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    p = sub.add_parser("convert", help="일괄 통화 변환의 초당 처리 행 수 측정")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--loop-rows", type=int, default=100_000, help="반복문 방식으로 측정할 행 수")
+    p.add_argument("--chunk-rows", type=int, default=100_000, help="CSV를 한 번에 읽을 행 수")
+    p = sub.add_parser("daemon", help="로컬 환율 서버의 응답 시간 측정")
+    p.add_argument("--requests", type=int, default=5000)
+    p.add_argument("--latency", type=float, default=50, help="원본(목) 서버 응답 지연(ms)")
+    p = sub.add_parser("watch", help="규칙 수에 따른 환율 감시 확인 시간 측정")
+    p.add_argument("--rules", type=int, nargs="+", default=[10, 1000, 100000])
+    p.add_argument("--snapshots", type=int, default=20, help="확인할 환율 스냅샷 수")
+    args = parser.parse_args()
+
+    if args.command == "fetch":
+        bench_fetch(args)
+    elif args.command == "convert":
+        bench_convert(args)
+    elif args.command == "daemon":
+        bench_daemon(args)
+    else:
+        bench_watch(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,39 +1,869 @@
-from datetime import datetime
+import argparse
+import asyncio
+import csv
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Frankfurter API의 기본 주소임. 테스트할 때는 로컬 스텁 서버 주소로 바꿀 수 있음.
+# 환경 변수 EXCHANGE_RATE_API로 로컬 환율 서버(serve 명령) 주소를 지정하면 모든 요청이 그쪽으로 감.
+API_BASE_URL = os.environ.get("EXCHANGE_RATE_API", "https://api.frankfurter.app")
+# 최신 환율(latest)을 캐시에 보관하는 시간(초)임. 환율은 영업일마다 한 번만 바뀜.
+RATE_CACHE_TTL = 60 * 60
+# 메모리 캐시에 보관할 최대 항목 수임. 넘치면 가장 오래 안 쓴 항목부터 버림(LRU).
+RATE_CACHE_MAX_ITEMS = 256
+# 디스크 캐시를 저장할 기본 디렉토리임.
+RATE_CACHE_DIR = Path.home() / ".cache" / "exchangerate"
+# 요청 하나를 기다리는 최대 시간(초)과, 실패 시 다시 시도할 횟수임.
+REQUEST_TIMEOUT = 5
+REQUEST_RETRIES = 3
+# 교차 환율 행렬을 만들 때 한 번만 가져오는 기준 통화임. Frankfurter의 원본 기준이 EUR임.
+SNAPSHOT_BASE = "EUR"
+# 여러 환율을 동시에 가져올 때 한꺼번에 보내는 최대 요청 수임.
+FETCH_CONCURRENCY = 8
+# 과거 환율 저장소 파일 경로와, 기간(range) 요청 하나로 가져올 최대 일수임.
+RATE_HISTORY_PATH = RATE_CACHE_DIR / "history.sqlite3"
+HISTORY_CHUNK_DAYS = 366
+# Frankfurter(유럽중앙은행) 환율 데이터가 시작되는 날짜임.
+HISTORY_START = date(1999, 1, 4)
+# CSV를 일괄 변환할 때 한 번에 메모리에 올리는 행 수임.
+CONVERT_CHUNK_ROWS = 100_000
+# 마지막으로 받은 환율을 저장해 두는 스냅샷 파일 경로임. 오프라인일 때 이 파일로 보여줌.
+RATE_SNAPSHOT_PATH = RATE_CACHE_DIR / "rates.snap"
+# 로컬 환율 서버의 기본 주소와 포트임.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+# 로컬 환율 서버가 보관할 최대 응답 수임. 넘치면 가장 오래 안 쓴 응답부터 버림(LRU).
+DAEMON_RESPONSE_MAX_ITEMS = 4096
+# 메모리에 보관할 과거 날짜 환율 행렬의 최대 개수임. 최신 환율("latest")은 세지 않고 항상 남김.
+MATRIX_MAX_DATES = 256
+# 발표 시각에 새로 고치지 못했으면(서버 오류, 아직 같은 날짜) 이 간격(초)으로 다시 시도함.
+DAEMON_RETRY_SECONDS = 10 * 60
+# 유럽중앙은행은 영업일 16:00(프랑크푸르트 시각)쯤 환율을 발표하므로, 조금 뒤에 새로 가져옴.
+PUBLISH_TIMEZONE = ZoneInfo("Europe/Berlin")
+PUBLISH_TIME = (16, 15)
+# 발표 시각이 지났는데 새 환율이 아직 없으면 이 간격(초)으로 다시 확인함.
+WATCH_RETRY_SECONDS = 5 * 60
+
+
+# 클래스(Class): 환율 응답을 (기준 통화, 날짜) 단위로 보관하는 캐시임.
+class RateCache:
+    """
+    메모리(LRU)와 디스크(선택) 두 단계로 환율 응답을 보관함.
+    - 키: (기준 통화, 날짜). 최신 환율은 날짜 대신 "latest"를 씀.
+    - "latest"는 ttl초가 지나면 만료되고, 날짜가 정해진 과거 환율은 바뀌지 않으므로 만료되지 않음.
+    - stats: 적중(hits), 디스크 적중(disk_hits), 실패(misses) 횟수
+    """
+
+    def __init__(self, max_items=RATE_CACHE_MAX_ITEMS, ttl=RATE_CACHE_TTL, cache_dir=None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # OrderedDict: 넣은 순서를 기억하는 딕셔너리. 맨 뒤가 가장 최근에 쓴 항목임.
+        self._items = OrderedDict()
+        # 여러 스레드가 동시에 캐시를 써도 안전하도록 잠금(lock)을 사용함.
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    # 캐시 항목을 저장할 디스크 파일 경로임. (예: USD_latest.json)
+    # "../x" 같은 값이 캐시 폴더 밖을 가리키지 않도록, 통화 코드와 날짜 형식이 아니면 None을 반환함.
+    # (None이면 디스크에는 저장하지 않고 메모리에만 보관함)
+    def _disk_path(self, key):
+        base, day = key
+        if not (re.fullmatch(r"[A-Z]{3}", base) and re.fullmatch(r"latest|\d{4}-\d{2}-\d{2}", day)):
+            return None
+        return self.cache_dir / f"{base}_{day}.json"
+
+    # 저장한 시각(fetched_at)을 보고 항목이 아직 유효한지 확인함.
+    def _fresh(self, key, fetched_at):
+        return key[1] != "latest" or time.time() - fetched_at < self.ttl
+
+    def get(self, key):
+        """캐시에 유효한 응답이 있으면 반환하고, 없으면 None을 반환함."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry and self._fresh(key, entry[0]):
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+
+            path = self.cache_dir and self._disk_path(key)
+            if path:
+                try:
+                    stored = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    stored = None
+                if stored and self._fresh(key, stored["fetched_at"]):
+                    self._put(key, stored["fetched_at"], stored["data"])
+                    self.stats["disk_hits"] += 1
+                    return stored["data"]
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, data):
+        """응답을 메모리에 넣고, 디스크 캐시를 쓰면 파일로도 저장함."""
+        fetched_at = time.time()
+        with self._lock:
+            self._put(key, fetched_at, data)
+            path = self.cache_dir and self._disk_path(key)
+            if path:
+                # 임시 파일에 다 쓴 뒤 바꿔치기해서, 중간에 끊겨도 깨진 파일이 남지 않게 함.
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(
+                    json.dumps({"fetched_at": fetched_at, "data": data}), encoding="utf-8"
+                )
+                os.replace(tmp, path)
+
+    # 잠금을 잡은 상태에서 메모리에 넣고, 넘치는 항목을 버림.
+    def _put(self, key, fetched_at, data):
+        self._items[key] = (fetched_at, data)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+# 클래스(Class): 연결을 재사용하고 캐시를 거쳐 환율을 가져오는 클라이언트임.
+class RateClient:
+    """
+    requests.Session 하나로 서버와의 연결(TCP/TLS)을 재사용함.
+    - 요청마다 timeout을 걸고, 일시적인 서버 오류(429, 5xx)는 점점 간격을 늘리며 다시 시도함.
+    - 같은 (기준 통화, 날짜)는 캐시에서 바로 돌려주므로 네트워크 요청이 없음.
+    - base_url을 바꾸면 로컬 스텁 서버로 테스트할 수 있음.
+    """
+
+    def __init__(
+        self,
+        base_url=API_BASE_URL,
+        cache=None,
+        timeout=REQUEST_TIMEOUT,
+        retries=REQUEST_RETRIES,
+        backoff=0.5,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache if cache is not None else RateCache()
+        self.timeout = timeout
+        self.session = requests.Session()
+        # 기준 통화별로 마지막 응답의 ETag/Last-Modified를 기억해 조건부 요청에 씀.
+        self._validators = {}
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def get_rates(self, base_currency, date=None, refresh=False):
+        """
+        기준 통화의 환율을 가져옴. date("YYYY-MM-DD")를 주면 그날의 환율을 가져옴.
+        - refresh=True면 캐시를 건너뛰고 서버에서 새로 가져옴.
+        - 실패하면 requests의 예외를 그대로 발생시킴.
+        - 반환값: API 응답 딕셔너리 ({"base", "date", "rates"})
+        """
+        key = (base_currency, date or "latest")
+        data = None if refresh else self.cache.get(key)
+        if data is not None:
+            return data
+
+        response = self.session.get(
+            f"{self.base_url}/{key[1]}", params={"from": base_currency}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        self.cache.put(key, data)
+        # 최신 환율은 실제 날짜로도 저장해서, 나중에 그 날짜를 물어봐도 캐시에서 찾게 함.
+        if date is None and "date" in data:
+            self.cache.put((base_currency, data["date"]), data)
+        return data
+
+    def get_rates_if_changed(self, base_currency=SNAPSHOT_BASE):
+        """
+        최신 환율을 조건부 요청(If-None-Match/If-Modified-Since)으로 가져옴.
+        - 지난번 응답 이후 바뀌지 않았으면 서버가 본문 없이 304로 답하고, 이때 None을 반환함.
+        - 반환값: 바뀐 경우 API 응답 딕셔너리, 아니면 None
+        """
+        headers = {}
+        etag, last_modified = self._validators.get(base_currency, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = self.session.get(
+            f"{self.base_url}/latest",
+            params={"from": base_currency},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._validators[base_currency] = (
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        data = response.json()
+        self.cache.put((base_currency, "latest"), data)
+        return data
+
+    def get_range(self, start, end, base_currency=SNAPSHOT_BASE):
+        """
+        start~end 기간의 날짜별 환율을 요청 한 번으로 가져옴. 저장소가 따로 보관하므로 캐시하지 않음.
+        - 반환값: API 응답 딕셔너리 ({"base", "start_date", "end_date", "rates": {날짜: {통화: 환율}}})
+        """
+        response = self.session.get(
+            f"{self.base_url}/{start}..{end}",
+            params={"from": base_currency},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+# 클래스(Class): 여러 (기준 통화, 날짜)의 환율을 asyncio로 동시에 가져오는 도구임.
+class AsyncRateFetcher:
+    """
+    RateClient의 요청을 스레드 풀에서 실행하고 asyncio로 묶어 기다림.
+    - concurrency: 동시에 보내는 최대 요청 수
+    - rate_limit: 초당 최대 요청 수 (None이면 제한 없음)
+    - 같은 (기준 통화, 날짜)를 동시에 여러 번 요청하면 실제 요청은 한 번만 보내고 결과를 나눠 씀.
+    - stats: 실제로 보낸 요청 수(requests)와 합쳐진 중복 요청 수(coalesced)
+    - 이벤트 루프 밖에서 만들어도 되고, 여러 번의 asyncio.run()에서 다시 써도 됨.
+    """
+
+    def __init__(self, client=None, concurrency=FETCH_CONCURRENCY, rate_limit=None):
+        self.client = client or RateClient()
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        # Semaphore/Lock/Task는 만든 이벤트 루프에 묶이므로 __init__이 아니라
+        # 처음 쓰는 루프 안에서 만듦. (_bind_loop 참고)
+        self._loop = None
+        self._semaphore = None
+        self._rate_lock = None
+        self._next_slot = 0.0
+        # 지금 진행 중인 요청: 키 -> asyncio.Task
+        self._inflight = {}
+        self.stats = {"requests": 0, "coalesced": 0}
+
+    # 지금 돌고 있는 이벤트 루프가 바뀌었으면 루프에 묶이는 객체를 새로 만듦.
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._rate_lock = asyncio.Lock()
+            self._next_slot = 0.0
+            self._inflight = {}
+        return loop
+
+    # rate_limit이 있으면 요청 사이 간격이 1/rate_limit초 이상이 되도록 기다림.
+    async def _wait_turn(self):
+        if not self.rate_limit:
+            return
+        loop = self._bind_loop()
+        async with self._rate_lock:
+            now = loop.time()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + 1 / self.rate_limit
+
+    async def _request(self, base_currency, date):
+        loop = self._bind_loop()
+        async with self._semaphore:
+            await self._wait_turn()
+            self.stats["requests"] += 1
+            # requests는 동기 라이브러리이므로 스레드 풀에서 실행해 이벤트 루프를 막지 않음.
+            return await loop.run_in_executor(
+                self._executor, self.client.get_rates, base_currency, date
+            )
+
+    async def fetch(self, base_currency, date=None):
+        """환율 하나를 가져옴. 같은 요청이 이미 진행 중이면 그 결과를 함께 기다림."""
+        key = (base_currency, date or "latest")
+        self._bind_loop()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(base_currency, date))
+            inflight = self._inflight
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return await task
+
+    # 오류를 예외로 던지지 않고 결과로 돌려줘서, 하나가 실패해도 나머지는 계속 받게 함.
+    async def _fetch_pair(self, pair):
+        try:
+            return pair, await self.fetch(*pair)
+        except Exception as e:
+            return pair, e
+
+    async def fetch_many(self, pairs):
+        """
+        (기준 통화, 날짜) 목록을 동시에 가져오고, 도착하는 순서대로 내보내는 비동기 제너레이터임.
+        - 날짜가 None이면 최신 환율임.
+        - 내보내는 값: ((기준 통화, 날짜), 응답 딕셔너리 또는 Exception)
+        """
+        tasks = [asyncio.ensure_future(self._fetch_pair(tuple(pair))) for pair in pairs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 중간에 반복을 멈추면 남은 요청을 취소함.
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_many(pairs, client=None, concurrency=FETCH_CONCURRENCY, rate_limit=None):
+    """
+    AsyncRateFetcher를 asyncio 없이 쓰기 위한 함수임.
+    - 반환값: {(기준 통화, 날짜): 응답 딕셔너리 또는 Exception}
+    """
+
+    async def collect():
+        fetcher = AsyncRateFetcher(client, concurrency, rate_limit)
+        try:
+            return {pair: result async for pair, result in fetcher.fetch_many(pairs)}
+        finally:
+            fetcher.close()
+
+    return asyncio.run(collect())
+
+
+# 클래스(Class): 한 번 가져온 환율로 모든 통화 쌍의 교차 환율을 계산해 두는 행렬임.
+class RateMatrix:
+    """
+    기준 통화 하나의 응답에는 다른 모든 통화의 환율이 들어 있으므로,
+    A 기준 B 환율은 rate(B) / rate(A)로 계산할 수 있음.
+    - currencies: 통화 코드 리스트 (행렬의 행/열 순서)
+    - matrix[i, j]: currencies[i] 1단위가 currencies[j] 몇 단위인지
+    """
+
+    def __init__(self, data):
+        rates = dict(data["rates"])
+        rates[data["base"]] = 1.0
+        self.date = data["date"]
+        self.fetched_at = time.time()
+        self.currencies = sorted(rates)
+        self.index = {code: i for i, code in enumerate(self.currencies)}
+        # 기준 통화 1단위당 각 통화의 양을 담은 벡터임.
+        vector = np.array([rates[code] for code in self.currencies], dtype=np.float64)
+        # 브로드캐스팅(broadcasting): 반복문 없이 N×N 나눗셈을 한 번에 계산함.
+        self.matrix = vector[np.newaxis, :] / vector[:, np.newaxis]
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def rate(self, from_currency, to_currency):
+        """from_currency 1단위가 to_currency 몇 단위인지 반환함."""
+        return float(self.matrix[self.index[from_currency], self.index[to_currency]])
+
+    # 통화 코드 배열을 행렬의 행/열 번호 배열로 바꿈. 모르는 코드는 -1임.
+    def _indices(self, codes):
+        codes = np.asarray(codes, dtype=str)
+        known = np.array(self.currencies)
+        # currencies는 정렬되어 있으므로 이진 탐색(searchsorted)으로 한 번에 위치를 찾음.
+        positions = np.searchsorted(known, codes)
+        positions[positions == len(known)] = 0
+        return np.where(known[positions] == codes, positions, -1)
+
+    def convert(self, amounts, from_currencies, to_currencies):
+        """
+        금액 배열을 행마다 다른 통화 쌍으로 한 번에 변환함. (행마다 반복문을 돌지 않음)
+        - 모르는 통화 코드가 들어 있는 행은 NaN이 됨.
+        - 반환값: 변환된 금액 배열(float64)
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if len(amounts) == 0:
+            return amounts
+        rows = self._indices(from_currencies)
+        cols = self._indices(to_currencies)
+        known = (rows >= 0) & (cols >= 0)
+        rates = np.where(known, self.matrix[rows, cols], np.nan)
+        return amounts * rates
+
+    # SNAPSHOT_BASE 1단위당 각 통화의 양. 스냅샷 파일에 저장하는 값임.
+    def base_vector(self):
+        return self.matrix[self.index[SNAPSHOT_BASE]]
+
+    def rates_for(self, base_currency):
+        """API 응답과 같은 모양({"base", "date", "rates"})으로 base_currency 기준 환율을 반환함."""
+        row = self.matrix[self.index[base_currency]]
+        rates = {
+            code: float(rate)
+            for code, rate in zip(self.currencies, row)
+            if code != base_currency
+        }
+        return {"base": base_currency, "date": self.date, "rates": rates}
+
+
+# 클래스(Class): 환율을 고정 크기 바이너리 배열로 저장한 스냅샷 파일을 읽고 씀.
+class RateSnapshot:
+    """
+    파일 구조 (모두 리틀 엔디언):
+    - 헤더 24바이트: 식별자 b"FXSNAP01", 날짜 수(D), 통화 수(N), 저장 시각(float64)
+    - 날짜: D × 10바이트 ASCII ("YYYY-MM-DD", 오름차순)
+    - 통화 코드: N × 3바이트 ASCII
+    - 환율: D × N float64 (SNAPSHOT_BASE 기준, 없는 값은 NaN). 8바이트 경계에 맞춰 시작함.
+    파일을 메모리 맵(mmap)으로 열어 복사 없이 NumPy 배열로 보므로 시작할 때 거의 시간이 들지 않음.
+    """
+
+    MAGIC = b"FXSNAP01"
+    HEADER = struct.Struct("<8sIId")
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"비어 있는 스냅샷 파일입니다: {path}") from None
+        magic, n_days, n_codes, self.fetched_at = self.HEADER.unpack_from(self._mmap)
+        if magic != self.MAGIC:
+            self._mmap.close()
+            raise ValueError(f"환율 스냅샷 파일이 아닙니다: {path}")
+        offset = self.HEADER.size
+        self.days = np.frombuffer(self._mmap, "S10", n_days, offset)
+        offset += 10 * n_days
+        self.codes = np.frombuffer(self._mmap, "S3", n_codes, offset)
+        offset = -(-(offset + 3 * n_codes) // 8) * 8
+        self.rates = np.frombuffer(self._mmap, np.float64, n_days * n_codes, offset).reshape(
+            n_days, n_codes
+        )
+
+    def __contains__(self, day):
+        return day.encode() in self.days
+
+    def matrix(self, day=None):
+        """day(기본: 가장 최근 날짜)의 환율로 RateMatrix를 만들어 반환함."""
+        row = len(self.days) - 1 if day is None else int(np.flatnonzero(self.days == day.encode())[0])
+        vector = self.rates[row]
+        known = ~np.isnan(vector)
+        rates = dict(zip(self.codes[known].astype(str).tolist(), vector[known].tolist()))
+        return RateMatrix({"base": SNAPSHOT_BASE, "date": self.days[row].decode(), "rates": rates})
+
+    @classmethod
+    def write(cls, path, matrices, fetched_at=None):
+        """
+        RateMatrix 목록을 스냅샷 파일 하나로 저장함. 같은 날짜는 뒤에 있는 행렬을 씀.
+        임시 파일에 다 쓴 뒤 바꿔치기하므로, 쓰는 도중 끊겨도 이전 스냅샷이 남아 있음.
+        """
+        by_day = {matrix.date: matrix for matrix in matrices}
+        days = sorted(by_day)
+        codes = sorted({code for matrix in by_day.values() for code in matrix.currencies})
+        column = {code: i for i, code in enumerate(codes)}
+        rates = np.full((len(days), len(codes)), np.nan)
+        for row, day in enumerate(days):
+            matrix = by_day[day]
+            rates[row, [column[code] for code in matrix.currencies]] = matrix.base_vector()
+
+        header = cls.HEADER.pack(cls.MAGIC, len(days), len(codes), fetched_at or time.time())
+        body = np.array(days, "S10").tobytes() + np.array(codes, "S3").tobytes()
+        padding = b"\0" * (-(len(header) + len(body)) % 8)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(header + body + padding + rates.astype("<f8").tobytes())
+        os.replace(tmp, path)
+
+    def close(self):
+        # NumPy 배열이 mmap을 참조하고 있으므로 배열을 먼저 놓아야 닫을 수 있음.
+        self.days = self.codes = self.rates = None
+        self._mmap.close()
+
+
+def export_snapshot(dest, path=RATE_SNAPSHOT_PATH):
+    """스냅샷 파일을 dest로 복사함. 인터넷이 안 되는 곳으로 옮길 때 씀."""
+    RateSnapshot(path).close()  # 올바른 스냅샷인지 먼저 확인함.
+    shutil.copyfile(path, dest)
+
+
+def import_snapshot(src, path=RATE_SNAPSHOT_PATH):
+    """src 스냅샷 파일을 검사한 뒤 이 컴퓨터의 스냅샷으로 가져옴."""
+    RateSnapshot(src).close()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, path)
+
+
+# 클래스(Class): 날짜별 과거 환율을 SQLite에 모아 두고 기간 조회/통계를 계산하는 저장소임.
+class RateHistory:
+    """
+    - rates: (날짜, 통화, SNAPSHOT_BASE 기준 환율)
+    - coverage: 이미 가져온 기간 목록. 다음 조회 때는 빠진 기간만 서버에 요청함.
+    조회 결과는 NumPy 배열로 바꿔 반복문 없이 계산하므로 데이터가 많아도 빠름.
+    """
+
+    def __init__(self, db_path=RATE_HISTORY_PATH, client=None):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.client = client or RateClient()
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS rates ("
+            " day TEXT, currency TEXT, rate REAL,"
+            " PRIMARY KEY (day, currency)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS coverage (start TEXT, end TEXT);"
+        )
+
+    # 요청한 기간 중 아직 가져오지 않은 구간들을 (시작, 끝) 날짜 리스트로 반환함.
+    def _missing(self, start, end):
+        missing = []
+        cursor = start
+        covered = self.conn.execute(
+            "SELECT start, end FROM coverage WHERE end >= ? AND start <= ? ORDER BY start",
+            (start.isoformat(), end.isoformat()),
+        )
+        for covered_start, covered_end in covered:
+            covered_start = date.fromisoformat(covered_start)
+            covered_end = date.fromisoformat(covered_end)
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - timedelta(days=1)))
+            cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def update(self, start, end=None):
+        """
+        start~end(기본: 오늘) 기간 중 빠진 구간만 HISTORY_CHUNK_DAYS일씩 나눠 가져와 저장함.
+        - 반환값: 새로 저장한 날짜 수
+        """
+        start = max(date.fromisoformat(str(start)), HISTORY_START)
+        end = min(date.fromisoformat(str(end)) if end else date.today(), date.today())
+        # 오늘 환율은 아직 발표되지 않았을 수 있으므로 어제까지만 "가져옴"으로 기록함.
+        settled = date.today() - timedelta(days=1)
+        saved_days = 0
+        for gap_start, gap_end in self._missing(start, end):
+            chunk_start = gap_start
+            while chunk_start <= gap_end:
+                chunk_end = min(chunk_start + timedelta(days=HISTORY_CHUNK_DAYS - 1), gap_end)
+                data = self.client.get_range(chunk_start, chunk_end)
+                rows = [
+                    (day, currency, rate)
+                    for day, rates in data["rates"].items()
+                    for currency, rate in {**rates, data["base"]: 1.0}.items()
+                ]
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO rates VALUES (?, ?, ?)", rows)
+                    if chunk_start <= settled:
+                        self.conn.execute(
+                            "INSERT INTO coverage VALUES (?, ?)",
+                            (chunk_start.isoformat(), min(chunk_end, settled).isoformat()),
+                        )
+                saved_days += len(data["rates"])
+                chunk_start = chunk_end + timedelta(days=1)
+        return saved_days
+
+    def series(self, currency, start, end=None, base_currency=SNAPSHOT_BASE, fetch=True):
+        """
+        start~end 기간의 base_currency 1단위당 currency 환율을 반환함.
+        - fetch=True면 빠진 기간을 먼저 서버에서 가져옴. False면 저장된 데이터만 씀.
+        - 반환값: (날짜 배열(datetime64[D]), 환율 배열(float64))
+        """
+        end = end or date.today().isoformat()
+        if fetch:
+            self.update(start, end)
+        rows = self.conn.execute(
+            "SELECT day, currency, rate FROM rates"
+            " WHERE day BETWEEN ? AND ? AND currency IN (?, ?) ORDER BY day",
+            (str(start), str(end), currency, base_currency),
+        ).fetchall()
+        if not rows:
+            return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+
+        days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+        codes = np.array([row[1] for row in rows])
+        rates = np.array([row[2] for row in rows], dtype=np.float64)
+        # 날짜별로 두 통화의 환율을 나란히 놓음. 한쪽이 없는 날은 NaN으로 남았다가 빠짐.
+        unique_days, position = np.unique(days, return_inverse=True)
+        target = np.full(len(unique_days), np.nan)
+        base = np.full(len(unique_days), np.nan)
+        target[position[codes == currency]] = rates[codes == currency]
+        base[position[codes == base_currency]] = rates[codes == base_currency]
+        # 교차 환율: (EUR 기준 currency) / (EUR 기준 base_currency)
+        values = target / base
+        valid = ~np.isnan(values)
+        return unique_days[valid], values[valid]
+
+    def resample(self, currency, start, end=None, freq="M", how="mean", **kwargs):
+        """
+        기간 환율을 주(W)/월(M)/연(Y) 단위로 묶어 평균(mean), 최소(min), 최대(max), 마지막(last) 값을 구함.
+        - 반환값: (각 묶음의 시작 날짜 배열, 값 배열)
+        """
+        days, values = self.series(currency, start, end, **kwargs)
+        if freq == "W":
+            # numpy의 주(W)는 목요일(1970-01-01)부터 세므로, 4일을 빼서 월요일 시작 주로 맞춤.
+            periods = (days - np.timedelta64(4, "D")).astype("datetime64[W]")
+            labels = periods + np.timedelta64(4, "D")
+        elif freq in ("M", "Y"):
+            periods = days.astype(f"datetime64[{freq}]")
+            labels = periods.astype("datetime64[D]")
+        else:
+            raise ValueError(f"지원하지 않는 단위입니다: {freq}")
+        if len(days) == 0:
+            return labels, values
+
+        # 날짜가 정렬되어 있으므로 묶음이 바뀌는 위치만 찾으면 reduceat으로 한 번에 계산할 수 있음.
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        if how == "mean":
+            result = np.add.reduceat(values, starts) / np.diff(np.r_[starts, len(values)])
+        elif how == "min":
+            result = np.minimum.reduceat(values, starts)
+        elif how == "max":
+            result = np.maximum.reduceat(values, starts)
+        elif how == "last":
+            result = values[np.r_[starts[1:] - 1, len(values) - 1]]
+        else:
+            raise ValueError(f"지원하지 않는 계산 방법입니다: {how}")
+        return labels[starts], result
+
+    def summary(self, currency, start, end=None, **kwargs):
+        """기간의 최소/최대/평균 환율과 최소/최대가 나온 날짜를 딕셔너리로 반환함."""
+        days, values = self.series(currency, start, end, **kwargs)
+        if len(values) == 0:
+            return None
+        low, high = int(np.argmin(values)), int(np.argmax(values))
+        return {
+            "count": len(values),
+            "min": float(values[low]),
+            "min_date": str(days[low]),
+            "max": float(values[high]),
+            "max_date": str(days[high]),
+            "mean": float(values.mean()),
+        }
+
+    def close(self):
+        self.conn.close()
 
 
 # 클래스(Class) 정의: 환율 정보와 관련된 기능을 담는 설계도
 class ExchangeRateViewer:
     """
     API를 통해 환율 정보를 가져오고 표시하는 기능을 담당하는 클래스임.
-    - API_URL: 데이터를 가져올 서버의 주소
+    - client: 환율을 가져오는 RateClient (연결 재사용, 캐시)
+    - snapshot_path: 받은 환율을 저장해 두는 스냅샷 파일. 네트워크가 안 되면 이 파일의 환율을 씀.
     - TARGET_CURRENCIES: 사용자에게 보여줄 주요 통화 목록
     """
 
     # 클래스 변수: 모든 객체가 공유하는 값
-    API_URL = "https://api.frankfurter.app/latest"
     TARGET_CURRENCIES = ["KRW", "USD", "EUR", "JPY", "CNY"]
+    # 예전 코드와의 호환을 위해 남겨 둔 최신 환율 주소임. 실제 요청은 client.base_url을 씀.
+    API_URL = f"{API_BASE_URL}/latest"
+
+    # 객체를 만들 때 실행됨. client를 주지 않으면 기본 RateClient를 만듦.
+    def __init__(self, client=None, snapshot_path=None):
+        self.client = client or RateClient()
+        # 날짜("latest" 또는 "YYYY-MM-DD")별 교차 환율 행렬임. 맨 뒤가 가장 최근에 쓴 행렬임.
+        self._matrices = OrderedDict()
+        # 서버 모드에서는 여러 스레드가 rate_matrix를 동시에 부르므로 행렬 목록을 바꿀 때 잠금을 사용함.
+        self._matrices_lock = threading.Lock()
+        # 네트워크 오류로 저장해 둔 예전 환율을 보여주는 중인지 여부임.
+        self.offline = False
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot = None
+        # 백그라운드 새로 고침과 화면 요청이 스냅샷 파일을 동시에 바꾸지 않도록 잠금을 사용함.
+        self._snapshot_lock = threading.Lock()
+        if self.snapshot_path and self.snapshot_path.exists():
+            try:
+                self.snapshot = RateSnapshot(self.snapshot_path)
+            except ValueError:
+                pass  # 깨진 스냅샷은 무시하고 네트워크에서 새로 가져옴.
+        if self.snapshot is not None and len(self.snapshot.days):
+            latest = self.snapshot.matrix()
+            # 스냅샷을 받은 시각을 그대로 써서, 오래된 스냅샷이면 새로 가져오게 함.
+            latest.fetched_at = self.snapshot.fetched_at
+            self._matrices["latest"] = latest
+
+    def rate_matrix(self, date=None, refresh=False):
+        """
+        date의 교차 환율 행렬을 반환함. 없거나 만료되었을 때만 SNAPSHOT_BASE 기준 환율을 한 번 가져옴.
+        - refresh=True면 캐시를 건너뛰고 서버에서 새로 가져옴.
+        - 실패하면 requests의 예외를 그대로 발생시킴.
+        """
+        key = date or "latest"
+        with self._matrices_lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self._matrices.move_to_end(key)
+        if matrix is None and key != "latest":
+            with self._snapshot_lock:
+                if self.snapshot is not None and key in self.snapshot:
+                    matrix = self._remember(key, self.snapshot.matrix(key))
+        # 최신 환율 행렬은 캐시와 같은 시간이 지나면 새로 만듦. 과거 날짜는 바뀌지 않음.
+        if (
+            refresh
+            or matrix is None
+            or (key == "latest" and time.time() - matrix.fetched_at >= self.client.cache.ttl)
+        ):
+            try:
+                fresh = RateMatrix(self.client.get_rates(SNAPSHOT_BASE, date, refresh))
+            except requests.RequestException:
+                if matrix is None:
+                    raise
+                # 서버에 연결할 수 없으면 마지막으로 받은 환율을 계속 쓰고, ttl 뒤에 다시 시도함.
+                matrix.fetched_at = time.time()
+                self.offline = True
+                return matrix
+            matrix = self._remember(key, fresh)
+            self.offline = False
+            if self.snapshot_path:
+                self._save_snapshot()
+        return matrix
+
+    # 행렬을 보관함. 과거 날짜가 MATRIX_MAX_DATES개를 넘으면 가장 오래 안 쓴 날짜부터 버림(LRU).
+    def _remember(self, key, matrix):
+        with self._matrices_lock:
+            self._matrices[key] = matrix
+            self._matrices.move_to_end(key)
+            history = [day for day in self._matrices if day != "latest"]
+            for day in history[: max(len(history) - MATRIX_MAX_DATES, 0)]:
+                del self._matrices[day]
+        return matrix
+
+    # 메모리의 환율 행렬과 기존 스냅샷의 날짜들을 합쳐 스냅샷 파일을 새로 씀.
+    def _save_snapshot(self):
+        with self._snapshot_lock:
+            matrices = []
+            if self.snapshot is not None:
+                matrices = [self.snapshot.matrix(day.decode()) for day in self.snapshot.days]
+                self.snapshot.close()
+            with self._matrices_lock:
+                matrices += list(self._matrices.values())
+            RateSnapshot.write(self.snapshot_path, matrices)
+            self.snapshot = RateSnapshot(self.snapshot_path)
+
+    def refresh_in_background(self):
+        """
+        스냅샷의 환율을 먼저 보여주면서, 백그라운드 스레드에서 최신 환율을 새로 가져옴.
+        - 반환값: 시작한 스레드 (join()으로 끝날 때까지 기다릴 수 있음)
+        """
+        latest = self._matrices.get("latest")
+        if latest is not None:
+            # 새로 받는 동안 화면에서 요청해도 다시 서버에 묻지 않고 스냅샷 환율을 쓰게 함.
+            latest.fetched_at = time.time()
+
+        def refresh():
+            try:
+                self.rate_matrix(refresh=True)
+            except requests.RequestException:
+                self.offline = True
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        thread.start()
+        return thread
+
+    def convert_many(self, amounts, from_currencies, to_currencies, dates=None):
+        """
+        (금액, 원래 통화, 바꿀 통화[, 날짜]) 배열을 한꺼번에 변환함.
+        - dates를 주면 날짜별로 그날의 환율 행렬을 씀. 빈 문자열은 최신 환율임.
+        - 반환값: 변환된 금액 배열(float64). 모르는 통화는 NaN임.
+        """
+        if dates is None:
+            return self.rate_matrix().convert(amounts, from_currencies, to_currencies)
+
+        amounts = np.asarray(amounts, dtype=np.float64)
+        from_currencies = np.asarray(from_currencies)
+        to_currencies = np.asarray(to_currencies)
+        result = np.empty(len(amounts))
+        unique_dates, inverse = np.unique(np.asarray(dates), return_inverse=True)
+        # 같은 날짜의 행이 붙어 있도록 정렬해서, 날짜마다 한 번씩만 행렬 변환을 함.
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.r_[0, np.cumsum(np.bincount(inverse, minlength=len(unique_dates)))]
+        for i, day in enumerate(unique_dates):
+            rows = order[bounds[i] : bounds[i + 1]]
+            result[rows] = self.rate_matrix(str(day) or None).convert(
+                amounts[rows], from_currencies[rows], to_currencies[rows]
+            )
+        return result
+
+    def convert_csv(self, in_path, out_path, chunk_rows=CONVERT_CHUNK_ROWS):
+        """
+        amount, from, to(, date) 열이 있는 CSV를 chunk_rows행씩 읽어 변환하고,
+        converted 열을 덧붙여 out_path에 씀. 메모리보다 큰 파일도 처리할 수 있음.
+        - 반환값: 변환한 행 수
+        """
+        total = 0
+        with open(in_path, newline="", encoding="utf-8") as src, open(
+            out_path, "w", newline="", encoding="utf-8"
+        ) as dst:
+            reader = csv.reader(src)
+            header = next(reader)
+            columns = {name: i for i, name in enumerate(header)}
+            missing = {"amount", "from", "to"} - columns.keys()
+            if missing:
+                raise ValueError(f"CSV에 필요한 열이 없습니다: {', '.join(sorted(missing))}")
+            writer = csv.writer(dst)
+            writer.writerow(header + ["converted"])
+
+            while True:
+                rows = list(islice(reader, chunk_rows))
+                if not rows:
+                    break
+                # zip(*rows): 행 목록을 열 목록으로 뒤집음.
+                cols = list(zip(*rows))
+                converted = self.convert_many(
+                    np.array(cols[columns["amount"]], dtype=np.float64),
+                    cols[columns["from"]],
+                    cols[columns["to"]],
+                    cols[columns["date"]] if "date" in columns else None,
+                )
+                writer.writerows(zip(*cols, np.round(converted, 4).tolist()))
+                total += len(rows)
+        return total
 
     # API 서버에 환율 정보를 요청하고 결과를 반환함.
-    def fetch_rates(self, base_currency):
+    def fetch_rates(self, base_currency, date=None):
         """
-        지정된 기본 통화를 기준으로 최신 환율 정보를 가져옴.
+        지정된 기본 통화를 기준으로 최신(또는 date 날짜의) 환율 정보를 가져옴.
         - base_currency: 기준이 되는 통화 코드 (예: 'USD')
         - 반환값: 성공 시 환율 데이터(dict), 실패 시 None
         """
         # try-except 예외 처리: 네트워크 연결 문제 등 예상치 못한 오류에 대비함.
         try:
-            # f-string을 이용해 요청할 URL을 동적으로 만듦.
-            params = {"from": base_currency}
-            # requests 라이브러리를 사용해 API에 GET 요청을 보냄.
-            response = requests.get(self.API_URL, params=params)
-
-            # 응답 상태 코드가 200(성공)인지 확인함.
-            response.raise_for_status()  # 200이 아니면 예외를 발생시킴.
-
-            # JSON 형식의 응답 데이터를 파이썬 딕셔너리로 변환하여 반환함.
-            return response.json()
+            # 교차 환율 행렬에서 꺼내므로, 기준 통화를 바꿔도 다시 API에 요청하지 않음.
+            matrix = self.rate_matrix(date)
+            if base_currency not in matrix:
+                print(f"오류: '{base_currency}'는 유효하지 않은 통화 코드입니다.")
+                return None
+            if self.offline:
+                print(f"(오프라인) 저장해 둔 {matrix.date} 환율을 보여줍니다.")
+            return matrix.rates_for(base_currency)
 
         except requests.HTTPError as e:
             # 존재하지 않는 통화 코드를 입력했을 때의 오류 처리
@@ -99,13 +929,461 @@ class ExchangeRateViewer:
         print("=" * 30)
 
 
+# 다음 환율 발표 시각(영업일 PUBLISH_TIME)까지 남은 초를 반환함.
+def seconds_until_publish(now=None):
+    now = now or datetime.now(PUBLISH_TIMEZONE)
+    target = now.replace(hour=PUBLISH_TIME[0], minute=PUBLISH_TIME[1], second=0, microsecond=0)
+    # 이미 지났거나 주말(토=5, 일=6)이면 다음 영업일로 넘김.
+    while target <= now or target.weekday() >= 5:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+# 클래스(Class): 환율 캐시 하나를 들고 여러 로컬 프로그램에 환율을 나눠 주는 HTTP 서버임.
+class RateDaemon:
+    """
+    Frankfurter API와 같은 주소 형식으로 응답하므로, 클라이언트는 주소만 바꾸면 됨.
+    - GET /latest?from=USD, GET /2024-01-02?from=USD : 최신/과거 환율
+    - GET /latest?from=USD&to=KRW,JPY : 원하는 통화만 (교차 환율)
+    - 환율 발표 시각마다 최신 환율을 새로 가져옴.
+    - 한 번 만든 응답(JSON 바이트)은 최대 DAEMON_RESPONSE_MAX_ITEMS개까지 보관해 두었다가 바로 보냄.
+    - 원본 서버가 4xx로 답한 날짜는 404, 연결 실패나 5xx는 502로 답함.
+    """
+
+    def __init__(self, client=None, host=DAEMON_HOST, port=DAEMON_PORT):
+        # 발표 시각에 직접 새로 고치므로, 최신 환율 캐시는 하루 넘게 유지함.
+        self.viewer = ExchangeRateViewer(client or RateClient(cache=RateCache(ttl=2 * 24 * 3600)))
+        self.host = host
+        self.port = port
+        # (날짜, 기준 통화, 대상 통화) -> 응답 바이트. 맨 뒤가 가장 최근에 쓴 응답임.
+        self._responses = OrderedDict()
+        self.stats = {"requests": 0, "upstream_errors": 0}
+
+    def refresh(self):
+        """
+        최신 환율을 서버에서 새로 가져오고, 보관한 최신 환율 응답을 지움.
+        - 반환값: 환율 날짜가 바뀌었으면 True, 아직 전과 같은 날짜면 False
+        - 원본 서버에 연결하지 못하면 requests.ConnectionError를 발생시킴.
+          (rate_matrix는 이때 예전 환율을 돌려주므로 viewer.offline으로 확인함)
+        """
+        previous = self.viewer._matrices.get("latest")
+        matrix = self.viewer.rate_matrix(refresh=True)
+        if self.viewer.offline:
+            raise requests.ConnectionError("원본 환율 서버에 연결할 수 없음")
+        self._responses = OrderedDict(
+            (k, v) for k, v in self._responses.items() if k[0] != "latest"
+        )
+        return previous is None or matrix.date != previous.date
+
+    # 요청 주소(target)를 보고 (상태 코드, JSON 바이트)를 만듦.
+    async def _respond(self, target):
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        day = url.path.strip("/") or "latest"
+        base = params.get("from", [SNAPSHOT_BASE])[0].upper()
+        to = params.get("to", [None])[0]
+        key = (day, base, to and to.upper())
+        body = self._responses.get(key)
+        if body is not None:
+            self._responses.move_to_end(key)
+            return 200, body
+
+        try:
+            if day != "latest":
+                date.fromisoformat(day)
+            loop = asyncio.get_running_loop()
+            # 처음 보는 날짜는 원본 서버에 물어봐야 하므로 스레드에서 실행해 다른 요청을 막지 않음.
+            matrix = await loop.run_in_executor(
+                None, self.viewer.rate_matrix, None if day == "latest" else day
+            )
+        except ValueError:
+            return 404, b'{"message": "not found"}'
+        except requests.HTTPError as e:
+            # 원본 서버가 4xx로 답하면(예: 1999년 이전 날짜) 없는 환율이므로 404로 전달함.
+            if e.response is not None and 400 <= e.response.status_code < 500:
+                return 404, b'{"message": "not found"}'
+            self.stats["upstream_errors"] += 1
+            return 502, b'{"message": "upstream unavailable"}'
+        except requests.RequestException:
+            self.stats["upstream_errors"] += 1
+            return 502, b'{"message": "upstream unavailable"}'
+        if base not in matrix:
+            return 404, b'{"message": "not found"}'
+
+        data = matrix.rates_for(base)
+        if key[2]:
+            wanted = key[2].split(",")
+            data["rates"] = {code: rate for code, rate in data["rates"].items() if code in wanted}
+        data["amount"] = 1.0
+        body = json.dumps(data).encode()
+        self._responses[key] = body
+        # 대상 통화 조합마다 키가 달라지므로, 오래 안 쓴 응답부터 버려 메모리가 계속 늘지 않게 함.
+        while len(self._responses) > DAEMON_RESPONSE_MAX_ITEMS:
+            self._responses.popitem(last=False)
+        return 200, body
+
+    # 연결 하나를 처리함. keep-alive 연결이면 같은 연결로 여러 요청을 계속 받음.
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                self.stats["requests"] += 1
+
+                if method == "GET":
+                    status, body = await self._respond(target)
+                else:
+                    status, body = 405, b'{"message": "method not allowed"}'
+                reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}.get(
+                    status, "Bad Gateway"
+                )
+                writer.write(
+                    f"HTTP/1.1 {status} {reason}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if headers.get("connection") == "close":
+                    break
+        except (ConnectionError, ValueError):
+            pass  # 연결이 끊기거나 요청 형식이 잘못되면 그 연결만 닫음.
+        finally:
+            writer.close()
+
+    # 발표 시각까지 기다렸다가 최신 환율을 새로 가져오는 일을 계속 반복함.
+    async def _refresh_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(seconds_until_publish())
+            # 새 날짜의 환율을 받을 때까지 짧은 간격으로 다시 시도함.
+            # 휴일처럼 끝내 새 환율이 없으면 다음 발표 시각이 가까워졌을 때 그만둠.
+            while True:
+                try:
+                    if await loop.run_in_executor(None, self.refresh):
+                        break
+                except requests.RequestException:
+                    # 원본 서버가 응답하지 않으면 기존 환율을 계속 씀.
+                    self.stats["upstream_errors"] += 1
+                if seconds_until_publish() <= DAEMON_RETRY_SECONDS:
+                    break
+                await asyncio.sleep(DAEMON_RETRY_SECONDS)
+
+    async def serve(self, ready=None):
+        """
+        서버를 시작하고 멈출 때까지 요청을 처리함.
+        - ready: 서버가 요청을 받을 준비가 되면 set()할 threading.Event (테스트, 벤치마크용)
+        """
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        refresher = asyncio.create_task(self._refresh_forever())
+        try:
+            # 첫 요청이 느리지 않도록 최신 환율을 미리 가져옴.
+            await asyncio.get_running_loop().run_in_executor(None, self.viewer.rate_matrix)
+        except requests.RequestException:
+            self.stats["upstream_errors"] += 1
+        if ready:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+# 클래스(Class): 환율이 정해 둔 값을 넘거나 크게 바뀌면 알려 주는 감시 도구임.
+class RateWatcher:
+    """
+    규칙(rule)은 "기준 통화 1단위가 대상 통화 몇 단위인지"에 대한 조건임.
+    - above: 값보다 커지면 / below: 값보다 작아지면 / change: 직전 환율보다 값(%) 이상 바뀌면
+    - 규칙을 NumPy 배열로 모아 두고 새 환율이 올 때 한 번에 계산하므로,
+      규칙이 수천 개여도 파이썬 반복문은 알림이 생긴 규칙에만 돎.
+    - above/below는 조건이 거짓에서 참으로 바뀔 때(처음 확인할 때 참이면 그때도) 한 번 알림.
+    - poll()은 발표 시각이 지났을 때만 조건부 요청으로 새 환율을 확인함.
+    """
+
+    KINDS = ("above", "below", "change")
+
+    def __init__(self, client=None, log_path=None):
+        self.client = client or RateClient()
+        self.log_path = Path(log_path) if log_path else None
+        # 규칙 정보를 열(column)별 리스트로 보관함. 배열은 evaluate() 때 한 번만 만듦.
+        self._bases, self._targets, self._kinds, self._values, self._callbacks = [], [], [], [], []
+        self._arrays = None
+        self._last_date = None  # 직전에 확인한 환율의 날짜
+        self._last_rates = np.array([])  # 규칙별 직전 환율 (없으면 NaN)
+        self._active = np.array([], dtype=bool)  # 규칙별로 직전에 조건이 참이었는지
+        self._positions = None  # (통화 목록, 규칙별 행 번호, 열 번호). 통화 목록이 같으면 재사용함.
+        self._next_poll = 0.0
+        # 모든 알림마다 호출할 함수 목록임. 함수는 알림 딕셔너리 하나를 인자로 받음.
+        self.listeners = []
+
+    def add_rule(self, base_currency, target_currency, kind, value, callback=None):
+        """규칙을 추가하고 번호를 반환함. callback을 주면 이 규칙의 알림 때만 호출함."""
+        if kind not in self.KINDS:
+            raise ValueError(f"지원하지 않는 규칙입니다: {kind}")
+        self._bases.append(base_currency.upper())
+        self._targets.append(target_currency.upper())
+        self._kinds.append(self.KINDS.index(kind))
+        self._values.append(float(value))
+        self._callbacks.append(callback)
+        self._arrays = None
+        self._positions = None
+        self._last_rates = np.append(self._last_rates, np.nan)
+        self._active = np.append(self._active, False)
+        return len(self._values) - 1
+
+    def evaluate(self, matrix):
+        """
+        새 환율 행렬로 모든 규칙을 한 번에 확인하고, 알림 목록(딕셔너리 리스트)을 반환함.
+        알림마다 규칙의 callback, listeners, 로그 파일에 기록함.
+        """
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self._kinds, dtype=np.int8),
+                np.array(self._values, dtype=np.float64),
+            )
+        kinds, values = self._arrays
+        # 통화 코드 -> 행렬 번호 변환은 통화 목록이 바뀔 때만 규칙 전체에 대해 한 번 함.
+        if self._positions is None or self._positions[0] != matrix.currencies:
+            self._positions = (
+                matrix.currencies,
+                matrix._indices(self._bases),
+                matrix._indices(self._targets),
+            )
+        _, rows, cols = self._positions
+        # 모르는 통화가 들어간 규칙은 NaN이 됨.
+        current = np.where((rows >= 0) & (cols >= 0), matrix.matrix[rows, cols], np.nan)
+        previous = self._last_rates
+
+        # NaN과의 비교는 항상 False이므로 모르는 통화나 직전 값이 없는 규칙은 저절로 빠짐.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = np.abs(current / previous - 1) * 100
+            active = np.where(
+                kinds == 0, current > values, np.where(kinds == 1, current < values, change >= values)
+            )
+        # above/below는 새로 참이 된 경우만, change는 조건이 맞을 때마다 알림.
+        fired = np.flatnonzero(active & ((kinds == 2) | ~self._active))
+        self._active = active
+        self._last_rates = current
+        self._last_date = matrix.date
+
+        events = []
+        for rule in fired.tolist():
+            event = {
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "rule": rule,
+                "base": self._bases[rule],
+                "target": self._targets[rule],
+                "kind": self.KINDS[kinds[rule]],
+                "value": self._values[rule],
+                "rate": float(current[rule]),
+                "previous": None if np.isnan(previous[rule]) else float(previous[rule]),
+                "date": matrix.date,
+            }
+            events.append(event)
+            if self._callbacks[rule]:
+                self._callbacks[rule](event)
+            for listener in self.listeners:
+                listener(event)
+        if events and self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        return events
+
+    def poll(self):
+        """
+        확인할 때가 되었으면 최신 환율을 조건부 요청으로 가져와 규칙을 확인함.
+        - 다음 발표 시각 전이거나, 환율이 바뀌지 않았으면 알림 없이 빈 리스트를 반환함.
+        """
+        if time.time() < self._next_poll:
+            return []
+        try:
+            data = self.client.get_rates_if_changed(SNAPSHOT_BASE)
+        except requests.RequestException:
+            data = None
+        if data is None or data["date"] == self._last_date:
+            # 발표가 늦어지는 중이거나 네트워크 오류임. 잠시 뒤에 다시 확인함.
+            self._next_poll = time.time() + WATCH_RETRY_SECONDS
+            return []
+        self._next_poll = time.time() + seconds_until_publish()
+        return self.evaluate(RateMatrix(data))
+
+    def run(self, stop=None):
+        """stop(threading.Event)이 set()될 때까지 poll()을 반복함."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(max(self._next_poll - time.time(), 1))
+
+
+# "USD/KRW>1400", "USD/KRW<1300", "EUR/USD~2" 형식의 규칙 문자열을 (기준, 대상, 종류, 값)으로 바꿈.
+def parse_watch_rule(text):
+    match = re.fullmatch(r"\s*([A-Za-z]{3})/([A-Za-z]{3})\s*([<>~])\s*([0-9.]+)\s*", text)
+    if not match:
+        raise ValueError(f"규칙 형식이 올바르지 않습니다: {text} (예: USD/KRW>1400)")
+    base, target, op, value = match.groups()
+    kind = {">": "above", "<": "below", "~": "change"}[op]
+    return base, target, kind, float(value)
+
+
+# 규칙 파일을 읽음. 한 줄에 규칙 하나이고, 빈 줄과 #으로 시작하는 줄은 건너뜀.
+def read_watch_rules(path):
+    rules = []
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            rules.append(parse_watch_rule(line))
+        except ValueError as e:
+            raise ValueError(f"{path} {number}번째 줄: {e}") from None
+    return rules
+
+
+# 기간을 입력받아 과거 환율 통계를 출력함.
+def show_history(history):
+    pair = input("기준 통화와 대상 통화를 입력하세요 (예: USD KRW)\n> ").upper().split()
+    start = input("시작 날짜를 입력하세요 (예: 2015-01-01)\n> ").strip()
+    end = input("끝 날짜를 입력하세요 (오늘까지면 Enter)\n> ").strip() or None
+    try:
+        base_currency, currency = pair
+        summary = history.summary(currency, start, end, base_currency=base_currency)
+        if summary is None:
+            print("해당 기간의 환율 정보가 없습니다.")
+            return
+        # 기간이 길면 월 대신 연 단위로 묶어 보여줌.
+        days = np.datetime64(end or date.today().isoformat()) - np.datetime64(start)
+        freq = "M" if days <= np.timedelta64(731, "D") else "Y"
+        labels, means = history.resample(
+            currency, start, end, freq, base_currency=base_currency, fetch=False
+        )
+    except ValueError:
+        print("입력 형식이 올바르지 않습니다.")
+        return
+    except requests.RequestException as e:
+        print(f"네트워크 오류가 발생했습니다: {e}")
+        return
+
+    print("\n" + "=" * 30)
+    print(f" 1 {base_currency} -> {currency} ({summary['count']}일)")
+    print(f" 최저: {summary['min']:.4f} ({summary['min_date']})")
+    print(f" 최고: {summary['max']:.4f} ({summary['max_date']})")
+    print(f" 평균: {summary['mean']:.4f}")
+    print("=" * 30)
+    for label, mean in zip(labels, means):
+        period = str(label)[:7] if freq == "M" else str(label)[:4]
+        print(f"  {period}  평균 {mean:.4f}")
+    print("=" * 30)
+
+
+# 명령줄 인자(argument) 해석기를 만듦.
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="환율 정보 뷰어. 인자 없이 실행하면 대화형 화면이 열립니다."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="여러 프로그램이 함께 쓰는 로컬 환율 서버 실행")
+    p.add_argument("--host", default=DAEMON_HOST)
+    p.add_argument("--port", type=int, default=DAEMON_PORT)
+
+    p = sub.add_parser("watch", help="환율이 정해 둔 값을 넘으면 알림")
+    p.add_argument(
+        "rules", nargs="*", help="규칙 (예: USD/KRW>1400, USD/KRW<1300, EUR/USD~2 는 2%% 이상 변동)"
+    )
+    p.add_argument("--rules-file", default=None, help="한 줄에 규칙 하나씩 적은 파일 (빈 줄과 #으로 시작하는 줄은 무시)")
+    p.add_argument("--log", default=None, help="알림을 JSON Lines로 기록할 파일")
+
+    p = sub.add_parser("export", help="환율 스냅샷 파일을 다른 곳으로 복사")
+    p.add_argument("path", help="저장할 파일 경로")
+
+    p = sub.add_parser("import", help="다른 곳에서 가져온 환율 스냅샷 파일 적용")
+    p.add_argument("path", help="가져올 스냅샷 파일 경로")
+    return parser
+
+
+# 로컬 환율 서버를 실행함. Ctrl+C로 멈출 때까지 계속 실행됨.
+def run_daemon(args):
+    daemon = RateDaemon(host=args.host, port=args.port)
+    print(f"환율 서버를 시작합니다: http://{args.host}:{args.port} (종료: Ctrl+C)")
+    print(f"다른 프로그램에서는 EXCHANGE_RATE_API=http://{args.host}:{args.port} 로 연결하세요.")
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        print(f"\n서버를 종료합니다. 처리한 요청: {daemon.stats['requests']}개")
+    return 0
+
+
+# 규칙을 등록하고 Ctrl+C로 멈출 때까지 환율을 감시함.
+def run_watch(args):
+    try:
+        rules = [parse_watch_rule(rule) for rule in args.rules]
+        if args.rules_file:
+            rules += read_watch_rules(args.rules_file)
+        if not rules:
+            raise ValueError("감시할 규칙을 하나 이상 입력하세요.")
+        watcher = RateWatcher(log_path=args.log)
+        for rule in rules:
+            watcher.add_rule(*rule)
+    except (OSError, ValueError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+    def show(event):
+        print(
+            f"[{event['date']}] {event['base']}/{event['target']} = {event['rate']:.4f}"
+            f" ({event['kind']} {event['value']:g})"
+        )
+
+    watcher.listeners.append(show)
+    print(f"규칙 {len(rules)}개로 환율 감시를 시작합니다. (종료: Ctrl+C)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n감시를 종료합니다.")
+    return 0
+
+
 # 함수(Function) 정의: 프로그램의 전체적인 흐름을 제어함.
-def main():
+def main(argv=None):
     """
     프로그램의 메인 로직을 실행하는 함수.
+    인자가 없으면 대화형 화면을, "serve"면 로컬 환율 서버를 실행함.
+    - 반환값: 종료 코드 (0이면 성공)
     """
-    # 클래스로부터 객체(Object)를 생성
-    viewer = ExchangeRateViewer()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        args = build_parser().parse_args(argv)
+        if args.command == "serve":
+            return run_daemon(args)
+        if args.command == "watch":
+            return run_watch(args)
+        try:
+            if args.command == "export":
+                export_snapshot(args.path)
+                print(f"스냅샷을 저장했습니다: {Path(args.path).resolve()}")
+            else:
+                import_snapshot(args.path)
+                print(f"스냅샷을 가져왔습니다: {RATE_SNAPSHOT_PATH}")
+        except (OSError, ValueError) as e:
+            print(f"오류: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    # 클래스로부터 객체(Object)를 생성. 디스크 캐시를 써서 다시 실행해도 캐시가 남아 있음.
+    # 스냅샷이 있으면 그 환율로 바로 시작하고, 최신 환율은 백그라운드에서 받아 옴.
+    viewer = ExchangeRateViewer(
+        RateClient(cache=RateCache(cache_dir=RATE_CACHE_DIR)), RATE_SNAPSHOT_PATH
+    )
+    viewer.refresh_in_background()
+    history = RateHistory(client=viewer.client)
 
     print("실시간 환율 정보 알리미에 오신 것을 환영합니다.")
 
@@ -113,12 +1391,22 @@ def main():
     while True:
         print("\n확인하고 싶은 기준 통화의 코드를 입력하세요.")
         base_currency = input(
-            f" (예: {', '.join(viewer.TARGET_CURRENCIES)} | 종료하려면 'q' 입력)\n> "
+            f" (예: {', '.join(viewer.TARGET_CURRENCIES)} | 과거 환율 통계는 'h' | 종료하려면 'q' 입력)\n> "
         ).upper()
 
+        if base_currency == "H":
+            show_history(history)
+            continue
+
         if base_currency == "Q":
+            stats = viewer.client.stats
+            print(
+                f"캐시 적중 {stats['hits'] + stats['disk_hits']}회, 서버 요청 {stats['misses']}회"
+            )
             print("프로그램을 종료합니다.")
-            break
+            history.close()
+            viewer.client.close()
+            return 0
 
         # 클래스의 메서드를 호출하여 환율 정보를 가져옴.
         rate_data = viewer.fetch_rates(base_currency)
@@ -130,4 +1418,4 @@ def main():
 
 # 이 스크립트 파일이 직접 실행될 때만 main() 함수를 호출함.
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,324 @@
+# PDF 처리 성능을 측정하는 스크립트임.
+# 사용법:
+#   python PDFManager/bench.py merge --sizes 10 1000 10000
+#   python PDFManager/bench.py docx --pages 200 --workers 1 2 4 8
+#   python PDFManager/bench.py reorder --pages 500
+#   python PDFManager/bench.py suite --output results.json [--profile prof_dir] [--baseline old.json]
+
+import argparse
+import cProfile
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+
+from main import reorder, run_job, stream_merge, to_docx
+
+
+# 측정용 PDF 파일을 count개 만들어 경로 목록을 반환함.
+def make_fixtures(dir_path, count, pages_per_file=2):
+    pdf_files = []
+    for i in range(count):
+        doc = fitz.open()
+        for p in range(pages_per_file):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"invoice {i} / page {p + 1}")
+        path = dir_path / f"invoice_{i:05d}.pdf"
+        doc.save(path)
+        doc.close()
+        pdf_files.append(path)
+    return pdf_files
+
+
+# 글자가 많은 pages쪽짜리 PDF 하나를 만듦. Word 변환 측정에 사용함.
+def make_text_fixture(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        for line in range(30):
+            page.insert_text(
+                (72, 60 + line * 24), f"Page {i + 1}, line {line + 1}: quarterly report text"
+            )
+    doc.save(path)
+    doc.close()
+
+
+# 스캔 문서처럼 페이지마다 압축되지 않는 이미지가 들어간 PDF를 만듦.
+def make_scanned_fixture(path, pages, image_kb=200):
+    side = int((image_kb * 1024 / 3) ** 0.5)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        # 무작위 바이트로 만든 이미지는 압축이 거의 되지 않아 실제 스캔본과 크기가 비슷함.
+        pix = fitz.Pixmap(fitz.csRGB, side, side, os.urandom(side * side * 3), False)
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+
+# 기존 방식(PyPDF2로 모든 페이지를 다시 쓰기)으로 순서를 바꿈.
+def reorder_with_pypdf2(path, order, out):
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for page_num in order:
+        writer.add_page(reader.pages[page_num - 1])
+    with open(out, "wb") as f:
+        writer.write(f)
+
+
+# 기존 방식(PdfMerger)으로 병합함.
+def merge_with_pdfmerger(pdf_files, output_path):
+    merger = PdfMerger()
+    for pdf in pdf_files:
+        merger.append(pdf)
+    pages = len(merger.pages)
+    merger.write(output_path)
+    merger.close()
+    return pages
+
+
+ENGINES = {
+    "pdfmerger": merge_with_pdfmerger,
+    "stream": stream_merge,
+}
+
+
+# 별도 프로세스에서 실행되어 걸린 시간과 최대 메모리(RSS)를 측정함.
+def run_case(engine, pdf_files, output_path):
+    start = time.perf_counter()
+    pages = ENGINES[engine](pdf_files, output_path)
+    elapsed = time.perf_counter() - start
+    # 리눅스에서 ru_maxrss 단위는 KB임.
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, pages, peak_rss_mb
+
+
+# 파일 수에 따른 병합 속도와 최대 메모리를 측정함.
+def bench_merge(args, ctx):
+    print(f"{'files':>7} {'engine':>10} {'sec':>9} {'pages/s':>10} {'peak MB':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            pdf_files = make_fixtures(tmp_path, size)
+            for engine in args.engines:
+                output_path = tmp_path / f"merged_{engine}.pdf"
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                        elapsed, pages, peak = ex.submit(
+                            run_case, engine, pdf_files, output_path
+                        ).result()
+                except Exception as e:
+                    print(f"{size:>7} {engine:>10}  실패: {e}")
+                    continue
+                print(
+                    f"{size:>7} {engine:>10} {elapsed:>9.2f} {pages / elapsed:>10.0f} {peak:>9.1f}"
+                )
+
+
+# 프로세스 수에 따른 Word 변환 속도 향상(speedup)을 측정함.
+def bench_docx(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "report.pdf"
+        make_text_fixture(pdf_path, args.pages)
+
+        print(f"{'workers':>7} {'sec':>9} {'pages/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            to_docx(pdf_path, Path(tmp) / f"report_{workers}.docx", workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>7} {elapsed:>9.2f} {args.pages / elapsed:>10.1f} {baseline / elapsed:>7.2f}x"
+            )
+
+
+# 순서 변경 방식별 걸린 시간과 디스크에 쓴 바이트 수를 비교함.
+def bench_reorder(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        source = tmp_path / "scanned.pdf"
+        make_scanned_fixture(source, args.pages)
+        source_size = source.stat().st_size
+        # 뒤쪽 절반을 앞으로 옮기는 순서임.
+        half = args.pages // 2
+        order_str = f"{half + 1}-{args.pages},1-{half}"
+        order = list(range(half + 1, args.pages + 1)) + list(range(1, half + 1))
+
+        out_pypdf2 = tmp_path / "pypdf2.pdf"
+        out_pymupdf = tmp_path / "pymupdf.pdf"
+        in_place = tmp_path / "in_place.pdf"
+        shutil.copy(source, in_place)
+        # (이름, 실행할 함수, 결과 파일) 목록임.
+        cases = [
+            ("pypdf2", lambda: reorder_with_pypdf2(source, order, out_pypdf2), out_pypdf2),
+            ("pymupdf", lambda: reorder(source, order_str, out_pymupdf), out_pymupdf),
+            ("in-place", lambda: reorder(in_place, order_str), in_place),
+        ]
+
+        print(f"원본: {args.pages}페이지, {source_size / 1024 / 1024:.1f} MB")
+        print(f"{'engine':>10} {'sec':>9} {'MB written':>11}")
+        for name, run, output in cases:
+            before = output.stat().st_size if output.exists() else 0
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            written = output.stat().st_size - before
+            print(f"{name:>10} {elapsed:>9.2f} {written / 1024 / 1024:>11.2f}")
+
+
+# 작업 하나를 실행하며 시간, 최대 메모리, 결과 파일 크기를 잼. 별도 프로세스에서 실행됨.
+def run_suite_case(job, profile_path=None):
+    """
+    - profile_path를 주면 cProfile 결과(.prof)와 tracemalloc 메모리 상위 목록(.txt)을 저장함.
+    - 반환값: (걸린 시간, 최대 RSS(MB), 결과 파일 크기 합계)
+    """
+    profiler = None
+    if profile_path:
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+
+    start = time.perf_counter()
+    outputs = profiler.runcall(run_job, job) if profiler else run_job(job)
+    elapsed = time.perf_counter() - start
+
+    if profiler:
+        profiler.dump_stats(f"{profile_path}.prof")
+        snapshot = tracemalloc.take_snapshot()
+        with open(f"{profile_path}.tracemalloc.txt", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:30]:
+                f.write(f"{stat}\n")
+        tracemalloc.stop()
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    output_bytes = sum(Path(output).stat().st_size for output in outputs)
+    return elapsed, peak_rss_mb, output_bytes
+
+
+# 측정할 (이름, 작업, 입력 페이지 수) 목록을 만듦. 작업은 main.run_job()이 받는 dict임.
+def suite_cases(fixture, kind, pages, work_dir, docx_max_pages):
+    name = f"{kind}/{pages}p"
+    merge_job = {"op": "merge", "paths": [fixture, fixture], "out": work_dir / "merged.pdf"}
+    split_job = {"op": "split", "path": fixture, "out_dir": work_dir / "split", "chunk": 10}
+    reorder_job = {
+        "op": "reorder",
+        "path": fixture,
+        "order": f"{pages}-1",
+        "out": work_dir / "reordered.pdf",
+    }
+    cases = [
+        (f"merge/{name}", merge_job, pages * 2),
+        (f"split/{name}", split_job, pages),
+        (f"reorder/{name}", reorder_job, pages),
+    ]
+    # Word 변환은 오래 걸리므로 글자 위주 문서이면서 페이지가 적을 때만 측정함.
+    if kind == "text" and pages <= docx_max_pages:
+        docx_job = {"op": "to_docx", "path": fixture, "out": work_dir / "out.docx"}
+        cases.append((f"to_docx/{name}", docx_job, pages))
+    return cases
+
+
+# 합성 PDF로 모든 작업을 측정해 JSON으로 저장하고, 기준 결과가 있으면 느려진 항목을 알려줌.
+def bench_suite(args, ctx):
+    results = []
+    print(f"{'case':<24} {'sec':>8} {'pages/s':>9} {'peak MB':>8} {'out KB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        for kind in args.kinds:
+            for pages in args.pages:
+                fixture = tmp_path / f"{kind}_{pages}.pdf"
+                if kind == "text":
+                    make_text_fixture(fixture, pages)
+                else:
+                    make_scanned_fixture(fixture, pages, image_kb=50)
+
+                for name, job, case_pages in suite_cases(
+                    fixture, kind, pages, tmp_path, args.docx_max_pages
+                ):
+                    profile_path = None
+                    if args.profile:
+                        Path(args.profile).mkdir(parents=True, exist_ok=True)
+                        profile_path = Path(args.profile) / name.replace("/", "_")
+                    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                        elapsed, peak, out_bytes = ex.submit(
+                            run_suite_case, job, profile_path
+                        ).result()
+                    results.append(
+                        {
+                            "case": name,
+                            "seconds": elapsed,
+                            "pages": case_pages,
+                            "pages_per_sec": case_pages / elapsed,
+                            "peak_rss_mb": peak,
+                            "output_bytes": out_bytes,
+                        }
+                    )
+                    print(
+                        f"{name:<24} {elapsed:>8.2f} {case_pages / elapsed:>9.0f} {peak:>8.1f} {out_bytes / 1024:>9.0f}"
+                    )
+
+    Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"결과를 {args.output}에 저장했습니다.")
+
+    if not args.baseline:
+        return 0
+    baseline = {r["case"]: r for r in json.loads(Path(args.baseline).read_text())}
+    regressions = 0
+    for r in results:
+        old = baseline.get(r["case"])
+        # 기준보다 tolerance 비율 이상 느려졌으면 성능 저하로 봄.
+        if old and r["seconds"] > old["seconds"] * (1 + args.tolerance):
+            regressions += 1
+            print(f"성능 저하: {r['case']} {old['seconds']:.2f}s -> {r['seconds']:.2f}s")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 처리 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("merge", help="병합 속도와 메모리 측정")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    p.add_argument("--engines", nargs="+", default=list(ENGINES))
+
+    p = sub.add_parser("docx", help="Word 변환 병렬 처리 측정")
+    p.add_argument("--pages", type=int, default=200)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    p = sub.add_parser("reorder", help="페이지 순서 변경 시간과 쓰기량 측정")
+    p.add_argument("--pages", type=int, default=500)
+
+    p = sub.add_parser("suite", help="합성 PDF로 모든 작업을 측정해 JSON으로 저장")
+    p.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    p.add_argument("--kinds", nargs="+", choices=["text", "image"], default=["text", "image"])
+    p.add_argument("--docx-max-pages", type=int, default=100)
+    p.add_argument("--output", default="bench_results.json")
+    p.add_argument("--profile", default=None, help="케이스별 cProfile/tracemalloc 결과를 저장할 폴더")
+    p.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    p.add_argument("--tolerance", type=float, default=0.2, help="허용하는 속도 저하 비율")
+    args = parser.parse_args()
+
+    # spawn: 측정마다 깨끗한 새 프로세스를 띄워 메모리 측정이 섞이지 않게 함.
+    ctx = multiprocessing.get_context("spawn")
+    if args.command == "merge":
+        bench_merge(args, ctx)
+    elif args.command == "docx":
+        bench_docx(args)
+    elif args.command == "reorder":
+        bench_reorder(args)
+    else:
+        return bench_suite(args, ctx)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
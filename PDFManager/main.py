@@ -1,19 +1,1577 @@
 # 이 프로그램 실행 전 터미널에 아래 명령어 입력해서
 # 필수 라이브러리 설치해야 함.
-# pip install PyPDF2 pdf2docx
+# pip install PyPDF2 pdf2docx pymupdf
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.metadata import version
+from urllib.parse import parse_qs, unquote, urlsplit
 
 # pathlib의 Path 객체를 사용함.
 from pathlib import Path
 
+import fitz  # pymupdf 라이브러리는 fitz라는 이름으로 불러옴.
+from docx import Document  # python-docx는 pdf2docx와 함께 설치됨.
+from docx.oxml.ns import qn
 from pdf2docx import Converter
 from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+# 파일 개수가 이 값 이상이면 스트리밍 방식으로 병합함.
+STREAM_MERGE_THRESHOLD = 200
+# 스트리밍 병합 시 메모리에 함께 올려둘 원본 PDF 크기 합계의 상한(바이트)임.
+STREAM_BATCH_BYTES = 64 * 1024 * 1024
+# 페이지 수가 이 값 이상이면 여러 프로세스로 나누어 분리함.
+PARALLEL_SPLIT_THRESHOLD = 100
+# 페이지 수가 이 값 이상이면 Word 변환을 여러 프로세스로 나누어 처리함.
+PARALLEL_DOCX_THRESHOLD = 20
+# Word 변환 결과를 저장해 두는 캐시의 기본 위치와 최대 크기(바이트)임.
+DOCX_CACHE_DIR = Path.home() / ".cache" / "pdfmanager" / "docx"
+DOCX_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# 용량 최적화에서 이미지를 다시 압축할 때 쓰는 JPEG 품질(0~100)의 기본값임.
+OPTIMIZE_JPEG_QUALITY = 75
+# 디렉토리 스캔 결과(페이지 수, 크기 등)를 저장하는 SQLite 파일 이름임.
+PDF_INDEX_NAME = ".pdf_index.sqlite3"
+# 인덱스를 파일로 남기지 않고 메모리에만 둘 때 쓰는 SQLite 경로임.
+PDF_INDEX_MEMORY = ":memory:"
+# 디렉토리 스캔 시 동시에 읽을 PDF 파일 수임.
+SCAN_CONCURRENCY = 16
+# 전문 검색 인덱스 파일 이름과, 텍스트 추출 작업 하나가 맡는 페이지 수임.
+PDF_SEARCH_INDEX_NAME = ".pdf_search.sqlite3"
+SEARCH_PAGES_PER_TASK = 50
+# PDF 페이지 서버의 기본 주소와 포트, 만들어 둔 페이지 PDF를 보관할 최대 개수임.
+PDF_SERVER_HOST = "127.0.0.1"
+PDF_SERVER_PORT = 8000
+PDF_SERVER_CACHE_ITEMS = 64
+# PDF 서버가 파일 내용을 한 번에 보내는 크기(바이트)임. 큰 파일도 이만큼씩만 메모리에 올림.
+PDF_SERVER_CHUNK_BYTES = 256 * 1024
+
+
+# --- API 함수: input() 없이 코드나 명령줄에서 바로 호출할 수 있는 기능들 ---
+
+
+# 파일이 있는지 확인하고 Path 객체로 돌려줌.
+def _require_file(path):
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+# 디렉토리 안의 PDF 파일들을 이름순으로 찾아 리스트로 반환함.
+def list_pdfs(dir_path):
+    dir_path = Path(dir_path)
+    # Path.is_dir(): 해당 경로가 디렉토리인지 확인.
+    if not dir_path.is_dir():
+        raise NotADirectoryError(f"유효한 디렉토리 경로가 아닙니다: {dir_path}")
+
+    pdf_files = []
+    # dir_path.iterdir()로 디렉토리 내 모든 항목을 순회함.
+    for file_path in sorted(dir_path.iterdir()):
+        # 조건문 추가: 파일이고(.is_file()), 확장자가 .pdf (대소문자 구분 없이)인 경우만 처리함.
+        if file_path.is_file() and file_path.suffix.lower() == ".pdf":
+            pdf_files.append(file_path)
+    return pdf_files
+
+
+# 경로 목록 중 디렉토리는 그 안의 PDF 파일들로 펼쳐서 반환함.
+def _expand_pdf_paths(paths):
+    pdf_files = []
+    for p in paths:
+        pdf_files.extend(list_pdfs(p) if Path(p).is_dir() else [Path(p)])
+    return pdf_files
+
+
+# os.scandir()로 디렉토리를 훑어 PDF 파일의 (경로, 크기, 수정 시각) 리스트를 만듦.
+def _walk_pdfs(dir_path, recursive):
+    found = []
+    stack = [dir_path]
+    while stack:
+        # os.scandir()는 파일 종류를 디렉토리 목록과 함께 받아 오므로 파일마다 따로 확인하지 않아도 됨.
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(".pdf"):
+                    stat = entry.stat()
+                    found.append((Path(entry.path), stat.st_size, stat.st_mtime_ns))
+    return sorted(found)
+
+
+# PDF의 앞부분 정보(trailer, 페이지 트리 루트)만 읽어 (페이지 수, 암호화 여부)를 반환함.
+def _read_pdf_header(path):
+    # 경로 대신 파일 객체를 넘기면 PyPDF2가 파일 전체를 메모리로 읽지 않고 필요한 부분만 읽음.
+    with open(path, "rb") as f:
+        try:
+            reader = PdfReader(f)
+        except Exception:
+            # 암호화된 파일은 여는 단계에서 복호화에 실패할 수 있음.
+            # 이때는 trailer가 있는 파일 끝부분에 /Encrypt가 있는지만 확인함.
+            f.seek(max(0, os.fstat(f.fileno()).st_size - 4096))
+            if b"/Encrypt" in f.read():
+                return None, True
+            raise
+        encrypted = "/Encrypt" in reader.trailer
+        try:
+            pages = int(reader.trailer["/Root"]["/Pages"]["/Count"])
+        except Exception:
+            # 암호화된 파일은 비밀번호 없이 페이지 수를 못 읽을 수 있음.
+            if not encrypted:
+                raise
+            pages = None
+    return pages, encrypted
+
+
+# 클래스(Class): 스캔한 PDF 정보를 저장해 두는 SQLite 인덱스임.
+class PdfIndex:
+    """
+    files 테이블에 경로, 크기, 수정 시각, 페이지 수, 암호화 여부, 읽기 오류를 저장함.
+    크기와 수정 시각이 같은 파일은 다음 스캔 때 다시 열지 않고 저장된 값을 씀.
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER,"
+            " pages INTEGER, encrypted INTEGER, error TEXT)"
+        )
+
+    # 저장된 모든 파일 정보를 {경로 문자열: 정보 dict} 형태로 반환함.
+    def load(self):
+        rows = self.conn.execute(
+            "SELECT path, size, mtime, pages, encrypted, error FROM files"
+        )
+        return {
+            row[0]: {
+                "path": Path(row[0]),
+                "size": row[1],
+                "mtime": row[2],
+                "pages": row[3],
+                "encrypted": bool(row[4]),
+                "error": row[5],
+            }
+            for row in rows
+        }
+
+    # 이번 스캔 결과를 저장하고, 사라진 파일(stale_paths)의 정보는 지움.
+    def save(self, records, stale_paths):
+        with self.conn:  # with 문: 블록이 끝나면 한 번에 커밋함(트랜잭션).
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        str(r["path"]),
+                        r["size"],
+                        r["mtime"],
+                        r["pages"],
+                        int(r["encrypted"]),
+                        r["error"],
+                    )
+                    for r in records
+                ],
+            )
+            self.conn.executemany(
+                "DELETE FROM files WHERE path = ?", [(p,) for p in stale_paths]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+# 디렉토리의 PDF 정보를 비동기로 모아 인덱스에 저장함.
+async def scan_pdfs_async(
+    dir_path, recursive=False, index_path=None, concurrency=SCAN_CONCURRENCY
+):
+    """
+    - 디렉토리 목록은 os.scandir()로 한 번에 읽고, 바뀐 파일만 concurrency개씩 동시에 열어
+      페이지 수와 암호화 여부를 확인함. (네트워크 드라이브처럼 응답이 느린 곳에서 효과가 큼)
+    - index_path: SQLite 인덱스 경로. None이면 디렉토리 안의 PDF_INDEX_NAME이고,
+      디렉토리에 쓸 수 없으면(읽기 전용, 네트워크 드라이브 등) 메모리 인덱스로 대신함.
+      PDF_INDEX_MEMORY(":memory:")를 주면 파일을 만들지 않음.
+    - 반환값: 경로순으로 정렬된 파일 정보 dict 리스트
+      (path, size, mtime, pages, encrypted, error)
+    """
+    dir_path = Path(dir_path).resolve()
+    if not dir_path.is_dir():
+        raise NotADirectoryError(f"유효한 디렉토리 경로가 아닙니다: {dir_path}")
+
+    if index_path:
+        index = PdfIndex(index_path)
+    else:
+        try:
+            index = PdfIndex(dir_path / PDF_INDEX_NAME)
+        except sqlite3.OperationalError:
+            index = PdfIndex(PDF_INDEX_MEMORY)
+    try:
+        known = index.load()
+        # asyncio.to_thread(): 오래 걸리는 파일 작업을 스레드에서 실행해 기다리는 동안 다른 일을 함.
+        entries = await asyncio.to_thread(_walk_pdfs, dir_path, recursive)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def read(path, size, mtime):
+            record = known.get(str(path))
+            # 크기와 수정 시각이 그대로면 파일을 다시 열지 않음.
+            if record and (record["size"], record["mtime"]) == (size, mtime):
+                return record
+            record = {"path": path, "size": size, "mtime": mtime}
+            async with semaphore:
+                try:
+                    pages, encrypted = await asyncio.to_thread(_read_pdf_header, path)
+                    record.update(pages=pages, encrypted=encrypted, error=None)
+                except Exception as e:
+                    record.update(pages=None, encrypted=False, error=str(e))
+            return record
+
+        records = await asyncio.gather(*(read(*entry) for entry in entries))
+
+        # 이번에 훑은 범위 안에 있었는데 지금은 없는 파일은 인덱스에서 지움.
+        current = {str(r["path"]) for r in records}
+        stale = [
+            p
+            for p, r in known.items()
+            if p not in current
+            and (
+                r["path"].parent == dir_path
+                or (recursive and r["path"].is_relative_to(dir_path))
+            )
+        ]
+        index.save(records, stale)
+        return records
+    finally:
+        index.close()
+
+
+# 동기(일반) 코드에서 부르기 위한 scan_pdfs_async()의 감싸기 함수임.
+def scan_pdfs(dir_path, recursive=False, index_path=None, concurrency=SCAN_CONCURRENCY):
+    return asyncio.run(scan_pdfs_async(dir_path, recursive, index_path, concurrency))
+
+
+# 1. 여러 PDF 파일을 순서대로 하나로 합침.
+def merge(paths, out, streaming=None, incremental=False):
+    """
+    paths의 PDF 파일들을 순서대로 합쳐 out에 저장함.
+    - streaming: True/False로 방식을 고정함. None이면 파일 수를 보고 자동으로 정함.
+    - incremental: True면 merge_incremental()로 새로 생긴 파일만 덧붙임.
+    - 반환값: 저장된 파일 경로
+    """
+    if incremental:
+        merge_incremental(paths, out)
+        return Path(out)
+
+    pdf_files = [_require_file(p) for p in paths]
+    if not pdf_files:
+        raise ValueError("병합할 PDF 파일이 없습니다.")
+
+    output_path = Path(out)
+    if streaming is None:
+        streaming = len(pdf_files) >= STREAM_MERGE_THRESHOLD
+
+    # 파일이 많으면 모든 파일을 메모리에 올리지 않도록 스트리밍 방식을 사용함.
+    if streaming:
+        stream_merge(pdf_files, output_path)
+    else:
+        # PdfMerger 객체 생성함.
+        merger = PdfMerger()
+
+        # for 반복문: 찾은 각 PDF 파일(Path 객체)에 대해 반복함.
+        for pdf in pdf_files:
+            merger.append(pdf)
+
+        merger.write(output_path)
+        merger.close()
+    return output_path
+
+
+# 많은 PDF를 적은 메모리로 합치는 스트리밍 병합 함수임.
+def stream_merge(pdf_files, output_path, max_batch_bytes=STREAM_BATCH_BYTES, append=False):
+    """
+    PDF 파일들을 하나씩 읽으면서 결과 파일에 바로 이어 붙임.
+    - 각 원본 파일은 페이지 복사가 끝나는 즉시 닫음.
+    - 원본을 붙이기 전에 크기를 먼저 확인해서, 붙이면 원본 크기 합계가 max_batch_bytes를
+      넘을 때는 먼저 결과 파일에 증분 저장하고 메모리에 쌓인 페이지를 비움.
+      그래서 파일 수와 상관없이 메모리 사용량이 일정함.
+    - 원본 하나가 max_batch_bytes보다 크면 페이지 범위로 나누어 붙이면서 중간중간 저장함.
+      (페이지마다 크기가 다르므로 이 경우의 상한은 평균 페이지 크기 기준의 근사치임)
+    - append: True면 이미 있는 output_path 뒤에 증분 저장으로 페이지를 덧붙임.
+    - 반환값: 새로 병합된 페이지 수
+    """
+    output_path = Path(output_path)
+    if append:
+        # 증분 저장은 파일 끝에 덧붙이기만 하므로, 실패하면 원래 길이로 잘라 되돌릴 수 있음.
+        part_path = output_path
+        original = output_path.stat()
+        out = fitz.open(output_path)
+    else:
+        # 작업 중에는 임시 파일에 쓰고, 모두 성공했을 때만 최종 이름으로 바꿈.
+        part_path = output_path.with_name(output_path.name + ".part")
+        part_path.unlink(missing_ok=True)
+        out = fitz.open()
+
+    batch_bytes = 0
+    total_pages = 0
+    try:
+        for pdf in pdf_files:
+            # with 문: 블록이 끝나면 원본 파일을 자동으로 닫음.
+            size = Path(pdf).stat().st_size
+            # 붙이기 전에 확인함: 이번 파일까지 올리면 상한을 넘는다면 먼저 비움.
+            if batch_bytes and batch_bytes + size > max_batch_bytes:
+                out = _flush_merged(out, part_path)
+                batch_bytes = 0
+
+            with fitz.open(pdf) as src:
+                if size <= max_batch_bytes:
+                    out.insert_pdf(src)
+                    batch_bytes += size
+                else:
+                    # 너무 큰 원본은 상한에 맞는 페이지 수만큼씩 나누어 붙이고 바로 저장함.
+                    step = max(1, src.page_count * max_batch_bytes // size)
+                    for start in range(0, src.page_count, step):
+                        end = min(start + step, src.page_count)
+                        out.insert_pdf(src, from_page=start, to_page=end - 1)
+                        out = _flush_merged(out, part_path)
+                total_pages += src.page_count
+
+        _flush_merged(out, part_path).close()
+    except Exception:
+        out.close()
+        if append:
+            os.truncate(output_path, original.st_size)
+            # 수정 시각도 되돌려서 원본 기록(sources.json)이 계속 유효하게 함.
+            os.utime(output_path, ns=(original.st_atime_ns, original.st_mtime_ns))
+        else:
+            part_path.unlink(missing_ok=True)
+        raise
+
+    if append:
+        return total_pages
+    if total_pages == 0:
+        raise ValueError("병합할 페이지가 없습니다.")
+
+    # Path.replace(): 임시 파일을 최종 파일 이름으로 바꿈(기존 파일은 덮어씀).
+    part_path.replace(output_path)
+    return total_pages
+
+
+# 파일 내용을 1MB씩 읽어 해시 객체 h에 넣음. 큰 파일도 메모리를 적게 씀.
+def _hash_file(h, path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h
+
+
+# 병합에 들어간 원본 파일 하나의 기록(경로, 크기, 수정 시각, 해시)을 만듦.
+def _source_record(path):
+    stat = path.stat()
+    return {
+        "path": str(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": _hash_file(hashlib.sha256(), path).hexdigest(),
+    }
+
+
+# 결과 PDF 옆에 두는 원본 기록 파일의 경로임. (예: result.pdf -> result.pdf.sources.json)
+def _sources_path(output_path):
+    return output_path.with_name(output_path.name + ".sources.json")
+
+
+# 기록 파일을 읽고, 기록 이후로 결과 PDF가 바뀌지 않았을 때만 원본 기록 리스트를 반환함.
+def _load_sources(output_path):
+    sources_path = _sources_path(output_path)
+    if not (output_path.exists() and sources_path.exists()):
+        return None
+    data = json.loads(sources_path.read_text(encoding="utf-8"))
+    stat = output_path.stat()
+    if (stat.st_size, stat.st_mtime_ns) != (data["output_size"], data["output_mtime"]):
+        return None
+    return data["sources"]
+
+
+def _save_sources(output_path, sources):
+    stat = output_path.stat()
+    data = {
+        "output_size": stat.st_size,
+        "output_mtime": stat.st_mtime_ns,
+        "sources": sources,
+    }
+    _sources_path(output_path).write_text(json.dumps(data), encoding="utf-8")
+
+
+# 이미 병합된 결과 파일에 새로 생긴 PDF만 덧붙임.
+def merge_incremental(paths, out):
+    """
+    결과 파일에 어떤 원본이 들어갔는지 out.sources.json에 기록해 두고,
+    다음 실행 때는 기록에 없는 파일만 증분 저장으로 덧붙임. (전체 작업량 대신 새 파일 수만큼만 일함)
+    - 기록이 없거나, 결과 파일이 기록 이후 바뀌었거나, 이미 들어간 원본이 지워지거나 내용이 바뀌었으면
+      처음부터 다시 병합함.
+    - 새 파일은 이름 순서와 상관없이 항상 결과 파일의 끝에 붙음.
+    - 반환값: (이번에 병합한 파일 리스트, 처음부터 다시 병합했는지 여부)
+    """
+    pdf_files = [_require_file(p).resolve() for p in paths]
+    if not pdf_files:
+        raise ValueError("병합할 PDF 파일이 없습니다.")
+    output_path = Path(out).resolve()
+
+    sources = _load_sources(output_path)
+    rebuild = sources is None
+    if not rebuild:
+        current = {str(p) for p in pdf_files}
+        for record in sources:
+            path = Path(record["path"])
+            if record["path"] not in current:
+                rebuild = True
+                break
+            stat = path.stat()
+            if (stat.st_size, stat.st_mtime_ns) == (record["size"], record["mtime"]):
+                continue
+            # 수정 시각만 바뀐 경우도 있으므로 크기가 같으면 해시로 내용을 다시 확인함.
+            new_record = _source_record(path)
+            if new_record["sha256"] != record["sha256"]:
+                rebuild = True
+                break
+            record.update(new_record)
+
+    if rebuild:
+        stream_merge(pdf_files, output_path)
+        sources = [_source_record(p) for p in pdf_files]
+        _save_sources(output_path, sources)
+        return pdf_files, True
+
+    known = {record["path"] for record in sources}
+    new_files = [p for p in pdf_files if str(p) not in known]
+    if new_files:
+        stream_merge(new_files, output_path, append=True)
+        sources.extend(_source_record(p) for p in new_files)
+    _save_sources(output_path, sources)
+    return new_files, False
+
+
+# 지금까지 모은 페이지를 파일에 쓰고, 메모리를 비운 문서를 다시 열어 반환함.
+def _flush_merged(out, part_path):
+    if out.page_count == 0:
+        return out
+    if out.name:
+        # 이미 파일로 저장된 문서라면 바뀐 부분만 파일 끝에 덧붙임(증분 저장).
+        out.saveIncr()
+    else:
+        out.save(part_path)
+    out.close()
+    # 다시 열면 페이지 내용은 필요할 때만 읽으므로 메모리가 거의 들지 않음.
+    return fitz.open(part_path)
+
+
+# 분리된 파일 이름을 정함. 같은 입력이면 항상 같은 이름이 나옴.
+def _split_filename(base_name, start, end):
+    # 한 페이지짜리 조각(마지막 조각 포함)은 _pages_3-3 대신 _page_3으로 씀.
+    if end - start == 1:
+        return f"{base_name}_page_{start + 1}.pdf"
+    return f"{base_name}_pages_{start + 1}-{end}.pdf"
+
 
+# 작업 프로세스 하나가 맡은 페이지 구간들을 각각 파일로 저장함.
+def _split_shard(file_path, page_ranges, output_dir):
+    file_path = Path(file_path)
+    output_files = []
+    # mmap: 파일을 메모리에 매핑해서 여러 프로세스가 같은 페이지 캐시를 공유함.
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as source:
+        reader = PdfReader(source)
+        for start, end in page_ranges:
+            writer = PdfWriter()
+            for i in range(start, end):
+                writer.add_page(reader.pages[i])
+
+            output_path = Path(output_dir) / _split_filename(file_path.stem, start, end)
+            with open(output_path, "wb") as out:
+                writer.write(out)
+            output_files.append(output_path)
+    return output_files
+
+
+# 2. PDF를 chunk 페이지씩 나누어 여러 파일로 저장함.
+def split(path, out_dir=".", chunk=1, workers=None):
+    """
+    PDF 파일을 chunk 페이지씩 잘라서 out_dir에 저장함.
+    - 페이지 수가 PARALLEL_SPLIT_THRESHOLD 이상이면 페이지 구간을 여러 프로세스에 나눠 줌.
+    - workers: 사용할 프로세스 수 (None이면 CPU 코어 수)
+    - 반환값: 저장된 파일 경로 리스트 (페이지 순서대로)
+    """
+    if chunk < 1:
+        raise ValueError("chunk는 1 이상이어야 합니다.")
+
+    file_path = _require_file(path)
+    output_dir = Path(out_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    total_pages = len(PdfReader(file_path).pages)
+    # (시작, 끝) 페이지 구간 리스트를 만듦. 끝 번호는 포함하지 않음.
+    page_ranges = [
+        (start, min(start + chunk, total_pages))
+        for start in range(0, total_pages, chunk)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if total_pages < PARALLEL_SPLIT_THRESHOLD or workers == 1:
+        return _split_shard(file_path, page_ranges, output_dir)
+
+    # 작업 프로세스마다 연속된 구간 묶음을 하나씩 맡김.
+    # 프로세스마다 문서를 한 번씩 다시 읽어야 하므로 묶음 수는 프로세스 수만큼만 만듦.
+    shard_size = -(-len(page_ranges) // workers)  # 올림 나눗셈
+    shards = [
+        page_ranges[i : i + shard_size] for i in range(0, len(page_ranges), shard_size)
+    ]
+    output_files = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_split_shard, file_path, shard, output_dir)
+            for shard in shards
+        ]
+        # 제출한 순서대로 결과를 모으므로 파일 목록의 순서가 항상 같음.
+        for future in futures:
+            output_files.extend(future.result())
+    return output_files
+
+
+# "1-10,50,11-49" 같은 페이지 범위 문자열을 페이지 번호 리스트로 바꿈.
+def parse_page_ranges(text, total_pages):
+    """
+    - 쉼표로 구분한 각 항목은 숫자 하나(50) 또는 범위(1-10)임. 10-1처럼 거꾸로 쓰면 역순이 됨.
+    - 페이지 번호는 1부터 시작하며 total_pages를 넘을 수 없음.
+    - 반환값: 1부터 시작하는 페이지 번호 리스트
+    """
+    pages = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        # str.partition(): '-'를 기준으로 앞, 구분자, 뒤 세 부분으로 나눔.
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if dash else start
+        except ValueError:
+            raise ValueError(f"잘못된 페이지 범위입니다: '{part}'") from None
+        if not (1 <= start <= total_pages and 1 <= end <= total_pages):
+            raise ValueError(f"페이지 번호는 1~{total_pages} 사이여야 합니다: '{part}'")
+        step = 1 if end >= start else -1
+        pages.extend(range(start, end + step, step))
+    return pages
+
+
+# 3. PDF 페이지 순서를 바꿔 저장함.
+def reorder(path, order, out=None):
+    """
+    order 순서대로 페이지를 다시 배치해 out에 저장함.
+    - order: 1부터 시작하는 페이지 번호 리스트 또는 "1-10,50,11-49" 같은 범위 문자열
+    - 모든 페이지를 중복 없이 한 번씩 포함해야 함.
+    - 페이지 목록(page tree)만 새로 만들고 페이지 내용(content stream)은 압축된 그대로 복사함.
+    - out을 생략하거나 원본과 같은 경로로 주면 원본 파일 끝에 바뀐 부분만 덧붙임(증분 저장).
+    - 반환값: 저장된 파일 경로
+    """
+    file_path = _require_file(path)
+    output_path = Path(out) if out else file_path
+
+    with fitz.open(file_path) as doc:
+        total_pages = doc.page_count
+        if isinstance(order, str):
+            new_order = parse_page_ranges(order, total_pages)
+        else:
+            new_order = [int(p) for p in order]
+
+        # 유효성 검사임.
+        if len(new_order) != total_pages or sorted(new_order) != list(
+            range(1, total_pages + 1)
+        ):
+            raise ValueError(
+                "페이지 번호가 잘못되었습니다. 모든 페이지를 중복 없이 입력해야 합니다."
+            )
+
+        # 사용자는 1부터 시작하는 번호 입력하지만, 실제 인덱스는 0부터 시작하므로 1을 빼줘야 함.
+        doc.select([page_num - 1 for page_num in new_order])
+
+        if output_path.resolve() == file_path.resolve():
+            doc.saveIncr()
+        else:
+            doc.save(output_path)
+    return output_path
+
+
+# 결과 PDF의 용량을 줄임. 병합/분리/순서 변경 결과에 이어서 실행함.
+def optimize_pdf(path, dpi=None, quality=None):
+    """
+    - 내용이 같은 객체(여러 원본에 반복된 로고, 글꼴, 이미지 등)는 해시로 비교해 하나만 남김.
+    - dpi를 주면 그보다 20% 넘게 해상도가 높은 이미지를 dpi에 맞게 줄임.
+    - quality를 주면(또는 dpi를 주면) 이미지를 그 품질의 JPEG로 다시 압축함.
+    - 반환값: (최적화 전 크기, 최적화 후 크기) 바이트
+    """
+    file_path = _require_file(path)
+    before = file_path.stat().st_size
+    tmp_path = file_path.with_name(file_path.name + ".opt")
+
+    with fitz.open(file_path) as doc:
+        if dpi or quality:
+            doc.rewrite_images(
+                dpi_threshold=int(dpi * 1.2) if dpi else None,
+                dpi_target=dpi or 0,
+                quality=quality or OPTIMIZE_JPEG_QUALITY,
+            )
+        # garbage=4: 같은 내용의 객체와 스트림을 하나로 합침. deflate: 압축 안 된 스트림을 압축함.
+        doc.save(tmp_path, garbage=4, deflate=True, use_objstms=1)
+
+    after = tmp_path.stat().st_size
+    # 결과가 오히려 커졌다면 원본을 그대로 둠.
+    if after < before:
+        tmp_path.replace(file_path)
+    else:
+        tmp_path.unlink()
+        after = before
+    return before, after
+
+
+def linearize_pdf(path):
+    """
+    PDF를 "빠른 웹 보기"(linearized) 형식으로 다시 씀. 첫 페이지에 필요한 객체가 파일 앞쪽에
+    모이므로, 브라우저가 파일 전체를 받기 전에 첫 페이지를 보여줄 수 있음.
+    - pymupdf 1.26부터 linearize 저장을 지원하지 않으므로 qpdf 프로그램을 사용함.
+    - 반환값: 파일 경로(Path)
+    """
+    file_path = _require_file(path)
+    qpdf = shutil.which("qpdf")
+    if qpdf is None:
+        raise FileNotFoundError(
+            "웹용 저장(linearize)에는 qpdf 프로그램이 필요합니다. (예: apt install qpdf)"
+        )
+    tmp_path = file_path.with_name(file_path.name + ".lin")
+    result = subprocess.run(
+        [qpdf, "--linearize", str(file_path), str(tmp_path)], capture_output=True, text=True
+    )
+    # qpdf의 종료 코드 3은 "경고가 있었지만 성공"임.
+    if result.returncode not in (0, 3):
+        tmp_path.unlink(missing_ok=True)
+        raise ValueError(f"웹용 저장에 실패했습니다: {result.stderr.strip()}")
+    tmp_path.replace(file_path)
+    return file_path
+
+
+# 작업 프로세스 하나가 맡은 페이지 구간[start, end)만 분석해서 결과(dict)를 돌려줌.
+def _parse_docx_pages(pdf_path, start, end):
+    cv = Converter(str(pdf_path))
+    try:
+        settings = cv.default_settings
+        cv.load_pages(start, end).parse_document(**settings).parse_pages(**settings)
+        return cv.store()
+    finally:
+        cv.close()
+
+
+# 4. PDF를 Word(.docx) 파일로 변환함.
+def to_docx(path, out=None, workers=1, progress=None):
+    """
+    PDF 파일을 .docx 파일로 변환함.
+    - out을 생략하면 PDF와 같은 위치에 확장자만 .docx로 바꿔 저장함.
+    - workers: 페이지 분석에 사용할 프로세스 수 (None이면 CPU 코어 수).
+      페이지가 PARALLEL_DOCX_THRESHOLD 이상일 때만 여러 프로세스를 사용함.
+    - progress: 구간 하나가 끝날 때마다 progress(끝난 페이지 수, 전체 페이지 수)를 호출함.
+    - 반환값: 저장된 파일 경로
+    """
+    pdf_path = _require_file(path)
+    # Path.with_suffix(): 파일의 확장자만 변경함.
+    docx_path = Path(out) if out else pdf_path.with_suffix(".docx")
+
+    workers = workers or os.cpu_count() or 1
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+
+    # Converter 클래스 이용해 객체 생성함. 라이브러리가 문자열을 요구할 수 있으므로 str()로 변환.
+    cv = Converter(str(pdf_path))
+    try:
+        if workers == 1 or total_pages < PARALLEL_DOCX_THRESHOLD:
+            cv.convert(str(docx_path))
+        else:
+            # 페이지를 연속된 구간으로 나누어 각 프로세스가 분석하고, 결과만 모아서 문서를 만듦.
+            step = -(-total_pages // workers)  # 올림 나눗셈
+            ranges = [
+                (start, min(start + step, total_pages))
+                for start in range(0, total_pages, step)
+            ]
+            done = 0
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_parse_docx_pages, pdf_path, start, end): end - start
+                    for start, end in ranges
+                }
+                for future in as_completed(futures):
+                    cv.restore(future.result())
+                    done += futures[future]
+                    if progress:
+                        progress(done, total_pages)
+            cv.make_docx(str(docx_path), **cv.default_settings)
+    finally:
+        cv.close()
+    return docx_path
+
+
+# 디렉토리 안의 PDF들을 여러 프로세스로 동시에 Word 파일로 변환함.
+def to_docx_dir(dir_path, out_dir=None, workers=None, progress=None):
+    """
+    - out_dir을 생략하면 각 PDF와 같은 위치에 저장함.
+    - workers: 동시에 사용할 전체 프로세스 수. 파일 하나는 프로세스 하나가 맡음.
+    - progress: 파일 하나가 끝날 때마다 progress(끝난 파일 수, 전체 파일 수)를 호출함.
+    - 반환값: {PDF 경로: 저장된 docx 경로 또는 발생한 예외} 딕셔너리
+    """
+    pdf_files = list_pdfs(dir_path)
+    if out_dir:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for pdf in pdf_files:
+            out = Path(out_dir) / pdf.with_suffix(".docx").name if out_dir else None
+            futures[executor.submit(to_docx, pdf, out)] = pdf
+        for future in as_completed(futures):
+            pdf = futures[future]
+            try:
+                results[pdf] = future.result()
+            except Exception as e:
+                results[pdf] = e
+            if progress:
+                progress(len(results), len(pdf_files))
+    return results
+
+
+# 메모리에 있는 PDF(bytes)를 Word 파일로 변환함. 캐시와 파이프라인에서 사용함.
+def _convert_pdf_bytes(pdf_bytes, docx_path, settings):
+    cv = Converter(stream=pdf_bytes)
+    try:
+        cv.convert(str(docx_path), **settings)
+    finally:
+        cv.close()
+    return docx_path
+
+
+# 여러 Word 파일을 순서대로 이어 붙여 하나의 파일로 저장함.
+def _combine_docx(part_paths, out):
+    master = Document(part_paths[0])
+    body = master.element.body
+    for part_path in part_paths[1:]:
+        sub = Document(part_path)
+        # 앞 문서의 마지막 구역 설정(용지 크기, 여백)을 문단 안으로 옮겨 구역을 닫음.
+        section_end = master.add_paragraph()._p
+        section_end.get_or_add_pPr().append(body.sectPr)
+        body.append(section_end)
+
+        # 그림과 링크는 rId로 연결되어 있으므로 새 문서 기준의 rId로 바꿔줌.
+        for el in sub.element.body.iter():
+            for attr in (qn("r:embed"), qn("r:id")):
+                rid = el.get(attr)
+                if not rid or rid not in sub.part.rels:
+                    continue
+                rel = sub.part.rels[rid]
+                if rel.is_external:
+                    new_rid = master.part.relate_to(rel.target_ref, rel.reltype, True)
+                else:
+                    new_rid, _ = master.part.get_or_add_image(
+                        io.BytesIO(rel.target_part.blob)
+                    )
+                el.set(attr, new_rid)
+
+        # 마지막 구역 설정(sectPr)까지 그대로 옮기므로 뒤 문서의 용지 설정이 유지됨.
+        for el in list(sub.element.body):
+            body.append(el)
+    master.save(str(out))
+    return out
+
+
+# 클래스(Class): PDF→Word 변환 결과를 디스크에 저장해 두고 다시 쓰는 캐시임.
+class DocxCache:
+    """
+    같은 PDF를 다시 변환하면 저장해 둔 .docx를 바로 돌려줌.
+    - 키: PDF 내용의 SHA-256 해시 + 변환 설정 + pdf2docx 버전
+    - 문서 전체가 바뀌었을 때는 페이지마다 따로 캐시를 찾아서, 바뀐 페이지만 다시 변환함.
+      (페이지를 따로 변환하므로 여러 페이지에 걸친 머리글/바닥글 분석은 하지 않음)
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 파일부터 지움(LRU).
+    - stats: hits / misses(문서 단위), page_hits / page_misses, bytes_saved(캐시에서 바로 준 바이트 수)
+    """
+
+    def __init__(self, cache_dir=DOCX_CACHE_DIR, max_bytes=DOCX_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.docs_dir = self.cache_dir / "docs"
+        self.pages_dir = self.cache_dir / "pages"
+        self.docs_dir.mkdir(parents=True, exist_ok=True)
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        self.stats_path = self.cache_dir / "stats.json"
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "page_hits": 0,
+            "page_misses": 0,
+            "bytes_saved": 0,
+        }
+        # 이전 실행에서 저장해 둔 통계가 있으면 이어서 셈.
+        if self.stats_path.exists():
+            self.stats.update(json.loads(self.stats_path.read_text()))
+
+    # 변환 설정과 pdf2docx 버전을 해시에 섞어서, 설정이 다르면 다른 키가 나오게 함.
+    def _hasher(self, settings):
+        h = hashlib.sha256()
+        h.update(version("pdf2docx").encode())
+        h.update(json.dumps(settings, sort_keys=True).encode())
+        return h
+
+    # 캐시 파일을 out으로 복사하고, 최근에 사용했다고 표시함(수정 시각 갱신).
+    def _serve(self, cached, out):
+        os.utime(cached)
+        shutil.copyfile(cached, out)
+        self.stats["bytes_saved"] += cached.stat().st_size
+
+    def convert(self, path, out=None, settings=None, workers=None):
+        """
+        PDF를 .docx로 변환하되, 캐시에 있으면 변환하지 않고 복사함.
+        - settings: pdf2docx Converter.convert()에 넘길 설정 (dict)
+        - workers: 바뀐 페이지들을 변환할 프로세스 수
+        - 반환값: 저장된 파일 경로
+        """
+        pdf_path = _require_file(path)
+        docx_path = Path(out) if out else pdf_path.with_suffix(".docx")
+        settings = settings or {}
+
+        h = _hash_file(self._hasher(settings), pdf_path)
+        doc_cached = self.docs_dir / f"{h.hexdigest()}.docx"
+
+        try:
+            if doc_cached.exists():
+                self.stats["hits"] += 1
+                self._serve(doc_cached, docx_path)
+                return docx_path
+
+            self.stats["misses"] += 1
+            part_paths = self._convert_pages(pdf_path, settings, workers)
+            _combine_docx(part_paths, doc_cached)
+            shutil.copyfile(doc_cached, docx_path)
+            self._evict()
+            return docx_path
+        finally:
+            self.stats_path.write_text(json.dumps(self.stats))
+
+    # 페이지마다 캐시를 확인하고, 없는 페이지만 변환해서 페이지 캐시 경로 리스트를 반환함.
+    def _convert_pages(self, pdf_path, settings, workers):
+        part_paths = []
+        missing = {}
+        with fitz.open(pdf_path) as doc:
+            for i in range(doc.page_count):
+                # 페이지 하나만 담은 PDF를 만들어 그 내용으로 페이지 키를 계산함.
+                with fitz.open() as single:
+                    single.insert_pdf(doc, from_page=i, to_page=i)
+                    page_bytes = single.tobytes(garbage=3, no_new_id=True)
+                h = self._hasher(settings)
+                h.update(page_bytes)
+                cached = self.pages_dir / f"{h.hexdigest()}.docx"
+                part_paths.append(cached)
+
+                if cached.exists():
+                    self.stats["page_hits"] += 1
+                    os.utime(cached)
+                    self.stats["bytes_saved"] += cached.stat().st_size
+                elif cached not in missing:
+                    self.stats["page_misses"] += 1
+                    missing[cached] = page_bytes
+
+        if len(missing) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_convert_pdf_bytes, page_bytes, cached, settings)
+                    for cached, page_bytes in missing.items()
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            for cached, page_bytes in missing.items():
+                _convert_pdf_bytes(page_bytes, cached, settings)
+        return part_paths
+
+    # 전체 크기가 한도를 넘으면 수정 시각이 가장 오래된 파일부터 지움.
+    def _evict(self):
+        files = [p for d in (self.docs_dir, self.pages_dir) for p in d.iterdir()]
+        total = sum(p.stat().st_size for p in files)
+        for p in sorted(files, key=lambda p: p.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            total -= p.stat().st_size
+            p.unlink()
+
+
+# 클래스(Class): 파이프라인 안의 출력 갈래(branch) 하나임. PdfPipeline.branch()로 만듦.
+class PdfBranch:
+    """
+    원본 페이지 목록에 단계(stage)를 이어 붙여 출력물 하나(또는 여러 개)를 만듦.
+    - 각 메서드는 self를 반환하므로 pipe.branch().select("1-20").reorder("20-1").write("a.pdf")
+      처럼 이어서 쓸 수 있음.
+    - 페이지는 (문서 경로, 페이지 인덱스) 목록으로만 들고 있다가 run() 때 한 번에 만듦.
+    """
 
-# 클래스(Class): PDF 처리 관련 모든 기능(메서드)을 담은 설계도임.
+    def __init__(self, pipeline, pages):
+        self.pipeline = pipeline
+        self.pages = pages
+        self.outputs = []  # (종류, 경로) 리스트. 종류는 "pdf" 또는 "docx"
+
+    # 현재 페이지 중 일부만 남김. pages는 현재 목록 기준 1부터 시작하는 번호나 범위 문자열임.
+    def select(self, pages):
+        if isinstance(pages, str):
+            pages = parse_page_ranges(pages, len(self.pages))
+        # 0이나 음수가 파이썬의 뒤에서부터 세는 인덱스가 되지 않도록 범위를 먼저 확인함.
+        for p in pages:
+            if not 1 <= p <= len(self.pages):
+                raise ValueError(f"페이지 번호는 1~{len(self.pages)} 사이여야 합니다: '{p}'")
+        self.pages = [self.pages[p - 1] for p in pages]
+        return self
+
+    # 현재 페이지 전체의 순서를 바꿈. 모든 페이지를 중복 없이 한 번씩 포함해야 함.
+    def reorder(self, order):
+        if isinstance(order, str):
+            order = parse_page_ranges(order, len(self.pages))
+        if sorted(order) != list(range(1, len(self.pages) + 1)):
+            raise ValueError(
+                "페이지 번호가 잘못되었습니다. 모든 페이지를 중복 없이 입력해야 합니다."
+            )
+        return self.select(order)
+
+    # 다른 PDF 파일들의 모든 페이지를 뒤에 붙임. 여러 갈래에서 같은 파일을 써도 한 번만 엶.
+    def merge(self, *paths):
+        for path in paths:
+            doc = self.pipeline._open(path)
+            self.pages.extend((doc, i) for i in range(doc.page_count))
+        return self
+
+    def write(self, out):
+        self.outputs.append(("pdf", Path(out)))
+        return self
+
+    def to_docx(self, out):
+        self.outputs.append(("docx", Path(out)))
+        return self
+
+    # 페이지 목록으로 새 문서를 만듦. 같은 원본에서 연속된 페이지는 한 번에 복사함.
+    def _build(self):
+        out = fitz.open()
+        i = 0
+        while i < len(self.pages):
+            doc, start = self.pages[i]
+            end = start
+            while (
+                i + 1 < len(self.pages)
+                and self.pages[i + 1][0] is doc
+                and self.pages[i + 1][1] == end + 1
+            ):
+                i += 1
+                end += 1
+            out.insert_pdf(doc, from_page=start, to_page=end)
+            i += 1
+        return out
+
+
+# 클래스(Class): 원본 PDF를 한 번만 열어 여러 출력물을 만드는 파이프라인임.
+class PdfPipeline:
+    """
+    예) 한 번 읽은 책 PDF로 장(chapter)별 파일과 Word 파일을 함께 만듦.
+        pipe = PdfPipeline("book.pdf")
+        pipe.branch().select("1-20").write("ch1.pdf")
+        pipe.branch().select("21-40").reorder("20-1").to_docx("ch2.docx")
+        pipe.branch().select("41-60").merge("appendix.pdf").write("ch3.pdf")
+        pipe.run()
+    - 원본과 merge()로 붙이는 파일은 각각 한 번만 열어서 모든 갈래가 함께 씀.
+    - Word 변환처럼 오래 걸리는 출력은 여러 프로세스에서 동시에 실행함.
+    """
+
+    def __init__(self, path):
+        self._docs = {}
+        self.source = self._open(path)
+        self.branches = []
+
+    # 같은 파일은 한 번만 열도록 경로별로 열린 문서를 저장해 둠.
+    def _open(self, path):
+        key = _require_file(path).resolve()
+        if key not in self._docs:
+            self._docs[key] = fitz.open(key)
+        return self._docs[key]
+
+    # 원본 전체 페이지에서 시작하는 새 갈래를 만듦.
+    def branch(self):
+        branch = PdfBranch(self, [(self.source, i) for i in range(self.source.page_count)])
+        self.branches.append(branch)
+        return branch
+
+    def run(self, workers=None):
+        """
+        모든 갈래의 출력물을 만듦.
+        - workers: Word 변환에 사용할 프로세스 수 (None이면 CPU 코어 수)
+        - 반환값: 만들어진 파일 경로 리스트 (추가한 순서대로)
+        - 끝나면 열어 둔 문서를 모두 닫으므로 파이프라인은 한 번만 실행할 수 있음.
+        """
+        outputs = []
+        conversions = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for branch in self.branches:
+                    if not branch.pages:
+                        raise ValueError("페이지가 없는 갈래가 있습니다.")
+                    with branch._build() as doc:
+                        for kind, out in branch.outputs:
+                            if kind == "pdf":
+                                doc.save(out)
+                            else:
+                                # 변환은 다른 프로세스에서 돌리고, 그동안 다음 갈래를 계속 만듦.
+                                conversions.append(
+                                    executor.submit(
+                                        _convert_pdf_bytes, doc.tobytes(), out, {}
+                                    )
+                                )
+                            outputs.append(out)
+                for future in conversions:
+                    future.result()
+        finally:
+            self.close()
+        return outputs
+
+    def close(self):
+        for doc in self._docs.values():
+            doc.close()
+        self._docs.clear()
+
+
+# 글자를 소문자 단어(영문, 숫자, 한글 등) 목록으로 나눔. 색인과 검색에 같은 규칙을 씀.
+def _tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+
+# 작업 프로세스 하나가 PDF의 페이지 구간[start, end)에서 페이지별 단어 집합을 뽑음.
+def _extract_page_terms(path, start, end):
+    with fitz.open(path) as doc:
+        return [(i, set(_tokenize(doc[i].get_text()))) for i in range(start, end)]
+
+
+# 클래스(Class): 여러 PDF의 단어 → (파일, 페이지) 역색인(inverted index)을 SQLite에 저장함.
+class SearchIndex:
+    """
+    - docs: 색인한 파일의 경로, 크기, 수정 시각
+    - postings: (단어, 파일 id, 페이지) 목록. 단어로 바로 찾을 수 있게 단어가 기본 키의 맨 앞임.
+    update()는 바뀐 파일만 다시 색인하므로 여러 번 실행해도 빠름.
+    - errors: 마지막 update()에서 색인하지 못한 파일 {경로: 오류 메시지}
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime INTEGER);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT, doc_id INTEGER, page INTEGER,"
+            " PRIMARY KEY (term, doc_id, page)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);"
+        )
+        self.errors = {}
+
+    def update(self, dir_path, recursive=False, workers=None):
+        """
+        디렉토리의 PDF를 색인함. 새 파일과 바뀐 파일만 텍스트를 추출하고, 사라진 파일은 지움.
+        - 페이지 구간 단위로 여러 프로세스에 나눠 텍스트를 추출함.
+        - 암호화되었거나 깨진 파일은 건너뛰고 self.errors에 남김. 나머지 파일은 그대로 색인됨.
+          (건너뛴 파일은 docs에 넣지 않으므로 다음 update() 때 다시 시도함)
+        - 반환값: (새로 색인한 파일 수, 지운 파일 수)
+        """
+        dir_path = Path(dir_path).resolve()
+        if not dir_path.is_dir():
+            raise NotADirectoryError(f"유효한 디렉토리 경로가 아닙니다: {dir_path}")
+
+        known = {
+            row[1]: row
+            for row in self.conn.execute("SELECT id, path, size, mtime FROM docs")
+        }
+        current = {str(path): (size, mtime) for path, size, mtime in _walk_pdfs(dir_path, recursive)}
+        changed = [p for p, stat in current.items() if p not in known or known[p][2:] != stat]
+        removed = [
+            p
+            for p in known
+            if p not in current
+            and (Path(p).parent == dir_path or (recursive and Path(p).is_relative_to(dir_path)))
+        ]
+
+        with self.conn:
+            # 바뀐 파일과 사라진 파일의 기존 색인을 먼저 지움.
+            for p in changed + removed:
+                if p in known:
+                    self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (known[p][0],))
+                    self.conn.execute("DELETE FROM docs WHERE id = ?", (known[p][0],))
+
+            tasks = []
+            doc_ids = {}
+            self.errors = {}
+            for p in changed:
+                try:
+                    with fitz.open(p) as doc:
+                        page_count = doc.page_count
+                except Exception as e:
+                    self.errors[p] = str(e)  # 열 수 없는 파일은 색인하지 않음.
+                    continue
+                size, mtime = current[p]
+                cursor = self.conn.execute(
+                    "INSERT INTO docs (path, size, mtime) VALUES (?, ?, ?)", (p, size, mtime)
+                )
+                doc_ids[p] = cursor.lastrowid
+                for start in range(0, page_count, SEARCH_PAGES_PER_TASK):
+                    tasks.append((p, start, min(start + SEARCH_PAGES_PER_TASK, page_count)))
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_extract_page_terms, *task): task[0] for task in tasks}
+                for future in as_completed(futures):
+                    p = futures[future]
+                    if p in self.errors:
+                        continue  # 같은 파일의 다른 구간이 이미 실패함.
+                    try:
+                        pages = future.result()
+                    except Exception as e:
+                        # 파일 하나가 실패해도 전체 색인을 되돌리지 않고 그 파일만 뺌.
+                        self.errors[p] = str(e) or type(e).__name__
+                        continue
+                    self.conn.executemany(
+                        "INSERT INTO postings VALUES (?, ?, ?)",
+                        [(term, doc_ids[p], page) for page, terms in pages for term in terms],
+                    )
+
+            # 실패한 파일은 이미 넣은 구간까지 지워서, 일부 페이지만 색인된 채 남지 않게 함.
+            for p in self.errors:
+                if p in doc_ids:
+                    self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_ids.pop(p),))
+                    self.conn.execute("DELETE FROM docs WHERE path = ?", (p,))
+        return len(doc_ids), len(removed)
+
+    # 단어 하나가 나오는 (파일 id, 페이지) 집합을 반환함. 끝에 *를 붙이면 그 글자로 시작하는 단어를 찾음.
+    def _lookup(self, term):
+        if term.endswith("*"):
+            prefix = term[:-1]
+            # 접두어 검색: prefix 이상, prefix 바로 다음 글자 미만인 단어 범위만 읽음.
+            rows = self.conn.execute(
+                "SELECT doc_id, page FROM postings WHERE term >= ? AND term < ?",
+                (prefix, prefix + "\U0010ffff"),
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT doc_id, page FROM postings WHERE term = ?", (term,)
+            )
+        return set(rows)
+
+    def query(self, text):
+        """
+        text의 모든 단어가 들어 있는 페이지를 찾음. (예: "계약 해지*")
+        - 반환값: (파일 경로, 1부터 시작하는 페이지 번호) 리스트 (경로, 페이지 순)
+        """
+        terms = []
+        for word in text.lower().split():
+            tokens = _tokenize(word)
+            if tokens and word.endswith("*"):
+                tokens[-1] += "*"
+            terms.extend(tokens)
+        if not terms:
+            return []
+        # 단어마다 찾은 페이지 집합의 교집합(&)이 모든 단어가 들어 있는 페이지임.
+        hits = self._lookup(terms[0])
+        for term in terms[1:]:
+            if not hits:
+                break
+            hits &= self._lookup(term)
+        paths = dict(self.conn.execute("SELECT id, path FROM docs"))
+        return sorted((Path(paths[doc_id]), page + 1) for doc_id, page in hits)
+
+    def extract_hits(self, text, out):
+        """
+        검색어가 들어 있는 페이지만 모아 새 PDF로 저장함.
+        - 반환값: 저장한 페이지 수
+        """
+        hits = self.query(text)
+        if not hits:
+            return 0
+        with fitz.open() as result:
+            current_path, src = None, None
+            for path, page in hits:
+                if path != current_path:
+                    if src:
+                        src.close()
+                    current_path, src = path, fitz.open(path)
+                result.insert_pdf(src, from_page=page - 1, to_page=page - 1)
+            src.close()
+            result.save(out)
+        return len(hits)
+
+    def close(self):
+        self.conn.close()
+
+
+def search_pdfs(
+    dir_path, text, recursive=False, out=None, index_path=None, workers=None, on_error=None
+):
+    """
+    폴더의 PDF에서 text의 모든 단어가 들어 있는 페이지를 찾음.
+    - 검색 전에 색인을 갱신하므로 바뀐 파일만 다시 읽음.
+    - out을 주면 찾은 페이지만 모아 새 PDF로 저장함.
+    - on_error: 색인하지 못한 파일마다 on_error(경로, 오류 메시지)를 호출함.
+    - 반환값: (파일 경로, 페이지 번호) 리스트
+    """
+    dir_path = Path(dir_path)
+    if not dir_path.is_dir():
+        raise NotADirectoryError(f"유효한 디렉토리 경로가 아닙니다: {dir_path}")
+    index = SearchIndex(index_path or dir_path / PDF_SEARCH_INDEX_NAME)
+    try:
+        index.update(dir_path, recursive, workers)
+        if on_error:
+            for path, message in index.errors.items():
+                on_error(Path(path), message)
+        if out:
+            index.extract_hits(text, out)
+        return index.query(text)
+    finally:
+        index.close()
+
+
+# 페이지 객체에서 시작해 그 페이지를 그리는 데 필요한 모든 간접 객체 번호를 모음.
+def _page_object_ids(page):
+    """
+    내용 스트림, 리소스(글꼴, 이미지/폼 XObject 등), 주석까지 참조를 따라가며 객체 번호를 모음.
+    - /Parent(페이지 트리)와 다른 페이지 객체는 따라가지 않음. (따라가면 문서 전체가 됨)
+    """
+    own = page.indirect_reference
+    ids = {own.idnum}
+    stack = [page]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, DictionaryObject):
+            children = [value for key, value in obj.items() if key != "/Parent"]
+        elif isinstance(obj, ArrayObject):
+            children = list(obj)
+        else:
+            continue
+        for child in children:
+            if isinstance(child, IndirectObject):
+                if child.idnum in ids:
+                    continue
+                resolved = child.get_object()
+                # 주석의 /P나 링크의 목적지처럼 다른 페이지를 가리키는 참조는 건너뜀.
+                if isinstance(resolved, DictionaryObject) and resolved.get("/Type") in ("/Page", "/Pages"):
+                    continue
+                ids.add(child.idnum)
+                stack.append(resolved)
+            else:
+                stack.append(child)
+    return ids
+
+
+# PDF 안 객체들의 파일 위치(바이트 오프셋)를 읽어 페이지별 바이트 구간 목록을 만듦.
+def build_page_offsets(path):
+    """
+    페이지마다 그 페이지를 그리는 데 필요한 객체(페이지 객체, 내용 스트림, 리소스, 글꼴,
+    이미지, 주석)가 파일의 어느 바이트에 있는지 계산함.
+    Range 요청을 쓰는 뷰어가 이 구간(과 파일 끝의 xref/trailer)만 받아 가면 그 페이지를 그릴 수 있음.
+    - 객체의 끝은 파일에서 바로 다음 객체가 시작하는 위치로 봄.
+    - 압축된 객체 스트림 안의 객체는 그 객체 스트림 전체 구간을 씀.
+    - 반환값: 페이지별 [(시작, 끝), ...] 리스트 (끝은 포함하지 않음)
+    """
+    size = Path(path).stat().st_size
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        offsets = {
+            idnum: offset
+            for objects in reader.xref.values()
+            for idnum, offset in objects.items()
+            if offset
+        }
+        # 객체 스트림 안의 객체: 객체 번호 -> (객체 스트림 번호, 순서)
+        for idnum, (stream_num, _) in reader.xref_objStm.items():
+            if stream_num in offsets:
+                offsets[idnum] = offsets[stream_num]
+        starts = sorted(set(offsets.values()))
+
+        def span(idnum):
+            start = offsets[idnum]
+            i = bisect_right(starts, start)
+            return start, starts[i] if i < len(starts) else size
+
+        index = []
+        for page in reader.pages:
+            spans = sorted(set(span(idnum) for idnum in _page_object_ids(page) if idnum in offsets))
+            # 붙어 있거나 겹치는 구간은 하나로 합침.
+            merged = []
+            for start, end in spans:
+                if merged and start <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            index.append(merged)
+    return index
+
+
+# 클래스(Class): 큰 PDF를 필요한 바이트/페이지만 나눠 보내는 로컬 HTTP 서버임.
+class PdfServer:
+    """
+    - GET /이름.pdf : 파일 전체. Range 요청(bytes=시작-끝)이면 그 부분만 보냄(206).
+      PDF.js 같은 뷰어는 Range 요청으로 지금 보는 페이지에 필요한 바이트만 받아 감.
+    - GET /이름.pdf?pages=3 또는 ?pages=10-20 : 그 페이지들만 담은 작은 PDF를 새로 만들어 보냄.
+      (바이트 구간을 잘라 보내는 것이 아니라 열어 둔 문서에서 복사함. 최근 결과는 LRU로 보관함)
+    - GET /이름.pdf?index : 페이지별 바이트 구간(build_page_offsets)을 JSON으로.
+      클라이언트가 이 구간으로 Range 요청을 보내면 원하는 페이지에 필요한 바이트만 받을 수 있음.
+    - GET / : 제공하는 PDF 목록
+    파일은 mmap으로 열어 두고 PDF_SERVER_CHUNK_BYTES씩 나눠 보내므로, 큰 파일도 통째로 메모리에 올리지 않음.
+    """
+
+    def __init__(self, path, host=PDF_SERVER_HOST, port=PDF_SERVER_PORT):
+        path = Path(path)
+        if path.is_dir():
+            self.files = {p.name: p for p in list_pdfs(path)}
+        else:
+            self.files = {path.name: _require_file(path)}
+        self.host = host
+        self.port = port
+        self._maps = {}
+        self._indexes = {}
+        self._docs = {}
+        self._pages = OrderedDict()
+        # pymupdf 문서는 여러 스레드가 동시에 쓰면 안 되므로 잠금을 걸고 씀.
+        self._lock = threading.Lock()
+
+    # 파일을 mmap으로 열어 둠. 잘라 읽을 때 필요한 부분만 디스크에서 읽힘.
+    def file_bytes(self, name):
+        with self._lock:
+            if name not in self._maps:
+                with open(self.files[name], "rb") as f:
+                    self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._maps[name]
+
+    def page_index(self, name):
+        with self._lock:
+            if name not in self._indexes:
+                self._indexes[name] = build_page_offsets(self.files[name])
+            return self._indexes[name]
+
+    def page_pdf(self, name, pages_text):
+        """pages_text("3" 또는 "10-20" 등) 페이지만 담은 PDF를 bytes로 반환함."""
+        key = (name, pages_text)
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return self._pages[key]
+            if name not in self._docs:
+                self._docs[name] = fitz.open(self.files[name])
+            src = self._docs[name]
+            pages = parse_page_ranges(pages_text, src.page_count)
+            with fitz.open() as out:
+                for page in pages:
+                    out.insert_pdf(src, from_page=page - 1, to_page=page - 1)
+                data = out.tobytes(garbage=1, deflate=True)
+            self._pages[key] = data
+            while len(self._pages) > PDF_SERVER_CACHE_ITEMS:
+                self._pages.popitem(last=False)
+            return data
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 연결을 재사용(keep-alive)할 수 있게 함.
+
+            def log_message(self, *args):
+                pass  # 요청마다 로그를 찍지 않음.
+
+            def do_HEAD(self):
+                self.do_GET(head=True)
+
+            def do_GET(self, head=False):
+                url = urlsplit(self.path)
+                name = unquote(url.path.lstrip("/"))
+                query = parse_qs(url.query, keep_blank_values=True)
+                try:
+                    if not name:
+                        body = json.dumps(sorted(server.files)).encode()
+                        return self._send(body, "application/json", head)
+                    if name not in server.files:
+                        return self._error(404, "not found")
+                    if "index" in query:
+                        body = json.dumps(server.page_index(name)).encode()
+                        return self._send(body, "application/json", head)
+                    if "pages" in query:
+                        body = server.page_pdf(name, query["pages"][0])
+                        return self._send(body, "application/pdf", head)
+                    self._send(server.file_bytes(name), "application/pdf", head)
+                except ValueError as e:
+                    self._error(400, str(e))
+
+            # body(bytes 또는 mmap)를 보냄. Range 헤더가 있으면 요청한 구간만 보냄.
+            def _send(self, body, content_type, head):
+                size = len(body)
+                start, end = 0, size
+                status = 200
+                byte_range = self.headers.get("Range")
+                if byte_range:
+                    match = re.fullmatch(r"bytes=(\d*)-(\d*)", byte_range.strip())
+                    if not match or match.groups() == ("", ""):
+                        return self._error(416, "invalid range", size)
+                    first, last = match.groups()
+                    if first:
+                        start, end = int(first), min(int(last) + 1 if last else size, size)
+                    else:
+                        start = max(size - int(last), 0)  # bytes=-N: 마지막 N바이트
+                    if start >= end:
+                        return self._error(416, "invalid range", size)
+                    status = 206
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(end - start))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+                self.end_headers()
+                if not head:
+                    # memoryview로 자르면 복사 없이 mmap의 일부만 가리키므로, 조각씩 읽어 보냄.
+                    view = memoryview(body)
+                    for offset in range(start, end, PDF_SERVER_CHUNK_BYTES):
+                        self.wfile.write(view[offset:min(offset + PDF_SERVER_CHUNK_BYTES, end)])
+
+            def _error(self, status, message, size=None):
+                body = json.dumps({"message": message}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if size is not None:
+                    self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        """서버를 백그라운드 스레드에서 시작하고 HTTP 서버 객체를 반환함. (shutdown()으로 멈춤)"""
+        httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.port = httpd.server_address[1]
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+    def serve_forever(self):
+        """Ctrl+C로 멈출 때까지 요청을 처리함."""
+        with ThreadingHTTPServer((self.host, self.port), self._make_handler()) as httpd:
+            httpd.serve_forever()
+
+
+# 작업 설명(dict) 하나를 받아 알맞은 API 함수를 실행함. 배치 작업에서 사용함.
+def run_job(job):
+    """
+    job 예시:
+    - {"op": "merge", "paths": ["a.pdf", "b.pdf"], "out": "ab.pdf", "incremental": false}
+    - {"op": "split", "path": "a.pdf", "out_dir": "pages", "chunk": 10}
+    - {"op": "reorder", "path": "a.pdf", "order": "3,1,2" 또는 [3, 1, 2], "out": "r.pdf"}
+    - {"op": "to_docx", "path": "a.pdf", "out": "a.docx", "workers": 1}
+    - {"op": "pipeline", "path": "book.pdf",
+       "branches": [[["select", "1-20"], ["write", "ch1.pdf"]],
+                    [["select", "21-40"], ["merge", "appendix.pdf"], ["to_docx", "ch2.docx"]]]}
+    - merge/split/reorder 작업에 "optimize": true (선택: "dpi", "quality")를 넣으면 용량 최적화도 함.
+    - "linearize": true 를 넣으면 결과를 웹용(빠른 웹 보기) 형식으로 저장함.
+    - 반환값: 만들어진 파일 경로 리스트(문자열)
+    """
+    op = job.get("op")
+    # 최적화/웹용 저장은 파일 전체를 다시 쓰므로, 다음 실행 때 증분 병합이 파일을 알아보지 못함.
+    if job.get("incremental") and (job.get("optimize") or job.get("linearize")):
+        raise ValueError("incremental은 optimize, linearize와 함께 쓸 수 없습니다.")
+    if op == "merge":
+        paths = _expand_pdf_paths(job["paths"])
+        results = [
+            merge(paths, job["out"], job.get("streaming"), job.get("incremental", False))
+        ]
+    elif op == "split":
+        # 배치 작업은 이미 여러 프로세스로 돌기 때문에 분리 작업 안에서는 추가 프로세스를 만들지 않음.
+        results = split(
+            job["path"], job.get("out_dir", "."), job.get("chunk", 1), workers=1
+        )
+    elif op == "reorder":
+        results = [reorder(job["path"], job["order"], job.get("out"))]
+    elif op == "to_docx":
+        results = [to_docx(job["path"], job.get("out"), job.get("workers", 1))]
+    elif op == "pipeline":
+        pipe = PdfPipeline(job["path"])
+        for stages in job["branches"]:
+            branch = pipe.branch()
+            for name, *stage_args in stages:
+                if name not in ("select", "reorder", "merge", "write", "to_docx"):
+                    raise ValueError(f"알 수 없는 파이프라인 단계입니다: {name}")
+                getattr(branch, name)(*stage_args)
+        results = pipe.run(workers=1)
+    else:
+        raise ValueError(f"알 수 없는 작업입니다: {op}")
+
+    # "optimize": true 이면 만들어진 PDF마다 용량 최적화를 실행함.
+    if job.get("optimize") and op in ("merge", "split", "reorder"):
+        for r in results:
+            optimize_pdf(r, job.get("dpi"), job.get("quality"))
+    # 최적화가 파일을 다시 쓰므로, 웹용 저장은 항상 마지막에 함.
+    if job.get("linearize") and op in ("merge", "split", "reorder"):
+        for r in results:
+            linearize_pdf(r)
+    return [str(r) for r in results]
+
+
+# 매니페스트 파일(JSON Lines: 한 줄에 작업 하나)의 작업들을 여러 프로세스로 실행함.
+def run_manifest(manifest_path, workers=None):
+    """
+    - 빈 줄과 '#'으로 시작하는 줄은 건너뜀.
+    - 반환값: 실패한 작업 수
+    """
+    jobs = []
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                jobs.append(json.loads(line))
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_job, job): i for i, job in enumerate(jobs)}
+        # as_completed(): 먼저 끝난 작업부터 결과를 받음.
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                outputs = future.result()
+                # 결과 파일이 많으면(분리 작업 등) 개수만 출력함.
+                summary = ", ".join(outputs) if len(outputs) <= 3 else f"{len(outputs)}개 파일"
+                print(f"[{i + 1}/{len(jobs)}] 완료: {summary}")
+            except Exception as e:
+                failed += 1
+                print(f"[{i + 1}/{len(jobs)}] 실패: {e}")
+    print(f"전체 {len(jobs)}개 중 {len(jobs) - failed}개 성공, {failed}개 실패")
+    return failed
+
+
+# 클래스(Class): PDF 처리 관련 모든 기능(메서드)을 담은 대화형 메뉴용 설계도임.
 class PdfTool:
     """
     PDF 파일을 처리하는 다양한 기능을 제공하는 클래스입니다.
-    - PDF 합치기, 분리하기, 순서 변경하기, Word로 변환하기
+    - PDF 합치기, 분리하기, 순서 변경하기, Word로 변환하기, 검색하기
+    - 각 메서드는 input()으로 경로를 입력받은 뒤 위의 API 함수를 호출함.
     """
 
     # 1. 특정 디렉토리 안의 모든 PDF 파일을 합치는 기능임.
@@ -24,50 +1582,52 @@ class PdfTool:
             dir_path_str = input(
                 "PDF 파일들이 있는 디렉토리(폴더)의 경로를 입력하세요:\n> "
             ).strip()
-            # 입력받은 경로 문자열로 Path 객체를 생성함.
-            dir_path = Path(dir_path_str)
-
-            # Path.is_dir(): 해당 경로가 디렉토리인지 확인.
-            if not dir_path.is_dir():
-                # 디렉토리가 아니거나 없으면 에러 발생시킴.
-                raise NotADirectoryError(f"유효한 디렉토리 경로가 아닙니다: {dir_path}")
+            # 인덱스를 저장하면 다음 스캔 때 바뀌지 않은 파일은 다시 열지 않고 페이지 수를 알 수 있음.
+            # 원본 폴더에 파일이 생기므로 원할 때만 저장함.
+            answer = input(
+                f"스캔 결과를 폴더에 저장해 다음에 더 빨리 읽을까요? ({PDF_INDEX_NAME} 생성) (y/N)\n> "
+            ).strip().lower()
+            records = scan_pdfs(dir_path_str, index_path=None if answer == "y" else PDF_INDEX_MEMORY)
 
             pdf_files = []
-            # dir_path.iterdir()로 디렉토리 내 모든 항목을 순회함.
-            for file_path in sorted(dir_path.iterdir()):
-                # 조건문 추가: 파일이고(.is_file()), 확장자가 .pdf (대소문자 구분 없이)인 경우만 처리함.
-                if file_path.is_file() and file_path.suffix.lower() == ".pdf":
-                    pdf_files.append(file_path)
-
-            if not pdf_files:
-                print("해당 디렉토리에 PDF 파일이 없습니다.")
-                return
-
+            total_pages = 0
             print("\n다음 파일들을 이름순으로 병합합니다:")
-            for f in pdf_files:
+            for r in records:
                 # Path.name: 전체 경로에서 파일 이름만 추출함.
-                print(f"- {f.name}")
+                if r["error"] or r["encrypted"]:
+                    reason = "암호화됨" if r["encrypted"] else r["error"]
+                    print(f"- {r['path'].name} (건너뜀: {reason})")
+                    continue
+                print(f"- {r['path'].name} ({r['pages']}페이지)")
+                pdf_files.append(r["path"])
+                total_pages += r["pages"]
 
-            # PdfMerger 객체 생성함.
-            merger = PdfMerger()
-
-            # for 반복문: 찾은 각 PDF 파일(Path 객체)에 대해 반복함.
-            for pdf in pdf_files:
-                merger.append(pdf)
+            if not pdf_files:
+                print("해당 디렉토리에 병합할 수 있는 PDF 파일이 없습니다.")
+                return
+            print(f"총 {len(pdf_files)}개 파일, {total_pages}페이지")
 
             output_filename = input(
                 "저장할 파일 이름을 입력하세요 (예: result.pdf):\n> "
             )
-            output_path = Path(output_filename)
-            merger.write(output_path)
-            merger.close()
+            if len(pdf_files) >= STREAM_MERGE_THRESHOLD:
+                print(f"파일이 {len(pdf_files)}개이므로 스트리밍 방식으로 병합합니다.")
+            output_path = merge(pdf_files, output_filename)
 
             # Path.resolve(): 파일의 절대 경로를 가져옴.
             absolute_path = output_path.resolve()
             print(f"성공! '{output_path.name}' 파일로 저장되었습니다.")
             print(f"저장된 전체 경로: {absolute_path}")
 
-        except (NotADirectoryError, FileNotFoundError) as e:
+            # 스캔 문서를 합치면 같은 로고/글꼴이 반복되므로 용량을 줄일 수 있음.
+            answer = input("용량을 최적화할까요? (y/N)\n> ").strip().lower()
+            if answer == "y":
+                dpi_str = input("이미지 해상도(DPI)를 줄이려면 입력하세요 (예: 150, 생략 시 유지):\n> ")
+                dpi = int(dpi_str) if dpi_str.strip() else None
+                _optimize_and_report([output_path], dpi)
+            _ask_linearize([output_path])
+
+        except (NotADirectoryError, FileNotFoundError, ValueError) as e:
             print(f"오류: {e}")
         except Exception as e:
             print(f"알 수 없는 오류가 발생했습니다: {e}")
@@ -77,37 +1637,24 @@ class PdfTool:
         print("\n--- PDF 분리하기 ---")
         try:
             file_path_str = input("분리할 PDF 파일의 경로를 입력하세요:\n> ")
-            file_path = Path(file_path_str)
-
-            if not file_path.exists():
-                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
-
-            reader = PdfReader(file_path)
-            total_pages = len(reader.pages)
+            file_path = _require_file(file_path_str)
 
+            total_pages = len(PdfReader(file_path).pages)
             print(f"총 {total_pages}페이지의 문서를 분리합니다.")
 
-            # for 반복문과 range(): 페이지 수만큼 반복함.
-            output_files = []
-            for i in range(total_pages):
-                writer = PdfWriter()
-                writer.add_page(reader.pages[i])
-
-                # Path.stem: 확장자를 제외한 파일 이름.
-                base_name = file_path.stem
-                output_filename = f"{base_name}_page_{i + 1}.pdf"
-                output_path = Path(output_filename)
-                output_files.append(output_path)
+            chunk_str = input("몇 페이지씩 나눌까요? (기본값: 1)\n> ").strip()
+            # 아무것도 입력하지 않으면 한 페이지씩 나눔.
+            chunk_size = int(chunk_str) if chunk_str else 1
 
-                with open(output_path, "wb") as f:
-                    writer.write(f)
+            output_files = split(file_path, chunk=chunk_size)
 
-            print(f"성공! 총 {total_pages}개의 파일로 분리되었습니다.")
+            print(f"성공! 총 {len(output_files)}개의 파일로 분리되었습니다.")
             # 저장된 파일들의 절대 경로를 출력하도록 수정함.
             for f_path in output_files:
                 print(f"저장된 파일 경로: {f_path.resolve()}")
+            _ask_linearize(output_files)
 
-        except FileNotFoundError as e:
+        except (FileNotFoundError, ValueError) as e:
             print(f"오류: {e}")
         except Exception as e:
             print(f"알 수 없는 오류가 발생했습니다: {e}")
@@ -117,43 +1664,22 @@ class PdfTool:
         print("\n--- PDF 페이지 순서 변경 ---")
         try:
             file_path_str = input("순서를 변경할 PDF 파일의 경로를 입력하세요:\n> ")
-            file_path = Path(file_path_str)
-
-            if not file_path.exists():
-                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+            file_path = _require_file(file_path_str)
 
-            reader = PdfReader(file_path)
-            total_pages = len(reader.pages)
+            total_pages = len(PdfReader(file_path).pages)
             print(
                 f"총 {total_pages}페이지의 문서입니다. 페이지 번호는 1부터 시작합니다."
             )
 
+            # 범위 표기(1-10)도 받으므로 페이지가 많아도 하나하나 입력하지 않아도 됨.
             order_str = input(
-                f"새로운 페이지 순서를 쉼표(,)로 구분하여 입력하세요 (예: 3,1,2,{total_pages}):\n> "
+                f"새로운 페이지 순서를 쉼표(,)로 구분하여 입력하세요 (예: 3,1,2,4-{total_pages}):\n> "
             )
 
-            # list comprehension과 int() 써서 문자열 리스트를 숫자 리스트로 변환함.
-            new_order = [int(p.strip()) for p in order_str.split(",")]
-
-            # 유효성 검사임.
-            if len(new_order) != total_pages or sorted(new_order) != list(
-                range(1, total_pages + 1)
-            ):
-                raise ValueError(
-                    "페이지 번호가 잘못되었습니다. 모든 페이지를 중복 없이 입력해야 합니다."
-                )
-
-            writer = PdfWriter()
-            # 사용자는 1부터 시작하는 번호 입력하지만, 실제 인덱스는 0부터 시작하므로 1을 빼줘야 함.
-            for page_num in new_order:
-                writer.add_page(reader.pages[page_num - 1])
-
             output_filename = input(
-                "저장할 파일 이름을 입력하세요 (예: reordered.pdf):\n> "
-            )
-            output_path = Path(output_filename)
-            with open(output_path, "wb") as f:
-                writer.write(f)
+                "저장할 파일 이름을 입력하세요 (예: reordered.pdf, 원본에 덮어쓰려면 Enter):\n> "
+            ).strip()
+            output_path = reorder(file_path, order_str, output_filename or None)
 
             absolute_path = output_path.resolve()
             print(
@@ -161,6 +1687,7 @@ class PdfTool:
             )
             # 절대 경로 출력 추가함.
             print(f"저장된 전체 경로: {absolute_path}")
+            _ask_linearize([output_path])
 
         except (FileNotFoundError, ValueError) as e:
             print(f"오류: {e}")
@@ -171,38 +1698,116 @@ class PdfTool:
     def convert_to_docx(self):
         print("\n--- PDF를 Word 파일로 변환 ---")
         try:
-            pdf_path_str = input("변환할 PDF 파일의 경로를 입력하세요:\n> ")
-            pdf_path = Path(pdf_path_str)
+            pdf_path_str = input(
+                "변환할 PDF 파일(또는 PDF가 있는 디렉토리)의 경로를 입력하세요:\n> "
+            ).strip()
 
-            if not pdf_path.exists():
-                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {pdf_path}")
+            # 디렉토리를 입력하면 안의 PDF를 모두 동시에 변환함.
+            if Path(pdf_path_str).is_dir():
+                results = to_docx_dir(pdf_path_str, progress=_print_progress)
+                for pdf, result in results.items():
+                    if isinstance(result, Exception):
+                        print(f"- {pdf.name}: 변환 실패 ({result})")
+                    else:
+                        print(f"- {pdf.name} -> {result.resolve()}")
+                return
 
-            # Path.with_suffix(): 파일의 확장자만 변경함.
-            docx_path = pdf_path.with_suffix(".docx")
+            pdf_path = _require_file(pdf_path_str)
 
             print(
-                f"'{docx_path.name}' 파일로 변환을 시작합니다. 파일 크기에 따라 시간이 걸릴 수 있습니다..."
+                f"'{pdf_path.with_suffix('.docx').name}' 파일로 변환을 시작합니다. 파일 크기에 따라 시간이 걸릴 수 있습니다..."
             )
 
-            # Converter 클래스 이용해 객체 생성함. 라이브러리가 문자열을 요구할 수 있으므로 str()로 변환.
-            cv = Converter(str(pdf_path))
-            cv.convert(str(docx_path))
-            cv.close()
+            # 캐시는 페이지를 따로 변환해 이어 붙이므로 여러 페이지에 걸친 분석이 빠짐.
+            # 그래서 기본은 문서 전체 변환이고, 같은 PDF를 자주 변환할 때만 캐시를 씀.
+            answer = input("변환 결과 캐시를 사용할까요? (같은 PDF를 반복 변환할 때 빠름) (y/N)\n> ")
+            if answer.strip().lower() == "y":
+                cache = DocxCache()
+                docx_path = cache.convert(pdf_path, workers=None)
+                print(
+                    f"캐시: 적중 {cache.stats['hits']}회, 페이지 적중 {cache.stats['page_hits']}회"
+                )
+            else:
+                docx_path = to_docx(pdf_path, workers=None, progress=_print_progress)
 
             absolute_path = docx_path.resolve()
             print(f"성공! '{docx_path.name}' 파일로 변환되었습니다.")
             # 절대 경로 출력 추가함.
             print(f"저장된 전체 경로: {absolute_path}")
 
-        except FileNotFoundError as e:
+        except (FileNotFoundError, NotADirectoryError) as e:
             print(f"오류: {e}")
         except Exception as e:
             # 라이브러리 자체에서 발생하는 오류 처리함.
             print(f"변환 중 오류가 발생했습니다: {e}")
 
+    # 5. 폴더 안의 PDF에서 단어를 검색하는 기능임.
+    def search_pdfs(self):
+        print("\n--- PDF 검색하기 ---")
+        try:
+            dir_path = input("검색할 PDF 파일들이 있는 디렉토리 경로를 입력하세요:\n> ").strip()
+            text = input("찾을 단어를 입력하세요 (여러 단어는 띄어쓰기, 접두어는 끝에 *):\n> ").strip()
+            out = input(
+                "찾은 페이지만 모아 저장할 파일 이름을 입력하세요 (저장하지 않으려면 Enter):\n> "
+            ).strip()
+            if out and not out.lower().endswith(".pdf"):
+                out += ".pdf"
 
-# 함수(Function): 프로그램 전체 흐름을 제어하는 메인 함수임.
-def main():
+            # 첫 검색은 모든 PDF의 글자를 읽으므로 시간이 걸리지만, 다음부터는 바뀐 파일만 읽음.
+            hits = search_pdfs(
+                dir_path,
+                text,
+                out=out or None,
+                on_error=lambda path, e: print(f"- {path.name}: 색인 실패, 건너뜀 ({e})"),
+            )
+            if not hits:
+                print("검색 결과가 없습니다.")
+                return
+            for path, page in hits:
+                print(f"- {path.name} {page}페이지")
+            print(f"총 {len(hits)}개 페이지를 찾았습니다.")
+            if out:
+                print(f"저장된 전체 경로: {Path(out).resolve()}")
+                _ask_linearize([Path(out)])
+
+        except NotADirectoryError as e:
+            print(f"오류: {e}")
+        except Exception as e:
+            print(f"알 수 없는 오류가 발생했습니다: {e}")
+
+
+# 진행 상황을 한 줄로 출력함.
+def _print_progress(done, total):
+    print(f"진행 상황: {done}/{total}")
+
+
+# qpdf가 설치되어 있으면 결과 파일을 웹용(빠른 웹 보기)으로 저장할지 물어봄.
+def _ask_linearize(paths):
+    if shutil.which("qpdf") is None:
+        return
+    answer = input("브라우저에서 첫 페이지가 바로 보이도록 웹용으로 저장할까요? (y/N)\n> ")
+    if answer.strip().lower() == "y":
+        for path in paths:
+            linearize_pdf(path)
+        print("웹용(linearized) 형식으로 저장했습니다.")
+
+
+# 파일들을 최적화하고 줄어든 용량을 출력함.
+def _optimize_and_report(paths, dpi=None, quality=None):
+    total_before = total_after = 0
+    for path in paths:
+        before, after = optimize_pdf(path, dpi, quality)
+        total_before += before
+        total_after += after
+    saved = total_before - total_after
+    percent = saved / total_before * 100 if total_before else 0
+    print(
+        f"용량 최적화: {total_before:,} -> {total_after:,} 바이트 ({saved:,} 바이트, {percent:.1f}% 절약)"
+    )
+
+
+# 함수(Function): 대화형 메뉴를 보여주고 사용자 선택에 따라 기능을 실행함.
+def run_menu():
     # 클래스로부터 객체(Object) 생성함.
     tool = PdfTool()
 
@@ -216,7 +1821,8 @@ def main():
         print("2. PDF 파일 분리하기")
         print("3. PDF 페이지 순서 변경하기")
         print("4. PDF를 Word 파일로 변환하기")
-        print("5. 종료")
+        print("5. PDF 검색하기")
+        print("6. 종료")
         print("=" * 30)
 
         choice = input("원하는 작업의 번호를 선택하세요: ")
@@ -231,12 +1837,202 @@ def main():
         elif choice == "4":
             tool.convert_to_docx()
         elif choice == "5":
+            tool.search_pdfs()
+        elif choice == "6":
             print("프로그램을 종료합니다. 이용해주셔서 감사합니다.")
             break  # while 루프 빠져나감.
         else:
-            print("잘못된 번호입니다. 1~5 사이의 숫자를 입력해주세요.")
+            print("잘못된 번호입니다. 1~6 사이의 숫자를 입력해주세요.")
+
+
+# 명령줄 인자(argument) 해석기를 만듦. 하위 명령(subcommand)마다 필요한 인자가 다름.
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="PDF 처리 도구. 인자 없이 실행하면 대화형 메뉴가 열립니다."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # 병합/분리/순서 변경에 함께 쓰는 용량 최적화 옵션임.
+    optimize_opts = argparse.ArgumentParser(add_help=False)
+    optimize_opts.add_argument(
+        "--optimize", action="store_true", help="중복 객체를 합치는 등 결과 파일 용량 최적화"
+    )
+    optimize_opts.add_argument("--dpi", type=int, default=None, help="이미지를 이 해상도로 줄이기")
+    optimize_opts.add_argument("--quality", type=int, default=None, help="이미지 JPEG 품질(0~100)")
+    optimize_opts.add_argument(
+        "--linearize", action="store_true", help="웹용(빠른 웹 보기) 형식으로 저장 (qpdf 필요)"
+    )
+
+    p = sub.add_parser(
+        "merge", parents=[optimize_opts], help="PDF 파일(또는 폴더 안의 PDF)들을 하나로 합치기"
+    )
+    p.add_argument("paths", nargs="+", help="PDF 파일 또는 디렉토리 경로")
+    p.add_argument("-o", "--out", required=True, help="저장할 파일 경로")
+    p.add_argument(
+        "--streaming", action="store_true", default=None, help="스트리밍 방식 강제 사용"
+    )
+    p.add_argument(
+        "--incremental", action="store_true", help="이전 결과 파일에 새로 생긴 PDF만 덧붙이기"
+    )
+
+    p = sub.add_parser("scan", help="폴더의 PDF 페이지 수/크기/암호화 여부를 스캔해 인덱스에 저장")
+    p.add_argument("path")
+    p.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 스캔")
+    p.add_argument("--index", default=None, help="인덱스 파일 경로")
+    p.add_argument("-j", "--concurrency", type=int, default=SCAN_CONCURRENCY)
+
+    p = sub.add_parser("serve", help="PDF를 필요한 페이지/바이트만 보내는 로컬 HTTP 서버 실행")
+    p.add_argument("path", help="PDF 파일 또는 디렉토리 경로")
+    p.add_argument("--host", default=PDF_SERVER_HOST)
+    p.add_argument("--port", type=int, default=PDF_SERVER_PORT)
+
+    p = sub.add_parser("search", help="폴더의 PDF에서 단어가 들어 있는 페이지 찾기")
+    p.add_argument("path", help="PDF가 있는 디렉토리 경로")
+    p.add_argument("query", help="찾을 단어 (여러 단어는 띄어쓰기, 접두어는 끝에 *)")
+    p.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 검색")
+    p.add_argument("-o", "--out", default=None, help="찾은 페이지만 모아 저장할 PDF 경로")
+    p.add_argument("--index", default=None, help="검색 인덱스 파일 경로")
+    p.add_argument("-w", "--workers", type=int, default=None)
+
+    p = sub.add_parser("split", parents=[optimize_opts], help="PDF를 N페이지씩 나누기")
+    p.add_argument("path")
+    p.add_argument("-o", "--out-dir", default=".")
+    p.add_argument("-c", "--chunk", type=int, default=1, help="파일 하나당 페이지 수")
+    p.add_argument("-w", "--workers", type=int, default=None)
+
+    p = sub.add_parser("reorder", parents=[optimize_opts], help="페이지 순서 바꾸기")
+    p.add_argument("path")
+    p.add_argument("order", help="쉼표로 구분한 페이지 번호나 범위 (예: 3,1,2 또는 1-10,50,11-49)")
+    p.add_argument("-o", "--out", default=None, help="생략하면 원본 파일에 증분 저장함")
+
+    p = sub.add_parser("to-docx", help="PDF(또는 폴더 안의 PDF)를 Word 파일로 변환하기")
+    p.add_argument("path", help="PDF 파일 또는 디렉토리 경로")
+    p.add_argument("-o", "--out", default=None, help="저장할 파일(디렉토리 모드는 폴더) 경로")
+    p.add_argument(
+        "-w", "--workers", type=int, default=None, help="사용할 프로세스 수 (기본: CPU 코어 수)"
+    )
+    p.add_argument(
+        "--cache",
+        nargs="?",
+        const=DOCX_CACHE_DIR,
+        default=None,
+        help=f"변환 결과 캐시 사용 (디렉토리 생략 시 {DOCX_CACHE_DIR})",
+    )
+
+    p = sub.add_parser("cache-stats", help="Word 변환 캐시 통계 보기")
+    p.add_argument("--cache", default=DOCX_CACHE_DIR)
+
+    p = sub.add_parser("batch", help="매니페스트 파일(JSON Lines)의 작업들을 한꺼번에 실행")
+    p.add_argument("manifest")
+    p.add_argument("-w", "--workers", type=int, default=None)
+    return parser
+
+
+# 함수(Function): 프로그램 전체 흐름을 제어하는 메인 함수임.
+def main(argv=None):
+    """
+    인자가 없으면 대화형 메뉴를, 있으면 명령줄 모드를 실행함.
+    - 반환값: 종료 코드 (0이면 성공)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        run_menu()
+        return 0
+
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "batch":
+            return 1 if run_manifest(args.manifest, args.workers) else 0
+
+        if args.command == "split":
+            outputs = split(args.path, args.out_dir, args.chunk, args.workers)
+            print(f"성공! 총 {len(outputs)}개의 파일로 분리되었습니다.")
+            if args.optimize:
+                _optimize_and_report(outputs, args.dpi, args.quality)
+            if args.linearize:
+                for output in outputs:
+                    linearize_pdf(output)
+            return 0
+
+        if args.command == "serve":
+            server = PdfServer(args.path, args.host, args.port)
+            print(f"PDF 서버를 시작합니다: http://{args.host}:{args.port}/ (종료: Ctrl+C)")
+            for name in sorted(server.files):
+                print(f"- http://{args.host}:{args.port}/{name}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                print("\n서버를 종료합니다.")
+            return 0
+
+        if args.command == "scan":
+            records = scan_pdfs(args.path, args.recursive, args.index, args.concurrency)
+            for r in records:
+                note = "암호화됨" if r["encrypted"] else (r["error"] or "")
+                print(f"{r['pages'] or '-':>6}p {r['size']:>12,}B  {r['path']}  {note}")
+            total_pages = sum(r["pages"] or 0 for r in records)
+            print(f"총 {len(records)}개 파일, {total_pages}페이지")
+            return 0
+
+        if args.command == "search":
+            hits = search_pdfs(
+                args.path,
+                args.query,
+                args.recursive,
+                args.out,
+                args.index,
+                args.workers,
+                on_error=lambda path, e: print(f"색인 실패: {path} ({e})", file=sys.stderr),
+            )
+            for path, page in hits:
+                print(f"{path}:{page}")
+            print(f"총 {len(hits)}개 페이지")
+            if args.out and hits:
+                print(f"저장된 파일 경로: {Path(args.out).resolve()}")
+            return 0
+
+        if args.command == "cache-stats":
+            for key, value in DocxCache(args.cache).stats.items():
+                print(f"{key}: {value}")
+            return 0
+
+        if args.command == "to-docx" and Path(args.path).is_dir():
+            results = to_docx_dir(args.path, args.out, args.workers, _print_progress)
+            failed = [pdf for pdf, r in results.items() if isinstance(r, Exception)]
+            for pdf in failed:
+                print(f"변환 실패: {pdf} ({results[pdf]})", file=sys.stderr)
+            return 1 if failed else 0
+
+        if args.command == "merge" and args.incremental:
+            if args.optimize or args.linearize:
+                # 최적화/웹용 저장은 파일 전체를 다시 쓰므로 새 파일만 덧붙이는 의미가 없어짐.
+                raise ValueError("--incremental은 --optimize, --linearize와 함께 쓸 수 없습니다.")
+            added, rebuilt = merge_incremental(_expand_pdf_paths(args.paths), args.out)
+            mode = "처음부터 다시 병합" if rebuilt else "새 파일만 추가"
+            print(f"{mode}: {len(added)}개 파일")
+            output = Path(args.out)
+        elif args.command == "merge":
+            output = merge(_expand_pdf_paths(args.paths), args.out, args.streaming)
+        elif args.command == "reorder":
+            output = reorder(args.path, args.order, args.out)
+        elif args.cache:
+            output = DocxCache(args.cache).convert(args.path, args.out, workers=args.workers)
+        else:
+            output = to_docx(args.path, args.out, args.workers, _print_progress)
+        print(f"저장된 파일 경로: {output.resolve()}")
+        if args.command in ("merge", "reorder") and args.optimize:
+            _optimize_and_report([output], args.dpi, args.quality)
+        if args.command in ("merge", "reorder") and args.linearize:
+            linearize_pdf(output)
+        return 0
+    except (NotADirectoryError, FileNotFoundError, ValueError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"알 수 없는 오류가 발생했습니다: {e}", file=sys.stderr)
+        return 1
 
 
 # 이 스크립트 파일이 직접 실행될 때만 main() 함수 호출함.
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
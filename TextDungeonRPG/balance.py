@@ -0,0 +1,327 @@
+# 게임 밸런스를 확인하는 도구임. input()/print() 없이 main.py의 전투 규칙으로 전투를 대량으로 돌려 봄.
+# 사용법:
+#   python TextDungeonRPG/balance.py simulate --level 5 --floors 1-10 --fights 1000000 --policy skill
+#   python TextDungeonRPG/balance.py solve --floor 10 --levels 1-15 --policy skill
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from main import Dungeon, Player
+
+# 스킬 한 번에 드는 마나임. (Player.use_skill과 같은 값)
+SKILL_COST = 10
+# 전투가 끝나지 않는 경우를 막기 위한 최대 턴 수임.
+MAX_TURNS = 1000
+# 정확한 계산(solve)에서 기억해 둘 전투 상태의 최대 개수임.
+SOLVER_CACHE_SIZE = 2**20
+
+
+# level레벨 플레이어를 만듦. 게임과 같은 레벨업 규칙(Player.level_up)을 그대로 씀.
+def player_at_level(level):
+    player = Player("시뮬레이션", 100, 10)
+    for _ in range(level - 1):
+        player.level_up()
+    return player
+
+
+# --- 행동 정책(policy): 전투 상태 배열을 받아 전투마다 스킬을 쓸지(True) 정함 ---
+# 인자: 플레이어 공격력, 플레이어 체력/마나, 몬스터 체력 (배열 또는 숫자 하나).
+# 마나가 부족하면 True여도 일반 공격함.
+
+
+def always_attack(power, player_hp, player_mp, monster_hp):
+    return np.zeros_like(monster_hp, dtype=bool)
+
+
+def skill_when_possible(power, player_hp, player_mp, monster_hp):
+    return np.ones_like(monster_hp, dtype=bool)
+
+
+# 일반 공격으로는 확실히 못 잡을 때만 스킬을 써서 마나를 아낌.
+def skill_unless_finishing(power, player_hp, player_mp, monster_hp):
+    return monster_hp > power - 2
+
+
+POLICIES = {
+    "attack": always_attack,
+    "skill": skill_when_possible,
+    "finisher": skill_unless_finishing,
+}
+
+
+def simulate_floor(level, floor, fights, policy=skill_when_possible, seed=None):
+    """
+    level레벨 플레이어(체력/마나 가득)가 floor층 몬스터와 fights번 싸우는 것을 한꺼번에 계산함.
+    - 전투마다 반복문을 돌지 않고, 턴마다 아직 끝나지 않은 전투 전체를 NumPy 배열로 한 번에 진행함.
+    - 반환값: {"wins": 승리 여부 배열, "turns": 턴 수 배열, "player_hp": 남은 체력 배열}
+    """
+    rng = np.random.default_rng(seed)
+    player = player_at_level(level)
+    _, hp_range, power_range, _ = Dungeon().monster_stats(floor)
+
+    # random.randint(a, b)는 b를 포함하므로 endpoint=True로 맞춤.
+    monster_hp = rng.integers(*hp_range, size=fights, endpoint=True)
+    monster_power = rng.integers(*power_range, size=fights, endpoint=True)
+    player_hp = np.full(fights, player.hp)
+    player_mp = np.full(fights, player.mp)
+    wins = np.zeros(fights, dtype=bool)
+    turns = np.zeros(fights, dtype=np.int32)
+
+    # active: 아직 끝나지 않은 전투 번호. 턴마다 줄어듦.
+    active = np.arange(fights)
+    for turn in range(1, MAX_TURNS + 1):
+        if len(active) == 0:
+            break
+        hp, mp, m_hp = player_hp[active], player_mp[active], monster_hp[active]
+
+        # 플레이어의 턴: 스킬은 공격력의 2배, 일반 공격은 공격력 ±2
+        use_skill = policy(player.power, hp, mp, m_hp) & (mp >= SKILL_COST)
+        damage = np.where(
+            use_skill,
+            player.power * 2,
+            rng.integers(player.power - 2, player.power + 2, size=len(active), endpoint=True),
+        )
+        m_hp = m_hp - damage
+        mp = mp - SKILL_COST * use_skill
+        turns[active] = turn
+
+        # 몬스터의 턴: 살아 있는 몬스터만 공격함.
+        alive = m_hp > 0
+        m_power = monster_power[active]
+        hp = hp - alive * rng.integers(m_power - 2, m_power + 2, endpoint=True)
+
+        monster_hp[active], player_hp[active], player_mp[active] = m_hp, hp, mp
+        wins[active[~alive]] = True
+        active = active[alive & (hp > 0)]
+
+    return {"wins": wins, "turns": turns, "player_hp": player_hp}
+
+
+# 정확한 계산(solve)의 아이디어:
+# 정책은 플레이어 체력을 보지 않으므로, "몬스터가 몇 번째 턴에 죽는가"(몬스터 체력/플레이어 마나에만 달림)와
+# "플레이어가 몇 번째 턴에 죽는가"(플레이어 체력/몬스터 공격력에만 달림)는 서로 독립임.
+# 두 분포를 각각 메모이제이션으로 구한 뒤 곱해서 합치면 상태 수가 크게 줄어듦.
+
+
+# 몬스터가 지금부터 t+1번째 턴에 쓰러질 확률 kills[t]의 튜플을 반환함.
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def _kill_turns(monster_hp, player_mp, power, policy_name):
+    # 정책이 플레이어 체력을 쓰면 이 계산이 틀리므로 None을 넘겨 바로 오류가 나게 함.
+    if bool(POLICIES[policy_name](power, None, player_mp, monster_hp)) and player_mp >= SKILL_COST:
+        attacks = [(power * 2, 1.0)]
+        player_mp -= SKILL_COST
+    else:
+        # 일반 공격 데미지는 power-2 ~ power+2가 같은 확률(1/5)임.
+        attacks = [(damage, 0.2) for damage in range(power - 2, power + 3)]
+
+    kills = [0.0]
+    for damage, p in attacks:
+        left = monster_hp - damage
+        if left <= 0:
+            kills[0] += p
+            continue
+        # 다음 턴부터의 분포를 한 턴 뒤로 밀어서 더함.
+        rest = _kill_turns(left, player_mp, power, policy_name)
+        kills.extend([0.0] * (len(rest) + 1 - len(kills)))
+        for t, value in enumerate(rest, start=1):
+            kills[t] += p * value
+    return tuple(kills)
+
+
+# 몬스터가 계속 공격할 때 플레이어가 지금부터 t+1번째 턴에 쓰러질 확률 deaths[t]의 튜플을 반환함.
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def _death_turns(player_hp, monster_power):
+    deaths = [0.0]
+    for damage in range(monster_power - 2, monster_power + 3):
+        left = player_hp - damage
+        if left <= 0:
+            deaths[0] += 0.2
+            continue
+        rest = _death_turns(left, monster_power)
+        deaths.extend([0.0] * (len(rest) + 1 - len(deaths)))
+        for t, value in enumerate(rest, start=1):
+            deaths[t] += 0.2 * value
+    return tuple(deaths)
+
+
+# 길이가 서로 다른 분포(튜플)들의 평균을 길이 length짜리 배열로 만듦.
+def _mean_turns(distributions, length):
+    total = np.zeros(length)
+    for dist in distributions:
+        total[: len(dist)] += dist
+    return total / len(distributions)
+
+
+def solve_battle(player, hp_range, power_range, policy_name="skill"):
+    """
+    player가 체력 hp_range, 공격력 power_range(양 끝 포함, 고르게 뽑힘)인 몬스터와 싸운 결과를
+    표본 추출 없이 정확하게 계산함.
+    - 반환값: {"win": 승률, "loss": 패배 확률, "win_turns": 턴별 승리 확률 리스트(0번=1턴),
+              "loss_turns": 턴별 패배 확률 리스트, "turns_mean": 평균 턴 수}
+    """
+    kills = [
+        _kill_turns(monster_hp, player.mp, player.power, policy_name)
+        for monster_hp in range(hp_range[0], hp_range[1] + 1)
+    ]
+    deaths = [
+        _death_turns(player.hp, monster_power)
+        for monster_power in range(power_range[0], power_range[1] + 1)
+    ]
+    # 몬스터 체력과 공격력은 따로 뽑히므로, 각각 평균 낸 분포를 곱해도 정확함.
+    length = max(map(len, kills + deaths))
+    kill = _mean_turns(kills, length)
+    death = _mean_turns(deaths, length)
+
+    # t턴에 이기려면: 몬스터가 t턴에 쓰러지고, 플레이어는 t-1턴까지 버텨야 함. (플레이어가 먼저 공격)
+    # t턴에 지려면: 몬스터가 t턴에도 살아 있고, 플레이어가 t턴에 쓰러져야 함.
+    player_alive = 1 - np.concatenate(([0.0], np.cumsum(death)[:-1]))
+    monster_alive = 1 - np.cumsum(kill)
+    win_turns = kill * player_alive
+    loss_turns = death * monster_alive
+    turns = np.arange(1, length + 1)
+    return {
+        "win": float(win_turns.sum()),
+        "loss": float(loss_turns.sum()),
+        "win_turns": win_turns.tolist(),
+        "loss_turns": loss_turns.tolist(),
+        "turns_mean": float(((win_turns + loss_turns) * turns).sum()),
+    }
+
+
+def solve_floor(level, floor, policy_name="skill"):
+    """level레벨 플레이어(체력/마나 가득)가 floor층 몬스터를 이길 정확한 확률 등을 계산함."""
+    _, hp_range, power_range, _ = Dungeon().monster_stats(floor)
+    return solve_battle(player_at_level(level), hp_range, power_range, policy_name)
+
+
+# 프로세스 하나가 맡은 전투들을 돌리고, 주고받기 쉽게 요약(히스토그램)만 반환함.
+def _simulate_shard(level, floor, fights, policy_name, seed):
+    result = simulate_floor(level, floor, fights, POLICIES[policy_name], seed)
+    wins = result["wins"]
+    return {
+        "wins": int(wins.sum()),
+        "fights": fights,
+        "turns": np.bincount(result["turns"], minlength=MAX_TURNS + 1),
+        # 이긴 전투의 남은 체력 분포임.
+        "player_hp": np.bincount(result["player_hp"][wins].clip(0)),
+    }
+
+
+def run_floors(level, floors, fights, policy_name="skill", workers=None, seed=None):
+    """
+    여러 층을 각각 fights번씩 시뮬레이션함. 전투를 여러 프로세스에 나눠 돌림.
+    - 반환값: 층별 요약 딕셔너리 리스트 (승률, 평균/백분위 턴 수, 이긴 전투의 남은 체력 백분위)
+    """
+    workers = workers or os.cpu_count() or 1
+    # SeedSequence.spawn: 프로세스마다 겹치지 않는 난수열을 만듦.
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(floors) * workers))
+    tasks = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for floor in floors:
+            shard_sizes = [fights // workers + (i < fights % workers) for i in range(workers)]
+            tasks.append(
+                [
+                    executor.submit(_simulate_shard, level, floor, size, policy_name, next(seeds))
+                    for size in shard_sizes
+                    if size
+                ]
+            )
+
+        reports = []
+        for floor, futures in zip(floors, tasks):
+            shards = [future.result() for future in futures]
+            turns = sum(shard["turns"] for shard in shards)
+            hp_length = max(len(shard["player_hp"]) for shard in shards)
+            player_hp = sum(np.pad(s["player_hp"], (0, hp_length - len(s["player_hp"]))) for s in shards)
+            wins = sum(shard["wins"] for shard in shards)
+            reports.append(
+                {
+                    "floor": floor,
+                    "win_rate": wins / fights,
+                    "turns_mean": float((turns * np.arange(len(turns))).sum() / fights),
+                    "turns_p50": _percentile(turns, 50),
+                    "turns_p95": _percentile(turns, 95),
+                    "hp_p10": _percentile(player_hp, 10) if wins else None,
+                    "hp_p50": _percentile(player_hp, 50) if wins else None,
+                }
+            )
+    return reports
+
+
+# 히스토그램(값별 개수)에서 백분위 값을 찾음.
+def _percentile(counts, q):
+    cumulative = np.cumsum(counts)
+    return int(np.searchsorted(cumulative, cumulative[-1] * q / 100))
+
+
+# "1-10" 또는 "3,5,7" 형식의 층 목록을 리스트로 바꿈.
+def parse_floors(text):
+    floors = []
+    for part in text.split(","):
+        start, _, end = part.partition("-")
+        floors.extend(range(int(start), int(end or start) + 1))
+    return floors
+
+
+def cmd_simulate(args):
+    floors = parse_floors(args.floors)
+    start = time.perf_counter()
+    reports = run_floors(args.level, floors, args.fights, args.policy, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Lv.{args.level} 플레이어, 정책 '{args.policy}', 층마다 {args.fights:,}번 전투")
+    print(f"{'층':>4}{'승률':>9}{'평균 턴':>9}{'턴 p50':>8}{'턴 p95':>8}{'남은 HP p10':>12}{'p50':>6}")
+    for r in reports:
+        hp10 = "-" if r["hp_p10"] is None else r["hp_p10"]
+        hp50 = "-" if r["hp_p50"] is None else r["hp_p50"]
+        print(
+            f"{r['floor']:>4}{r['win_rate']:>9.2%}{r['turns_mean']:>9.2f}"
+            f"{r['turns_p50']:>8}{r['turns_p95']:>8}{hp10:>12}{hp50:>6}"
+        )
+    total = args.fights * len(floors)
+    print(f"전투 {total:,}번, {elapsed:.2f}초 (분당 {total / elapsed * 60:,.0f}번)")
+
+
+def cmd_solve(args):
+    print(f"{args.floor}층, 정책 '{args.policy}' (정확한 계산)")
+    print(f"{'레벨':>4}{'승률':>12}{'평균 턴':>9}{'계산(ms)':>10}")
+    for level in parse_floors(args.levels):
+        start = time.perf_counter()
+        result = solve_floor(level, args.floor, args.policy)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{level:>4}{result['win']:>12.6%}{result['turns_mean']:>9.2f}{elapsed:>10.1f}")
+    states = _kill_turns.cache_info().currsize + _death_turns.cache_info().currsize
+    print(f"계산한 상태 {states:,}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텍스트 던전 RPG 밸런스 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("simulate", help="몬테카를로 전투 시뮬레이션으로 층별 승률 확인")
+    p.add_argument("--level", type=int, default=1, help="플레이어 레벨")
+    p.add_argument("--floors", default="1-10", help="층 목록 (예: 1-10 또는 3,7,10)")
+    p.add_argument("--fights", type=int, default=100_000, help="층마다 전투 수")
+    p.add_argument("--policy", choices=list(POLICIES), default="skill", help="행동 정책")
+    p.add_argument("--workers", type=int, default=None, help="사용할 프로세스 수")
+    p.add_argument("--seed", type=int, default=None, help="같은 결과를 다시 보려면 지정")
+    p = sub.add_parser("solve", help="동적 계획법으로 정확한 승률 계산 (레벨별)")
+    p.add_argument("--floor", type=int, default=10, help="층")
+    p.add_argument("--levels", default="1-10", help="플레이어 레벨 목록 (예: 1-15 또는 3,5)")
+    p.add_argument("--policy", choices=list(POLICIES), default="skill", help="행동 정책")
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        cmd_simulate(args)
+    else:
+        cmd_solve(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+# 게임 진행 속도를 측정하는 스크립트임. 같은 규칙으로 자동 전투를 돌려 초당 턴 수를 비교함.
+# 사용법:
+#   python TextDungeonRPG/bench.py turns --turns 200000
+#   python TextDungeonRPG/bench.py turns --turns 20 --delay 1   (실제 게임처럼 1초씩 쉼)
+#   python TextDungeonRPG/bench.py replay --turns 100000 --snapshot-every 50
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from main import SNAPSHOT_EVERY, ConsoleRenderer, EventBus, EventLog, GameRun, Replay, auto_action
+
+
+def play_turns(turns, bus):
+    """
+    던전을 자동으로 돌면서 turns번의 턴을 진행함. 지거나 던전을 깨면 새 플레이어로 다시 시작함.
+    - 반환값: 걸린 시간(초)
+    """
+    count = 0
+
+    # 행동을 고를 때마다 턴 수를 셈.
+    def choose(player, monster):
+        nonlocal count
+        count += 1
+        return auto_action(player, monster)
+
+    start = time.perf_counter()
+    while count < turns:
+        run = GameRun("벤치마크", bus=bus)
+        while count < turns and run.player.is_alive() and not run.dungeon.is_cleared():
+            run.battle(choose)
+    return time.perf_counter() - start
+
+
+# 긴 기록을 만들기 위한 행동: 체력이 1/3 아래로 떨어지면 싸우지 않고 도망만 다님.
+def long_session_action(player, monster):
+    if player.hp * 3 < player.max_hp:
+        return "flee"
+    return auto_action(player, monster)
+
+
+def record_session(path, turns, snapshot_every, seed):
+    """한 판을 자동으로 최대 turns턴까지 진행하며 기록함. 반환값: 실제 진행한 턴 수"""
+    log = EventLog(path, snapshot_every)
+    run = GameRun("벤치마크", seed, log=log)
+    while run.turn < turns and run.player.is_alive():
+        run.explore()
+        while run.turn < turns and run.act(long_session_action(run.player, run.monster)) is None:
+            pass
+    log.close()
+    return run.turn
+
+
+def bench_turns(args):
+    def report(name, elapsed):
+        print(f"{name:<22}{args.turns:>10,}턴 {elapsed:>8.3f}초 {args.turns / elapsed:>14,.0f}턴/초")
+
+    # 구독자가 없는 버스: 입출력 없이 규칙만 돌아감.
+    report("headless", play_turns(args.turns, EventBus()))
+
+    # 화면 출력 담당을 붙인 버스: 글자를 만들어 출력하는 비용까지 포함함.
+    # 터미널이 느려서 결과가 흔들리지 않도록 기본값은 버리는 곳(os.devnull)에 출력함.
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        bus = EventBus()
+        ConsoleRenderer(bus, delay=args.delay, out=None if args.stdout else devnull)
+        report(f"console (delay {args.delay}s)", play_turns(args.turns, bus))
+
+
+def bench_replay(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.dlog")
+        start = time.perf_counter()
+        turns = record_session(path, args.turns, args.snapshot_every, args.seed)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+        print(f"기록: {turns:,}턴, {elapsed:.3f}초, 파일 {size / 1024:,.1f}KB ({size / turns:.1f}바이트/턴), "
+              f"스냅숏 {os.path.getsize(path + '.snap') / 1024:,.1f}KB")
+
+        # 스냅숏을 쓰지 않는 재생기: 항상 처음부터 다시 돌림.
+        without = Replay(path)
+        without.snapshots, without.snapshot_turns = [], []
+        start = time.perf_counter()
+        without.seek()
+        elapsed = time.perf_counter() - start
+        print(f"처음부터 끝까지 재생: {elapsed:.3f}초 ({turns / elapsed:,.0f}턴/초, 결과 검증 포함)")
+
+        # 무작위 턴으로 이동하는 시간: 스냅숏이 있을 때와 없을 때(처음부터 재생)를 비교함.
+        targets = random.Random(args.seed).sample(range(turns), min(args.seeks, turns))
+        replay = Replay(path)
+        for name, target_replay in (("스냅숏 사용", replay), ("처음부터", without)):
+            start = time.perf_counter()
+            for target in targets:
+                target_replay.seek(target)
+            elapsed = time.perf_counter() - start
+            print(f"무작위 턴 이동 {len(targets)}번 ({name}): 평균 {elapsed / len(targets) * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TextDungeonRPG 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("turns", help="입출력 없는 모드와 화면 출력 모드의 초당 턴 수 비교")
+    p.add_argument("--turns", type=int, default=200_000, help="진행할 턴 수")
+    p.add_argument("--delay", type=float, default=0.0, help="화면 출력 모드에서 몬스터 공격 전 쉬는 시간(초)")
+    p.add_argument("--stdout", action="store_true", help="화면 출력 모드의 글자를 실제로 화면에 출력")
+    p = sub.add_parser("replay", help="기록 크기, 재생 속도, 턴 이동 시간 측정")
+    p.add_argument("--turns", type=int, default=100_000, help="기록할 턴 수")
+    p.add_argument("--snapshot-every", type=int, default=SNAPSHOT_EVERY, help="스냅숏 간격(턴)")
+    p.add_argument("--seeks", type=int, default=50, help="무작위 턴 이동 횟수")
+    p.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    if args.command == "turns":
+        bench_turns(args)
+    else:
+        bench_replay(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,157 @@
+import argparse
+import bisect
+import json
+import os
 import random
+import struct
+import sys
 import time
+from dataclasses import dataclass
+
+# --- 이벤트(Event) 정의: 게임에서 일어난 일을 담는 데이터 ---
+# 게임 규칙(클래스/함수)은 print()나 time.sleep()을 직접 하지 않고, 일어난 일을 이벤트로 알리기만 함.
+# 화면 출력은 이벤트를 구독(subscribe)하는 ConsoleRenderer가 맡음.
+# 그래서 아무도 구독하지 않으면 같은 규칙이 입출력 없이 아주 빠르게 돌아감. (봇, 시뮬레이션, 서버 등)
+
+# 한 판의 기록 파일(EventLog)을 저장할 폴더와, 상태 스냅숏을 남기는 간격(턴)임.
+# 실제 한 판은 수백 턴 정도라서 간격을 짧게 잡고, 층이 바뀔 때도 스냅숏을 남김.
+# 스냅숏 하나는 난수 생성기 상태 때문에 수 KB라서, 스냅숏 파일이 기록 파일보다 큼.
+LOG_DIR = "dungeon_logs"
+SNAPSHOT_EVERY = 50
+
+
+@dataclass
+class Attacked:
+    attacker: str
+    target: str
+    damage: int
+
+
+@dataclass
+class SkillUsed:
+    user: str
+    target: str
+    damage: int
+    cost: int
+
+
+@dataclass
+class SkillFailed:
+    user: str
+
+
+@dataclass
+class ExpGained:
+    amount: int
+    exp: int
+    max_exp: int
+
+
+@dataclass
+class LeveledUp:
+    level: int
+
+
+@dataclass
+class BattleStarted:
+    monster: str
+
+
+# 몬스터가 공격하기 직전에 알림. 화면에서 잠깐 멈추는 용도로 씀.
+@dataclass
+class MonsterTurn:
+    monster: str
+
+
+@dataclass
+class BattleEnded:
+    monster: str
+    result: str  # "win", "lose", "flee" 중 하나
+
+
+@dataclass
+class FloorChanged:
+    floor: int
+
+
+class EventBus:
+    """
+    이벤트를 구독자(함수)들에게 전달하는 클래스임.
+    메서드: subscribe(이벤트 종류, 함수), publish(이벤트)
+    """
+
+    def __init__(self):
+        # 이벤트 종류(클래스) -> 구독한 함수 리스트
+        self._handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def publish(self, event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+
+
+class ConsoleRenderer:
+    """
+    이벤트를 받아 화면에 출력하는 구독자임.
+    - delay: 몬스터가 공격하기 전에 쉬는 시간(초). 0이면 멈추지 않음.
+    - out: 출력할 곳 (기본값: 화면)
+    """
+
+    def __init__(self, bus, delay=1.0, out=None):
+        self.delay = delay
+        self.out = out or sys.stdout
+        bus.subscribe(Attacked, self.on_attacked)
+        bus.subscribe(SkillUsed, self.on_skill_used)
+        bus.subscribe(SkillFailed, self.on_skill_failed)
+        bus.subscribe(ExpGained, self.on_exp_gained)
+        bus.subscribe(LeveledUp, self.on_leveled_up)
+        bus.subscribe(BattleStarted, self.on_battle_started)
+        bus.subscribe(MonsterTurn, self.on_monster_turn)
+        bus.subscribe(BattleEnded, self.on_battle_ended)
+        bus.subscribe(FloorChanged, self.on_floor_changed)
+
+    def show(self, text):
+        print(text, file=self.out)
+
+    def on_attacked(self, event):
+        # f-string을 사용해 공격 로그를 실감 나게 출력함.
+        self.show(f"⚔️ {event.attacker}의 공격! {event.target}에게 {event.damage}의 데미지를 입혔음.")
+
+    def on_skill_used(self, event):
+        self.show(f"✨ {event.user}의 스킬! '강력한 일격' 발동! (MP {event.cost} 소모)")
+        self.show(f"{event.target}에게 {event.damage}의 엄청난 데미지를 입혔음.")
+
+    def on_skill_failed(self, event):
+        self.show("MP가 부족하여 스킬을 사용할 수 없음.")
+
+    def on_exp_gained(self, event):
+        self.show(f"{event.amount}의 경험치를 획득했음. (현재 경험치: {event.exp}/{event.max_exp})")
+
+    def on_leveled_up(self, event):
+        self.show(
+            f"🎉 레벨 업! {event.level}레벨이 되었음. 모든 능력치가 상승하고 체력과 마나가 회복됨."
+        )
+
+    def on_battle_started(self, event):
+        self.show(f"\n야생의 {event.monster}이(가) 나타났다!")
+
+    def on_monster_turn(self, event):
+        if self.delay:
+            time.sleep(self.delay)  # 잠시 멈춰서 게임 진행 속도를 조절함.
+
+    def on_battle_ended(self, event):
+        if event.result == "win":
+            self.show(f"{event.monster}을(를) 물리쳤다!")
+        elif event.result == "lose":
+            self.show("눈앞이 깜깜해졌다...")
+        else:
+            self.show("무사히 도망쳤다.")
+
+    def on_floor_changed(self, event):
+        self.show(f"\n던전 {event.floor}층으로 내려갔음.")
+
 
 # --- 클래스(Class) 정의: 게임 세계의 설계도 ---
 
@@ -7,24 +159,27 @@ import time
 class Character:
     """
     모든 캐릭터(플레이어, 몬스터)의 기본이 되는 부모 클래스임.
-    속성: 이름(name), 체력(hp), 공격력(power)
+    속성: 이름(name), 체력(hp), 공격력(power), 이벤트 버스(bus), 난수 생성기(rng)
     메서드: attack(), is_alive(), show_status()
     """
 
     # 생성자: 객체가 만들어질 때 기본적인 능력치를 설정함.
-    def __init__(self, name, hp, power):
+    # bus를 주지 않으면 아무도 듣지 않는 버스를 씀. (입출력 없음)
+    # rng를 주지 않으면 전역 random 모듈을 씀. (GameRun은 시드를 정한 random.Random을 넘김)
+    def __init__(self, name, hp, power, bus=None, rng=None):
         self.name = name  # 이름
         self.max_hp = hp  # 최대 체럭
         self.hp = hp  # 현재 체력
         self.power = power  # 공격력
+        self.bus = bus or EventBus()  # 일어난 일을 알릴 이벤트 버스
+        self.rng = rng or random  # 데미지를 정할 난수 생성기
 
     # 대상을 공격하는 기능임.
     def attack(self, target):
         # 공격력은 power 값 기준으로 랜덤하게 정해짐.
-        damage = random.randint(self.power - 2, self.power + 2)
+        damage = self.rng.randint(self.power - 2, self.power + 2)
         target.hp -= damage
-        print(f"⚔️ {self.name}의 공격! {target.name}에게 {damage}의 데미지를 입혔음.")
-        # f-string을 사용해 공격 로그를 실감 나게 출력함.
+        self.bus.publish(Attacked(self.name, target.name, damage))
 
     # 캐릭터의 생존 여부(True/False)를 반환함.
     def is_alive(self):
@@ -42,9 +197,9 @@ class Player(Character):
     추가 메서드: gain_exp(), use_skill()
     """
 
-    def __init__(self, name, hp, power):
+    def __init__(self, name, hp, power, bus=None, rng=None):
         # super()를 이용해 부모 클래스의 생성자를 호출함.
-        super().__init__(name, hp, power)
+        super().__init__(name, hp, power, bus, rng)
         self.level = 1  # 레벨
         self.exp = 0  # 현재 경험치
         self.max_exp = 10 * self.level  # 레벨업 경험치
@@ -59,32 +214,33 @@ class Player(Character):
             self.mp -= skill_cost
             damage = self.power * 2  # 스킬은 일반 공격의 2배 데미지
             target.hp -= damage
-            print(f"✨ {self.name}의 스킬! '강력한 일격' 발동! (MP {skill_cost} 소모)")
-            print(f"{target.name}에게 {damage}의 엄청난 데미지를 입혔음.")
+            self.bus.publish(SkillUsed(self.name, target.name, damage, skill_cost))
             return True  # 스킬 사용 성공
         else:
-            print("MP가 부족하여 스킬을 사용할 수 없음.")
+            self.bus.publish(SkillFailed(self.name))
             return False  # 스킬 사용 실패
 
     # 경험치를 얻고 레벨업을 처리함.
     def gain_exp(self, amount):
         self.exp += amount
-        print(f"{amount}의 경험치를 획득했음. (현재 경험치: {self.exp}/{self.max_exp})")
+        self.bus.publish(ExpGained(amount, self.exp, self.max_exp))
 
         # while 반복문: 경험치가 충분하면 여러 번 레벨업 가능하도록 수정
         while self.exp >= self.max_exp:
-            self.level += 1
             self.exp -= self.max_exp
-            self.max_exp = 10 * self.level
-            # 레벨업 보상 강화
-            self.max_hp += 20
-            self.hp = self.max_hp  # 체력 전체 회복
-            self.power += 3
-            self.max_mp += 5
-            self.mp = self.max_mp  # 마나 전체 회복
-            print(
-                f"🎉 레벨 업! {self.level}레벨이 되었음. 모든 능력치가 상승하고 체력과 마나가 회복됨."
-            )
+            self.level_up()
+            self.bus.publish(LeveledUp(self.level))
+
+    # 레벨을 하나 올리고 능력치를 올림. 시뮬레이터에서 N레벨 플레이어를 만들 때도 씀.
+    def level_up(self):
+        self.level += 1
+        self.max_exp = 10 * self.level
+        # 레벨업 보상 강화
+        self.max_hp += 20
+        self.hp = self.max_hp  # 체력 전체 회복
+        self.power += 3
+        self.max_mp += 5
+        self.mp = self.max_mp  # 마나 전체 회복
 
     # 메서드 오버라이딩: 부모의 show_status를 재정의해서 추가 정보 출력.
     def show_status(self):
@@ -99,56 +255,65 @@ class Monster(Character):
     추가 속성: 처치 시 얻는 경험치(exp_reward)
     """
 
-    def __init__(self, name, hp, power, exp_reward):
-        super().__init__(name, hp, power)
+    def __init__(self, name, hp, power, exp_reward, bus=None, rng=None):
+        super().__init__(name, hp, power, bus, rng)
         self.exp_reward = exp_reward
 
 
 class Dungeon:
     """
     던전의 상태를 관리하는 클래스임.
-    속성: 현재 층(current_floor), 최대 층(max_floor)
+    속성: 현재 층(current_floor), 최대 층(max_floor), 이벤트 버스(bus), 난수 생성기(rng)
     메서드: next_floor(), generate_monster(), is_cleared()
     """
 
-    def __init__(self):
+    def __init__(self, bus=None, rng=None):
         self.current_floor = 1
         self.max_floor = 10
+        self.bus = bus or EventBus()
+        self.rng = rng or random
 
     def next_floor(self):
         self.current_floor += 1
-        print(f"\n던전 {self.current_floor}층으로 내려갔음.")
-
-    def generate_monster(self):
+        self.bus.publish(FloorChanged(self.current_floor))
+
+    # 층별 몬스터 능력치의 범위를 반환함. 시뮬레이터도 같은 규칙을 쓰도록 따로 뺌.
+    def monster_stats(self, floor=None):
+        """
+        - 반환값: (이름 후보 리스트, (최소 체력, 최대 체력), (최소 공격력, 최대 공격력), 경험치)
+        """
+        floor = floor or self.current_floor
         # 층이 깊어질수록 강한 몬스터가 나옴.
-        if self.current_floor <= 3:
-            base_hp = 30 + self.current_floor * 5
-            base_power = 5 + self.current_floor
-            hp = random.randint(int(base_hp * 0.9), int(base_hp * 1.1))
-            power = random.randint(int(base_power * 0.9), int(base_power * 1.1))
-            name = random.choice(["슬라임", "고블린"])
-            monster = Monster(name, hp, power, 5 * self.current_floor)
-        elif self.current_floor <= 7:
-            base_hp = 50 + self.current_floor * 8
-            base_power = 8 + self.current_floor
-            hp = random.randint(int(base_hp * 0.9), int(base_hp * 1.1))
-            power = random.randint(int(base_power * 0.9), int(base_power * 1.1))
-            name = random.choice(["슬라임", "고블린", "오크"])
-            monster = Monster(name, hp, power, 10 * self.current_floor)
-        elif self.current_floor < self.max_floor:
-            base_hp = 80 + self.current_floor * 12
-            base_power = 12 + self.current_floor
-            hp = random.randint(int(base_hp * 0.9), int(base_hp * 1.1))
-            power = random.randint(int(base_power * 0.9), int(base_power * 1.1))
-            name = random.choice(["고블린", "오크"])
-            monster = Monster(name, hp, power, 15 * self.current_floor)
+        if floor <= 3:
+            base_hp = 30 + floor * 5
+            base_power = 5 + floor
+            names = ["슬라임", "고블린"]
+            exp_reward = 5 * floor
+        elif floor <= 7:
+            base_hp = 50 + floor * 8
+            base_power = 8 + floor
+            names = ["슬라임", "고블린", "오크"]
+            exp_reward = 10 * floor
+        elif floor < self.max_floor:
+            base_hp = 80 + floor * 12
+            base_power = 12 + floor
+            names = ["고블린", "오크"]
+            exp_reward = 15 * floor
         else:  # 마지막 10층 보스
             base_hp = 300
             base_power = 40
-            hp = random.randint(int(base_hp * 0.9), int(base_hp * 1.1))
-            power = random.randint(int(base_power * 0.9), int(base_power * 1.1))
-            monster = Monster("[던전의 지배자] 드래곤 🐉", hp, power, 100)
-        return monster
+            names = ["[던전의 지배자] 드래곤 🐉"]
+            exp_reward = 100
+        hp_range = (int(base_hp * 0.9), int(base_hp * 1.1))
+        power_range = (int(base_power * 0.9), int(base_power * 1.1))
+        return names, hp_range, power_range, exp_reward
+
+    def generate_monster(self):
+        names, hp_range, power_range, exp_reward = self.monster_stats()
+        hp = self.rng.randint(*hp_range)
+        power = self.rng.randint(*power_range)
+        name = self.rng.choice(names)
+        return Monster(name, hp, power, exp_reward, self.bus, self.rng)
 
     def is_cleared(self):
         return self.current_floor > self.max_floor
@@ -157,79 +322,435 @@ class Dungeon:
 # --- 함수(Function) 정의: 게임의 각 기능을 담당하는 부품 ---
 
 
-def start_battle(player, monster):
+# 전투 한 턴을 진행함. 입출력 없이 규칙만 처리하고, 일어난 일은 이벤트로 알림.
+def play_turn(player, monster, action):
     """
-    전투를 진행하는 함수.
-    플레이어와 몬스터 객체를 인자로 받음.
-    플레이어가 승리하면 True, 패배하거나 도망치면 False를 반환함.
+    - action: "attack"(공격), "skill"(스킬), "flee"(도망) 중 하나
+    - 반환값: 전투가 끝나면 "win", "lose", "flee", 아직 계속되면 None
     """
-    print(f"\n야생의 {monster.name}이(가) 나타났다!")
-
-    # while 반복문: 둘 중 하나가 쓰러질 때까지 전투를 반복함.
-    while player.is_alive() and monster.is_alive():
+    bus = player.bus
+    if action == "flee":
+        bus.publish(BattleEnded(monster.name, "flee"))
+        return "flee"  # 도망은 패배로 간주
+
+    if action == "skill":
+        # MP가 부족해 스킬을 못 쓰면 턴이 끝나지 않음.
+        if not player.use_skill(monster):
+            return None
+    else:
+        player.attack(monster)
+
+    # 몬스터 생존 확인
+    if not monster.is_alive():
+        bus.publish(BattleEnded(monster.name, "win"))
+        player.gain_exp(monster.exp_reward)
+        return "win"  # 플레이어 승리
+
+    # 몬스터의 턴
+    bus.publish(MonsterTurn(monster.name))
+    monster.attack(player)
+    if not player.is_alive():
+        bus.publish(BattleEnded(monster.name, "lose"))
+        return "lose"  # 플레이어 패배
+    return None
+
+
+BATTLE_ACTIONS = {"1": "attack", "2": "skill", "3": "flee"}
+
+
+# 사람에게 전투 메뉴를 보여주고 행동을 입력받음.
+def ask_action(player, monster):
+    while True:
         print("\n--- 전투 메뉴 ---")
         player.show_status()
         monster.show_status()
 
-        # try-except 예외 처리: 사용자가 숫자 외의 값을 입력했을 때 프로그램이 멈추지 않도록 함.
+        # try-except 예외 처리: 입력 중 문제가 생겨도 프로그램이 멈추지 않도록 함.
         try:
             choice = input("어떻게 할까? (1. 공격 | 2. 스킬 | 3. 도망가기)\n> ")
+        except Exception as e:
+            print(f"예상치 못한 오류가 발생했습니다: {e}")
+            continue
 
-            player_turn_ended = False
-            # if/elif/else 조건문: 사용자의 선택에 따라 다른 동작을 함.
-            if choice == "1":
-                # 플레이어의 턴
-                player.attack(monster)
-                player_turn_ended = True
+        # 딕셔너리로 입력 번호를 행동 이름으로 바꿈.
+        if choice in BATTLE_ACTIONS:
+            return BATTLE_ACTIONS[choice]
+        print("잘못된 입력입니다.")
 
-            elif choice == "2":
-                # 플레이어의 스킬 턴
-                if player.use_skill(monster):
-                    player_turn_ended = True
 
-            elif choice == "3":
-                print("무사히 도망쳤다.")
-                return False  # 도망은 패배로 간주
+# 자동 전투용 행동: 마나가 있으면 스킬, 없으면 일반 공격을 고름.
+def auto_action(player, monster):
+    return "skill" if player.mp >= 10 else "attack"
 
-            else:
-                print("잘못된 입력입니다.")
 
-            # 플레이어의 턴이 유효하게 끝났을 때만 몬스터가 공격함
-            if player_turn_ended:
-                # 몬스터 생존 확인
-                if not monster.is_alive():
-                    print(f"{monster.name}을(를) 물리쳤다!")
-                    player.gain_exp(monster.exp_reward)
-                    return True  # 플레이어 승리
+class GameRun:
+    """
+    게임 한 판의 상태를 묶어 관리하는 클래스임.
+    속성: 시드(seed), 난수 생성기(rng), 이벤트 버스(bus), 플레이어(player), 던전(dungeon),
+          현재 몬스터(monster), 지금까지 진행한 턴 수(turn), 기록(log)
+    메서드: explore(), act(), battle(), state(), restore()
+    - 모든 무작위 값은 시드로 만든 rng 하나에서 나오므로, 같은 시드와 같은 입력이면 결과도 똑같음.
+    """
 
-                time.sleep(1)  # 잠시 멈춰서 게임 진행 속도를 조절함.
+    def __init__(self, name, seed=None, bus=None, log=None):
+        # 기록 파일 헤더에 8바이트로 저장하므로 시드를 0 ~ 2**64-1 범위로 맞춤.
+        self.seed = random.randrange(2**32) if seed is None else seed % 2**64
+        self.rng = random.Random(self.seed)
+        self.bus = bus or EventBus()
+        self.player = Player(name, 100, 10, self.bus, self.rng)
+        self.dungeon = Dungeon(self.bus, self.rng)
+        self.monster = None
+        self.turn = 0
+        self.log = log
+        if log:
+            log.attach(self)
+
+    # 던전을 탐험해 현재 층의 몬스터를 만남.
+    def explore(self):
+        self.monster = self.dungeon.generate_monster()
+        if self.log:
+            self.log.record(REC_EXPLORE, self.monster.hp)
+        self.bus.publish(BattleStarted(self.monster.name))
+        return self.monster
+
+    # 현재 몬스터와의 전투에서 한 턴을 진행함. 반환값은 play_turn과 같음.
+    def act(self, action):
+        if self.log:
+            self.log.before_turn(self, action)
+        result = play_turn(self.player, self.monster, action)
+        self.turn += 1
+        if result is not None:
+            self.monster = None
+            # 전투에서 승리했을 경우에만 다음 층으로 이동함.
+            if result == "win":
+                self.dungeon.next_floor()
+        return result
+
+    def battle(self, choose_action):
+        """
+        몬스터를 만나 전투를 끝까지 진행함.
+        choose_action(player, monster)가 매 턴 행동("attack", "skill", "flee")을 정함.
+        (사람이 고르면 ask_action, 자동으로 고르면 auto_action 같은 함수를 넘김)
+        플레이어가 승리하면 True, 패배하거나 도망치면 False를 반환함.
+        """
+        self.explore()
+        # while 반복문: 전투가 끝날 때까지 턴을 반복함.
+        while True:
+            result = self.act(choose_action(self.player, self.monster))
+            if result is not None:
+                return result == "win"
+
+    # 지금 상태를 JSON으로 저장할 수 있는 딕셔너리로 만듦. (스냅숏)
+    def state(self):
+        player = self.player
+        monster = self.monster
+        return {
+            "turn": self.turn,
+            "floor": self.dungeon.current_floor,
+            "player": [player.level, player.exp, player.max_exp, player.hp, player.max_hp,
+                       player.mp, player.max_mp, player.power],
+            "monster": monster and [monster.name, monster.hp, monster.max_hp, monster.power,
+                                    monster.exp_reward],
+            "rng": self.rng.getstate(),
+        }
+
+    # state()로 만든 딕셔너리로 상태를 되돌림.
+    def restore(self, state):
+        player = self.player
+        (player.level, player.exp, player.max_exp, player.hp, player.max_hp,
+         player.mp, player.max_mp, player.power) = state["player"]
+        self.turn = state["turn"]
+        self.dungeon.current_floor = state["floor"]
+        self.monster = None
+        if state["monster"]:
+            name, hp, max_hp, power, exp_reward = state["monster"]
+            self.monster = Monster(name, max_hp, power, exp_reward, self.bus, self.rng)
+            self.monster.hp = hp
+        # JSON은 튜플을 리스트로 저장하므로 getstate()와 같은 모양으로 되돌림.
+        version, internal, gauss_next = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss_next))
+
+
+# --- 기록과 재생: 버그 제보("10층 드래곤에게 한 방에 죽었음")를 그대로 다시 돌려 보기 위함 ---
+# 기록 파일 = 헤더(매직, 시드, 이름) + 3바이트 고정 크기 레코드(종류 1바이트, 값 2바이트)의 나열.
+# 입력(탐험, 행동)과 결과(데미지, 전투 결과, 레벨업)를 모두 남기므로, 재생할 때 결과가 다르면 바로 알 수 있음.
+LOG_MAGIC = b"DGNLOG01"
+LOG_HEADER = struct.Struct("<8sQ64s")  # 매직, 시드, 플레이어 이름(UTF-8, 최대 64바이트)
+LOG_RECORD = struct.Struct("<BH")  # 종류, 값
+
+# 레코드 종류
+REC_EXPLORE = 1  # 입력: 탐험 (값: 만난 몬스터의 체력)
+REC_ACTION = 2  # 입력: 전투 행동 (값: ACTION_CODES)
+REC_ATTACK = 3  # 결과: 일반 공격 (값: 데미지)
+REC_SKILL = 4  # 결과: 스킬 (값: 데미지)
+REC_END = 5  # 결과: 전투 끝 (값: RESULT_CODES)
+REC_LEVEL = 6  # 결과: 레벨업 (값: 새 레벨)
+REC_KINDS = {REC_EXPLORE, REC_ACTION, REC_ATTACK, REC_SKILL, REC_END, REC_LEVEL}
+
+ACTION_CODES = {"attack": 0, "skill": 1, "flee": 2}
+ACTION_NAMES = {code: action for action, code in ACTION_CODES.items()}
+RESULT_CODES = {"win": 0, "lose": 1, "flee": 2}
+
+
+class EventLog:
+    """
+    게임 한 판의 입력과 결과를 고정 크기 레코드로 기록하는 구독자임.
+    - path를 주면 파일에 쓰고, snapshot_every턴마다, 그리고 층이 바뀔 때마다
+      상태 스냅숏을 path + ".snap"(JSON Lines)에 씀.
+    - path를 주지 않으면 메모리(records 리스트)에만 기록함. (재생할 때 결과 비교용)
+    """
 
-                # 몬스터의 턴
-                monster.attack(player)
-                if not player.is_alive():
-                    print("눈앞이 깜깜해졌다...")
-                    return False  # 플레이어 패배
+    def __init__(self, path=None, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.records = []
+        self.count = 0  # 지금까지 쓴 레코드 수
+        self._file = None
+        self._snap_file = None
+        self._snap_floor = 1  # 마지막 스냅숏을 남긴 층
+
+    def attach(self, run):
+        bus = run.bus
+        bus.subscribe(Attacked, lambda event: self.record(REC_ATTACK, event.damage))
+        bus.subscribe(SkillUsed, lambda event: self.record(REC_SKILL, event.damage))
+        bus.subscribe(BattleEnded, self.on_battle_ended)
+        bus.subscribe(LeveledUp, lambda event: self.record(REC_LEVEL, event.level))
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "wb")
+            self._file.write(LOG_HEADER.pack(LOG_MAGIC, run.seed, run.player.name.encode("utf-8")[:64]))
+            # 스냅숏은 공유된 기록을 열어도 안전하도록 pickle 대신 JSON으로 저장함.
+            self._snap_file = open(self.path + ".snap", "w", encoding="utf-8")
+
+    def record(self, kind, value):
+        # 값은 2바이트(0~65535)에 맞춤. 데미지, 체력, 레벨은 이 범위를 넘지 않음.
+        value = min(max(value, 0), 0xFFFF)
+        if self._file:
+            self._file.write(LOG_RECORD.pack(kind, value))
+        else:
+            self.records.append((kind, value))
+        self.count += 1
 
-        except Exception as e:
-            print(f"예상치 못한 오류가 발생했습니다: {e}")
+    # 한 턴을 진행하기 직전에 불림. 정해진 간격마다, 또는 새 층의 첫 턴에 스냅숏을 남기고 입력을 기록함.
+    def before_turn(self, run, action):
+        floor = run.dungeon.current_floor
+        if self._snap_file and run.turn and (run.turn % self.snapshot_every == 0 or floor != self._snap_floor):
+            self._snap_floor = floor
+            snapshot = run.state()
+            snapshot["record"] = self.count  # 이 스냅숏 다음에 읽을 레코드 번호
+            self._snap_file.write(json.dumps(snapshot) + "\n")
+        self.record(REC_ACTION, ACTION_CODES[action])
+
+    def on_battle_ended(self, event):
+        self.record(REC_END, RESULT_CODES[event.result])
+        # 전투가 끝날 때마다 파일에 반영해서, 게임이 갑자기 꺼져도 기록이 남게 함.
+        self.flush()
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+            self._snap_file.flush()
 
-    return False  # 비정상적인 경우 패배 처리
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._snap_file.close()
+            self._file = self._snap_file = None
+
+
+class ReplayError(Exception):
+    """재생한 결과가 기록과 다르거나, 기록에 알 수 없는 레코드가 있을 때 발생하는 예외임."""
+
+
+class Replay:
+    """
+    EventLog로 남긴 기록을 입출력 없이 최고 속도로 다시 돌리는 클래스임.
+    메서드: seek(turn), step(turns)
+    - seek(turn): turn턴을 진행하기 직전 상태로 이동함. 가장 가까운 스냅숏에서 출발하므로
+      처음부터 다시 돌리지 않고 (스냅숏과의 거리)만큼만 계산함.
+    - 재생 중 나온 결과를 기록과 비교해서 다르면 ReplayError를 발생시킴.
+    - 게임이 갑자기 꺼져 기록 끝이 잘렸으면 끝의 불완전한 레코드는 버리고 재생함. (버린 바이트 수: truncated)
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < LOG_HEADER.size or data[:len(LOG_MAGIC)] != LOG_MAGIC:
+            raise ValueError(f"던전 기록 파일이 아님: {path}")
+        _, self.seed, name = LOG_HEADER.unpack_from(data)
+        self.name = name.rstrip(b"\0").decode("utf-8", "ignore")
+        # 레코드 크기로 나누어떨어지지 않는 끝부분은 쓰다가 끊긴 레코드이므로 버림.
+        body = len(data) - LOG_HEADER.size
+        self.truncated = body % LOG_RECORD.size
+        self.records = list(LOG_RECORD.iter_unpack(data[LOG_HEADER.size:len(data) - self.truncated]))
+        for i, (kind, value) in enumerate(self.records):
+            if kind not in REC_KINDS:
+                raise ReplayError(f"{i}번째 레코드의 종류({kind})를 알 수 없음")
+            if kind == REC_ACTION and value not in ACTION_NAMES:
+                raise ReplayError(f"{i}번째 레코드의 행동 코드({value})를 알 수 없음")
+        self.turns = sum(1 for kind, _ in self.records if kind == REC_ACTION)
+
+        self.snapshots = []
+        if os.path.exists(path + ".snap"):
+            with open(path + ".snap", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+            # 마지막 줄이 줄바꿈 없이 끝났으면 쓰다가 끊긴 것이므로 버림. (정상이면 빈 문자열임)
+            self.snapshots = [json.loads(line) for line in lines[:-1]]
+            # 기록 파일이 더 많이 잘렸으면 기록 범위를 넘는 스냅숏도 버림.
+            self.snapshots = [s for s in self.snapshots if s["record"] <= len(self.records)]
+        self.snapshot_turns = [snapshot["turn"] for snapshot in self.snapshots]
+
+        # 재생용 GameRun은 하나만 만들고, 이동할 때마다 상태만 되돌려서 다시 씀.
+        # 결과 비교용으로 메모리에만 기록하는 EventLog를 붙임.
+        self.bus = EventBus()
+        self.run = GameRun(self.name, self.seed, self.bus, EventLog())
+        self._initial = self.run.state()
+        self.position = 0  # 다음에 읽을 레코드 번호
+
+    def _start(self, snapshot=None):
+        self.run.restore(snapshot or self._initial)
+        self.position = snapshot["record"] if snapshot else 0
+
+    def seek(self, turn=None):
+        """turn턴 직전 상태로 이동하고 GameRun을 반환함. turn이 None이면 기록 끝까지 재생함."""
+        turn = self.turns if turn is None else min(max(turn, 0), self.turns)
+        # turn 이하인 스냅숏 중 가장 가까운 것을 이진 탐색으로 찾음.
+        index = bisect.bisect_right(self.snapshot_turns, turn) - 1
+        snapshot = self.snapshots[index] if index >= 0 else None
+        start_turn = snapshot["turn"] if snapshot else 0
+        # 지금 위치가 스냅숏과 목표 사이에 있으면 스냅숏보다 가까우므로 그대로 이어서 감.
+        if not start_turn <= self.run.turn <= turn:
+            self._start(snapshot)
+        return self._play(turn)
+
+    def step(self, turns=1):
+        """지금 위치에서 turns턴을 더 진행하고 GameRun을 반환함."""
+        return self._play(min(self.run.turn + turns, self.turns))
+
+    def _play(self, turn):
+        run = self.run
+        records = self.records
+        start = self.position
+        # 재생하면서 새로 만들어진 레코드. 입력 하나를 재생하면 그 입력과 결과 레코드가 쌓임.
+        produced = run.log.records
+        produced.clear()
+        while start + len(produced) < len(records):
+            kind, value = records[start + len(produced)]
+            if kind == REC_ACTION:
+                if run.turn >= turn:
+                    break
+                run.act(ACTION_NAMES[value])
+            elif kind == REC_EXPLORE:
+                run.explore()
+            else:
+                # 입력 자리에 결과 레코드가 있으면 기록보다 결과가 적게 나온 것임.
+                break
+        self.position = start + len(produced)
+
+        # 기록 끝이 잘렸으면 마지막 입력의 결과가 일부만 남아 있으므로, 남아 있는 부분까지만 비교함.
+        self.position = min(self.position, len(records))
+        expected = records[start:self.position]
+        if produced[:len(expected)] != expected:
+            offset = next(
+                (i for i, (a, b) in enumerate(zip(expected, produced)) if a != b),
+                min(len(expected), len(produced)),
+            )
+            raise ReplayError(f"{start + offset}번째 레코드부터 재생 결과가 기록과 다름")
+        return run
 
 
 # --- 메인 게임 실행 부분 ---
 
 
+# argparse용: 시드가 기록 파일에 저장할 수 있는 범위(0 ~ 2**64-1)인지 확인함.
+def seed_value(text):
+    seed = int(text)
+    if not 0 <= seed < 2**64:
+        raise argparse.ArgumentTypeError(f"시드는 0 이상 {2**64 - 1} 이하여야 합니다: {seed}")
+    return seed
+
+
+# 기록 파일을 재생해서 원하는 턴의 상태를 보여줌.
+def run_replay(args):
+    try:
+        replay = Replay(args.replay)
+        start = time.perf_counter()
+        run = replay.seek(args.turn)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError, ReplayError) as e:
+        print(f"재생 실패: {e}")
+        return 1
+
+    print(f"{replay.name}님의 기록 (시드 {replay.seed}, 전체 {replay.turns}턴)")
+    if replay.truncated:
+        print(f"기록 끝의 잘린 레코드({replay.truncated}바이트)는 건너뛰었음.")
+    print(f"{run.turn}턴까지 재생했음. ({elapsed * 1000:.1f}ms)")
+    print(f"현재 위치: 던전 {run.dungeon.current_floor}층")
+    run.player.show_status()
+    if run.monster:
+        run.monster.show_status()
+
+    # --show N: 이어지는 N턴을 화면에 보여줌.
+    if args.show:
+        ConsoleRenderer(replay.bus, delay=args.delay)
+        try:
+            replay.step(args.show)
+        except ReplayError as e:
+            print(f"재생 실패: {e}")
+            return 1
+    return 0
+
+
 def main():
     """
     게임의 전체적인 흐름을 관리하는 메인 함수.
     """
+    parser = argparse.ArgumentParser(description="텍스트 던전 RPG")
+    parser.add_argument(
+        "--delay", type=float, default=1.0, help="몬스터 공격 전에 쉬는 시간(초). 0이면 바로 진행"
+    )
+    parser.add_argument("--seed", type=seed_value, help="난수 시드. 같은 시드와 같은 입력이면 같은 게임이 됨")
+    parser.add_argument("--record", help=f"기록 파일 경로 (기본값: {LOG_DIR}/날짜-시드.dlog)")
+    parser.add_argument("--no-record", action="store_true", help="기록 파일을 남기지 않음")
+    parser.add_argument("--replay", metavar="LOG", help="게임 대신 기록 파일을 재생함")
+    parser.add_argument("--turn", type=int, help="재생할 때 이동할 턴 (기본값: 마지막)")
+    parser.add_argument("--show", type=int, default=0, help="재생할 때 이동한 뒤 화면에 보여줄 턴 수")
+    args = parser.parse_args()
+
+    if args.replay:
+        return run_replay(args)
+
+    # 이벤트 버스를 만들고, 화면 출력 담당(ConsoleRenderer)을 구독시킴.
+    bus = EventBus()
+    ConsoleRenderer(bus, delay=args.delay)
+
+    seed = random.randrange(2**32) if args.seed is None else args.seed
+    log = None
+    if not args.no_record:
+        path = args.record or os.path.join(LOG_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{seed}.dlog")
+        log = EventLog(path)
+
     player_name = input("플레이어의 이름을 입력하세요: ")
-    # Player 클래스로 플레이어 객체를 생성함.
-    player = Player(player_name, 100, 10)
-    # Dungeon 클래스로 던전 객체를 생성함.
-    dungeon = Dungeon()
+    # GameRun이 시드로 만든 난수 생성기와 함께 플레이어, 던전 객체를 생성함.
+    run = GameRun(player_name, seed, bus, log)
+    player = run.player
 
     print(f"\n용사 {player.name}님, 던전에 오신 것을 환영합니다.")
+    if log:
+        print(f"(이번 게임은 {log.path}에 기록됨. 시드: {run.seed})")
+
+    try:
+        play_game(run)
+    finally:
+        if log:
+            log.close()
+    return 0
+
+
+# 메뉴를 보여주며 게임 한 판을 진행함.
+def play_game(run):
+    player = run.player
+    dungeon = run.dungeon
 
     # while 반복문: 게임의 메인 루프. 사용자가 종료를 원할 때까지 계속됨.
     while True:
@@ -240,25 +761,20 @@ def main():
         )
 
         if menu == "1":
-            # 던전 객체를 통해 현재 층에 맞는 몬스터를 생성함.
-            monster = dungeon.generate_monster()
-
-            battle_won = start_battle(player, monster)
+            # 현재 층에 맞는 몬스터를 만나 전투함. 승리하면 다음 층으로 이동함.
+            battle_won = run.battle(ask_action)
 
             # 전투 후 플레이어의 생존 여부를 확인.
             if not player.is_alive():
                 print("\nGAME OVER")
                 break
 
-            # 전투에서 승리했을 경우에만 다음 층으로 이동함.
-            if battle_won:
-                dungeon.next_floor()
-                # 던전 클리어 여부 확인
-                if dungeon.is_cleared():
-                    print("\n마침내 던전의 지배자를 물리쳤다!")
-                    print("던전을 탈출하고 현실세계로 돌아왔습니다.")
-                    print("GAME CLEAR!")
-                    break
+            # 던전 클리어 여부 확인
+            if battle_won and dungeon.is_cleared():
+                print("\n마침내 던전의 지배자를 물리쳤다!")
+                print("던전을 탈출하고 현실세계로 돌아왔습니다.")
+                print("GAME CLEAR!")
+                break
 
         elif menu == "2":
             player.show_status()
@@ -273,4 +789,4 @@ def main():
 
 # 이 스크립트 파일이 직접 실행될 때만 main() 함수를 호출함.
 if __name__ == "__main__":
-    main()
+    sys.exit(main())